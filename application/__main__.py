@@ -0,0 +1,13 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from application.cli import build_parser
+
+args = build_parser().parse_args()
+if args.tui:
+    from application.tui import main
+else:
+    from application.main import main
+main(args)
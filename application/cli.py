@@ -0,0 +1,61 @@
+import argparse
+import os
+
+from monitor_core.archive import enable_archive, close_archive, DEFAULT_PATH
+from monitor_core.shm import enable_publisher, close_publisher
+from monitor_core.journal import enable_journal, close_journal, DEFAULT_DIR as ALERTS_DIR
+from monitor_core.notify import enable_notifications, close_notifications
+from monitor_core.budget import enable_budget, close_budget, DEFAULT_CPU_BUDGET, DEFAULT_MEMORY_BUDGET
+
+# Command line shared by the GUI and the terminal dashboard. Kept free of
+# Qt imports so `python -m application --tui` starts without loading it.
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="AI-Powered OS Monitor")
+    parser.add_argument("--tui", action="store_true", help="run the terminal dashboard instead of the GUI")
+    parser.add_argument("--interval", type=float, default=1.0, metavar="SECONDS",
+                        help="terminal dashboard refresh interval (default: %(default)s)")
+    parser.add_argument("--archive", nargs="?", const=DEFAULT_PATH, default=os.environ.get("OS_MONITOR_ARCHIVE"),
+                        metavar="PATH", help="record all samples to a SQLite archive (default: %(const)s)")
+    parser.add_argument("--no-shm", action="store_true",
+                        help="do not publish the latest samples to shared memory")
+    parser.add_argument("--alerts", default=os.environ.get("OS_MONITOR_ALERTS", ALERTS_DIR), metavar="DIR",
+                        help="directory of the rotating alert journal (default: %(default)s)")
+    parser.add_argument("--no-alert-journal", action="store_true",
+                        help="keep alerts in memory only")
+    parser.add_argument("--notify", action="append", metavar="SINK",
+                        default=[spec for spec in os.environ.get("OS_MONITOR_NOTIFY", "").split(",") if spec],
+                        help="also send alerts to SINK: desktop, webhook:URL, file:PATH or syslog[:HOST:PORT] "
+                             "(repeatable)")
+    parser.add_argument("--budget-cpu", type=float, default=float(os.environ.get("OS_MONITOR_BUDGET_CPU", DEFAULT_CPU_BUDGET)),
+                        metavar="PERCENT", help="CPU the monitor may use, in percent of one CPU, before it samples "
+                                                "less often (default: %(default)s)")
+    parser.add_argument("--budget-memory", type=float,
+                        default=float(os.environ.get("OS_MONITOR_BUDGET_MEMORY", DEFAULT_MEMORY_BUDGET)),
+                        metavar="MB", help="resident memory the monitor may use (default: %(default)s)")
+    parser.add_argument("--no-budget", action="store_true",
+                        help="always sample at full rate, whatever the monitor's own overhead")
+    return parser
+
+
+def start_services(args):
+    if args.archive:
+        enable_archive(args.archive)
+    if not args.no_shm:
+        enable_publisher()
+    journal = enable_journal(None if args.no_alert_journal else args.alerts)
+    if not args.no_budget:
+        enable_budget(args.budget_cpu, args.budget_memory)
+    if args.notify:
+        dispatcher = enable_notifications(args.notify)
+        if dispatcher:
+            journal.add_listener(lambda alert_id, record: dispatcher.submit(record))
+
+
+def stop_services():
+    close_budget()
+    close_notifications()
+    close_archive()
+    close_publisher()
+    close_journal()
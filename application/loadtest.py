@@ -0,0 +1,265 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import psutil
+from PyQt5.QtCore import QCoreApplication, QThread, QMetaObject, Qt
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from monitor_core.loadgen import CPULoad, MemoryLoad, DiskLoad, NetworkLoad
+from monitor_core.budget import thread_cpu_times
+from system_monitor.cpu_details import CPUWorker
+from system_monitor.memory_details import MemoryWorker
+from system_monitor.disk_details import DiskMonitorThread
+from hardware_monitor.network_details import NetworkWorker
+
+# Collector accuracy and overhead harness (`python -m application.loadtest`).
+# Runs the real CPU, memory, disk and network workers headless and, for each
+# scenario, applies known load in steps from monitor_core.loadgen. For every
+# step it compares what the collector reported with what was generated and
+# records how long the collector took to show it; the CPU time of each
+# collector thread over the whole run is its overhead.
+#
+# Truth is stated in the unit each collector claims to report:
+#   cpu      utilization, percent of all logical CPUs
+#   memory   used, GB of 1024**3 bytes (what the Memory tab shows)
+#   disk     write, MB/s of 1024**2 bytes, fsynced so it reaches the device
+#   network  upload, Kbps of 1000 bits over loopback. The worker divides by
+#            1024, so this scenario reads about 2.3% low until that is fixed.
+#
+# With --baseline, results are compared with an earlier --json run and the
+# exit status is 1 when any collector got less accurate, slower or costlier.
+
+ERROR_REGRESSION = 5.0      # percentage points of relative error
+LAG_REGRESSION = 1.5        # seconds
+OVERHEAD_REGRESSION = 1.5   # times the old CPU share...
+OVERHEAD_SLACK = 0.5        # ...plus this many percentage points
+LAG_TOLERANCE = 0.1         # a step is detected once within 10% of its size
+MIB = 1024 * 1024
+
+# Thread names stay under the 15 characters Linux keeps in /proc/.../comm
+THREADS = {'cpu': "lt-cpu", 'memory': "lt-memory", 'disk': "lt-disk", 'network': "lt-network"}
+
+
+def cpu_steps(cpus):
+    return [(f"{int(share * 100)}% of {cpus} CPUs", lambda share=share: CPULoad(share * cpus), share * 100)
+            for share in (0.25, 0.5, 1.0)]
+
+
+def memory_steps():
+    return [(f"{size} MB", lambda size=size: MemoryLoad(size * MIB), size / 1024) for size in (256, 512)]
+
+
+def disk_steps(directory):
+    return [(f"{rate} MB/s", lambda rate=rate: DiskLoad(rate * MIB, directory), rate) for rate in (20, 50)]
+
+
+def network_steps():
+    return [(f"{rate} Kbps", lambda rate=rate: NetworkLoad(rate * 1000 / 8), rate) for rate in (2000, 20000)]
+
+
+class Collectors:
+    # The four workers, started the way their widgets start them, with every
+    # sample copied out of the ring as soon as it is signalled
+    def __init__(self):
+        self.values = {name: [] for name in THREADS}
+
+        self.cpu = CPUWorker()
+        self.cpu_thread = QThread()
+        self.cpu_thread.setObjectName(THREADS['cpu'])
+        self.cpu.moveToThread(self.cpu_thread)
+        self.cpu_thread.started.connect(self.cpu.start_timer)
+        self.cpu.samples_ready.connect(lambda: self.record('cpu', self.cpu.samples, 'utilization'))
+
+        self.memory = MemoryWorker()
+        self.memory.setObjectName(THREADS['memory'])
+        self.memory.samples_ready.connect(lambda: self.record('memory', self.memory.samples, 'used'))
+
+        self.disk = DiskMonitorThread()
+        self.disk.setObjectName(THREADS['disk'])
+        self.disk.samples_ready.connect(lambda: self.record('disk', self.disk.samples, 'write'))
+
+        self.network = NetworkWorker(poll_metadata=False)
+        self.network_thread = QThread()
+        self.network_thread.setObjectName(THREADS['network'])
+        self.network.moveToThread(self.network_thread)
+        self.network_thread.started.connect(self.network.run)
+        self.network.samples_ready.connect(lambda: self.record('network', self.network.samples, 'upload'))
+
+    def record(self, name, ring, field):
+        self.values[name].extend((sample.ts, getattr(sample, field)) for sample in ring.drain())
+
+    def start(self):
+        for thread in (self.cpu_thread, self.memory, self.disk, self.network_thread):
+            thread.start()
+
+    def stop(self):
+        QMetaObject.invokeMethod(self.cpu, "stop", Qt.BlockingQueuedConnection)
+        self.cpu_thread.quit()
+        self.cpu_thread.wait()
+        self.memory.stop()
+        self.disk.stop()
+        self.network.running = False
+        self.network_thread.quit()
+        self.network_thread.wait()
+
+    def between(self, name, start, end):
+        return [(ts, value) for ts, value in self.values[name] if start <= ts <= end and value is not None]
+
+
+def pump(app, seconds):
+    # Keep delivering the workers' signals while the load runs
+    end = time.time() + seconds
+    while time.time() < end:
+        app.processEvents()
+        time.sleep(0.05)
+
+
+def run_scenario(app, collectors, name, steps, step_time, settle):
+    # An idle period first gives the baseline each step's delta is added to
+    pump(app, settle)
+    idle_start = time.time()
+    pump(app, step_time - settle)
+    idle = [value for ts, value in collectors.between(name, idle_start, time.time())]
+    baseline = statistics.median(idle) if idle else 0.0
+
+    results = []
+    for label, make_load, delta in steps:
+        load = make_load()
+        start = time.time()
+        load.start()
+        pump(app, step_time)
+        end = time.time()
+        produced = load.produced.value
+        load.stop()
+
+        samples = collectors.between(name, start, end)
+        settled = [value for ts, value in samples if ts >= start + settle]
+        expected = baseline + delta
+        if name == 'cpu':
+            expected = min(expected, 100.0)  # the spinners displace the idle load
+        measured = statistics.median(settled) if settled else None
+        lag = next((ts - start for ts, value in samples if abs(value - expected) <= abs(delta) * LAG_TOLERANCE), None)
+        error = measured - expected if measured is not None else None
+        results.append({
+            'step': label,
+            'baseline': baseline,
+            'expected': expected,
+            'measured': measured,
+            'error': error,
+            'error_pct': abs(error) / abs(delta) * 100 if error is not None and delta else None,
+            'lag': lag,
+            'produced_bytes': produced or None,  # achieved rate of the disk and network loads
+        })
+        print(f"  {label:>18}: expected {expected:9.2f}  measured "
+              f"{'-' if measured is None else format(measured, '9.2f')}  error "
+              f"{'-' if results[-1]['error_pct'] is None else format(results[-1]['error_pct'], '5.1f') + '%'}  lag "
+              f"{'not detected' if lag is None else format(lag, '.1f') + ' s'}", flush=True)
+        pump(app, settle)  # let the load drain away before the next step
+    return results
+
+
+def compare(report, baseline):
+    # Regression messages against an earlier report
+    problems = []
+    for name, steps in report['scenarios'].items():
+        old_steps = {step['step']: step for step in baseline.get('scenarios', {}).get(name, [])}
+        for step in steps:
+            old = old_steps.get(step['step'])
+            if old is None:
+                continue
+            if step['error_pct'] is not None and old['error_pct'] is not None \
+                    and step['error_pct'] > old['error_pct'] + ERROR_REGRESSION:
+                problems.append(f"{name} {step['step']}: error {old['error_pct']:.1f}% -> {step['error_pct']:.1f}%")
+            if step['lag'] is None and old['lag'] is not None:
+                problems.append(f"{name} {step['step']}: no longer detected")
+            elif step['lag'] is not None and old['lag'] is not None and step['lag'] > old['lag'] + LAG_REGRESSION:
+                problems.append(f"{name} {step['step']}: lag {old['lag']:.1f} s -> {step['lag']:.1f} s")
+    for name, overhead in report['overhead'].items():
+        old = baseline.get('overhead', {}).get(name)
+        if overhead is not None and old is not None and overhead > old * OVERHEAD_REGRESSION + OVERHEAD_SLACK:
+            problems.append(f"{name} overhead {old:.2f}% -> {overhead:.2f}% of one CPU")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure OS Monitor collector accuracy and overhead under known load")
+    parser.add_argument("--only", default="cpu,memory,disk,network", metavar="LIST",
+                        help="comma-separated scenarios to run (default: %(default)s)")
+    parser.add_argument("--step", type=float, default=8.0, metavar="SECONDS",
+                        help="duration of each load step (default: %(default)s)")
+    parser.add_argument("--settle", type=float, default=2.0, metavar="SECONDS",
+                        help="start of each step left out of the accuracy figures (default: %(default)s)")
+    parser.add_argument("--dir", default=None, metavar="DIR",
+                        help="directory for the disk load file (default: current directory)")
+    parser.add_argument("--json", metavar="FILE", help="write the report to FILE")
+    parser.add_argument("--baseline", metavar="FILE", help="compare with an earlier --json report")
+    args = parser.parse_args(argv)
+
+    cpus = psutil.cpu_count(logical=True) or 1
+    scenarios = {
+        'cpu': cpu_steps(cpus),
+        'memory': memory_steps(),
+        'disk': disk_steps(args.dir),
+        'network': network_steps(),
+    }
+    selected = [name for name in args.only.split(",") if name]
+    for name in selected:
+        if name not in scenarios:
+            parser.error(f"unknown scenario {name!r}")
+
+    app = QCoreApplication(sys.argv[:1])
+    collectors = Collectors()
+    started = time.time()
+    cpu_before = thread_cpu_times()
+    process = psutil.Process()
+    process_before = process.cpu_times()
+    collectors.start()
+
+    report = {'ts': started, 'cpus': cpus, 'step': args.step, 'settle': args.settle, 'scenarios': {}}
+    try:
+        for name in selected:
+            print(f"{name}:", flush=True)
+            report['scenarios'][name] = run_scenario(app, collectors, name, scenarios[name], args.step, args.settle)
+    finally:
+        cpu_after = thread_cpu_times()
+        process_after = process.cpu_times()
+        wall = time.time() - started
+        collectors.stop()
+
+    # CPU time of each collector thread, as a percentage of one CPU
+    report['overhead'] = {}
+    for name, thread in THREADS.items():
+        if thread in cpu_after:
+            report['overhead'][name] = (cpu_after[thread] - cpu_before.get(thread, 0.0)) / wall * 100
+        else:
+            report['overhead'][name] = None
+    report['process_cpu'] = ((process_after.user + process_after.system)
+                             - (process_before.user + process_before.system)) / wall * 100
+    report['process_rss'] = process.memory_info().rss
+
+    print("overhead (% of one CPU):")
+    for name, overhead in report['overhead'].items():
+        print(f"  {name:>8}: {'-' if overhead is None else format(overhead, '.2f')}")
+    print(f"  {'process':>8}: {report['process_cpu']:.2f} ({report['process_rss'] / MIB:.0f} MB RSS)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(report, json.load(f))
+        for problem in problems:
+            print(f"[REGRESSION] {problem}")
+        if problems:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,13 @@
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QTabWidget, QWidget,
     QVBoxLayout, QSizePolicy, QPushButton, QHBoxLayout,
-    QLabel, QFrame, QSpacerItem, QGraphicsDropShadowEffect, QGraphicsBlurEffect
+    QLabel, QSpacerItem, QComboBox
 )
-from PyQt5.QtCore import Qt, QPoint, QPropertyAnimation, QRect, QTimer, QEasingCurve, QSize
-from PyQt5.QtGui import QColor, QIcon
+from PyQt5.QtCore import QTimer, QObject, pyqtSignal
 import sys
 import os
-import psutil
 import pyqtgraph as pg
+from functools import partial
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from system_monitor.cpu_details import CPUMonitorWidget
@@ -16,151 +15,25 @@ from system_monitor.memory_details import MemoryMonitorWidget
 from system_monitor.disk_details import DiskMonitorWidget
 from hardware_monitor.network_details import NetworkMonitorWidget
 from hardware_monitor.gpu_details import GPUMonitorWidget
+from hardware_monitor.sensors_details import SensorsMonitorWidget
+from hardware_monitor.overlay import Overlay
+from system_monitor.plugin_details import PluginMonitorWidget
+from monitor_core.plugins import discover
+from monitor_core.decimate import PLOT_WINDOWS, DEFAULT_WINDOW
+from monitor_core.snapshot import enable_snapshots, close_snapshots
+from monitor_core.journal import get_journal
+from monitor_core.budget import get_budget, CHECK_INTERVAL
+from application.cli import build_parser, start_services, stop_services
 
 pg.setConfigOption('background', '#121212')
 pg.setConfigOption('foreground', 'white')
 pg.setConfigOptions(antialias=True)
 
 
-class Overlay(QWidget):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.parent_window = parent
-        self.setWindowFlags(Qt.FramelessWindowHint | Qt.Tool)
-        self.setAttribute(Qt.WA_TranslucentBackground)
-
-        self.full_width = 500
-        self.full_height = 600
-        self.setFixedSize(self.full_width, self.full_height)
-
-        # Main layout
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-
-        # Background Frosted Glass + Glow
-        self.blur_background = QFrame(self)
-        self.blur_background.setGeometry(0, 0, self.full_width, self.full_height)
-        self.blur_background.setStyleSheet("background-color: rgba(255, 255, 255, 25); border-radius: 18px;")
-
-        blur = QGraphicsBlurEffect()
-        blur.setBlurRadius(40)
-        self.blur_background.setGraphicsEffect(blur)
-
-        glow = QGraphicsDropShadowEffect()
-        glow.setBlurRadius(40)
-        glow.setOffset(0, 0)
-        glow.setColor(QColor(0, 206, 209, 80))
-        self.setGraphicsEffect(glow)
-
-        # Container inside blurred background
-        self.container = QFrame(self)
-        self.container.setGeometry(0, 0, self.full_width, self.full_height)
-        self.container.setStyleSheet("""
-            QFrame {
-                background-color: rgba(40, 40, 40, 200);
-                border-radius: 18px;
-                border: 2px solid #00CED1;
-            }
-        """)
-
-        container_glow = QGraphicsDropShadowEffect()
-        container_glow.setBlurRadius(60)
-        container_glow.setOffset(0, 0)
-        container_glow.setColor(QColor(0, 206, 209, 140))
-        self.container.setGraphicsEffect(container_glow)
-
-        # Layout inside container
-        container_layout = QVBoxLayout(self.container)
-        container_layout.setContentsMargins(12, 12, 12, 12)
-
-        # Close button
-        close_btn_layout = QHBoxLayout()
-        close_btn_layout.addStretch()
-        close_btn = QPushButton("✖")
-        close_btn.setFixedSize(26, 26)
-        close_btn.clicked.connect(self.animate_hide)
-        close_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #00CED1;
-                color: black;
-                border-radius: 13px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #00B4B8;
-                color: white;
-            }
-        """)
-        close_btn_layout.addWidget(close_btn)
-        container_layout.addLayout(close_btn_layout)
-
-        # Title
-        title_label = QLabel("No new notifications") #🤖 AI Module Panel
-        title_label.setAlignment(Qt.AlignCenter)
-        title_label.setStyleSheet("font-size: 18px; font-weight: bold;")
-        container_layout.addWidget(title_label)
-
-        # Placeholder content
-        container_layout.addWidget(QPushButton("Clear")) #AI Placeholder Button
-
-        self.opacity_anim = None
-        self.slide_anim = None
-
-    def snap_to_corner(self):
-        if self.parent_window:
-            parent_geo = self.parent_window.geometry()
-            self.target_x = parent_geo.x() + parent_geo.width() - self.full_width - 20
-            self.target_y = parent_geo.y() + 60
-
-    def animate_hide(self):
-        self.opacity_anim = QPropertyAnimation(self, b"windowOpacity")
-        self.opacity_anim.setDuration(500)  # slower
-        self.opacity_anim.setStartValue(1.0)
-        self.opacity_anim.setEndValue(0.0)
-
-        self.slide_anim = QPropertyAnimation(self, b"pos")
-        self.slide_anim.setDuration(500)  # slower
-        self.slide_anim.setStartValue(self.pos())
-        self.slide_anim.setEndValue(QPoint(self.x() + self.full_width + 20, self.y()))
-        self.slide_anim.setEasingCurve(QEasingCurve.InBack)
-
-        self.opacity_anim.finished.connect(self.hide)
-        self.opacity_anim.start()
-        self.slide_anim.start()
-
-    def show_with_animation(self):
-        self.snap_to_corner()
-
-        start_x = self.target_x + self.full_width + 20
-        self.move(start_x, self.target_y)
-        self.setWindowOpacity(0.0)
-        self.show()
-
-        self.opacity_anim = QPropertyAnimation(self, b"windowOpacity")
-        self.opacity_anim.setDuration(500)  # slower
-        self.opacity_anim.setStartValue(0.0)
-        self.opacity_anim.setEndValue(1.0)
-
-        self.slide_anim = QPropertyAnimation(self, b"pos")
-        self.slide_anim.setDuration(500)  # slower
-        self.slide_anim.setStartValue(QPoint(start_x, self.target_y))
-        self.slide_anim.setEndValue(QPoint(self.target_x, self.target_y))
-        self.slide_anim.setEasingCurve(QEasingCurve.OutBack)
-
-        self.opacity_anim.start()
-        self.slide_anim.start()
-
-    def showEvent(self, event):
-        self.snap_to_corner()
-        self.setWindowOpacity(1.0)
-        self.show_with_animation()
-        self.installEventFilter(self.parent_window)
-
-    def eventFilter(self, obj, event):
-        if event.type() == event.MouseButtonPress:
-            if not self.geometry().contains(event.globalPos()):
-                self.animate_hide()
-        return super().eventFilter(obj, event)
+class AlertNotifier(QObject):
+    # Alerts are journaled from the collector and snapshot threads; the
+    # signal queues them to the overlay on the GUI thread
+    appended = pyqtSignal(int)
 
 
 class SystemMonitorApp(QMainWindow):
@@ -239,19 +112,38 @@ class SystemMonitorApp(QMainWindow):
         main_layout = QVBoxLayout(main_widget)
 
         top_bar = QHBoxLayout()
+        top_bar.addWidget(QLabel("History:"))
+        self.window_selector = QComboBox()
+        self.window_selector.addItems(list(PLOT_WINDOWS))
+        self.window_selector.setCurrentText(DEFAULT_WINDOW)
+        self.window_selector.currentTextChanged.connect(self.set_plot_window)
+        top_bar.addWidget(self.window_selector)
         top_bar.addItem(QSpacerItem(40, 20, QSizePolicy.Expanding, QSizePolicy.Minimum))
 
+        # Degradation level of the self-limiting overhead budget
+        self.overhead_label = QLabel()
+        top_bar.addWidget(self.overhead_label)
+        self.overhead_timer = QTimer(self)
+        self.overhead_timer.timeout.connect(self.update_overhead)
+        self.overhead_timer.start(int(CHECK_INTERVAL * 1000))
+        self.update_overhead()
+
         self.button = QPushButton("Notifications")
-        self.button.setFixedSize(100, 30)
+        self.button.setFixedSize(130, 30)
         self.button.clicked.connect(self.show_panel)
         top_bar.addWidget(self.button)
 
         self.tabs = QTabWidget()
-        self.add_monitor_tab(CPUMonitorWidget, "CPU Monitor")
+        self.monitor_widgets = []
+        cpu = self.add_monitor_tab(CPUMonitorWidget, "CPU Monitor")
         self.add_monitor_tab(MemoryMonitorWidget, "Memory")
         self.add_monitor_tab(DiskMonitorWidget, "Disk")
         self.add_monitor_tab(NetworkMonitorWidget, "Network")
         self.add_monitor_tab(GPUMonitorWidget, "GPU Monitor")
+        self.add_monitor_tab(SensorsMonitorWidget, "Sensors")
+        # Third-party collectors (entry point group "os_monitor.collectors")
+        for runner in discover():
+            self.add_monitor_tab(partial(PluginMonitorWidget, runner), runner.name)
 
         main_layout.addLayout(top_bar)
         main_layout.addWidget(self.tabs)
@@ -259,6 +151,18 @@ class SystemMonitorApp(QMainWindow):
 
         self.overlay = Overlay(self)
         self.overlay.hide()
+        # The overlay's process check runs on the CPU worker's process walk
+        cpu.worker.processes_updated.connect(self.overlay.check_high_usage_processes)
+
+        # Anomaly triggers capture a process/connection/disk snapshot; it is
+        # journaled with the alert and shown when the entry is opened
+        enable_snapshots()
+        self.alert_notifier = AlertNotifier()
+        self.alert_notifier.appended.connect(self.overlay.add_alert)
+        journal = get_journal()
+        if journal:
+            journal.add_listener(lambda alert_id, record: self.alert_notifier.appended.emit(alert_id))
+        self.overlay.update_metrics()
 
     def add_monitor_tab(self, widget_class, title):
         tab = QWidget()
@@ -268,16 +172,49 @@ class SystemMonitorApp(QMainWindow):
         layout.addWidget(widget)
         tab.setLayout(layout)
         self.tabs.addTab(tab, title)
+        self.monitor_widgets.append(widget)
+        return widget
+
+    def update_overhead(self):
+        budget = get_budget()
+        if budget is None:
+            self.overhead_label.hide()
+            return
+        self.overhead_label.setText(budget.status())
+        self.overhead_label.setToolTip(
+            f"Budget {budget.cpu_budget:g}% CPU / {budget.memory_budget:g} MB\n"
+            + "\n".join(f"{name}: {cpu:.1f}% CPU" for name, cpu in budget.threads[:6]))
+        self.overhead_label.setStyleSheet("color: #FFA500;" if budget.level else "")
+
+    def set_plot_window(self, window):
+        for widget in self.monitor_widgets:
+            widget.set_window(window)
 
     def show_panel(self):
-        if self.overlay.isVisible():
+        if self.overlay.isVisible() and not self.overlay.closing:
             self.overlay.animate_hide()
         else:
             self.overlay.show_with_animation()
 
 
-if __name__ == "__main__":
+def main(args=None):
+    if args is None:
+        args = build_parser().parse_args()
+    if args.tui:
+        from application.tui import main as tui_main
+        return tui_main(args)
+    start_services(args)
+
     app = QApplication([])
     window = SystemMonitorApp()
     window.show()
-    app.exec_()
\ No newline at end of file
+    app.exec_()
+    # Stop the collector threads before the window is garbage collected
+    for widget in window.monitor_widgets:
+        widget.close()
+    close_snapshots()
+    stop_services()
+
+
+if __name__ == "__main__":
+    main()
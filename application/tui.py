@@ -0,0 +1,197 @@
+import collections
+import locale
+import socket
+import time
+from datetime import timedelta
+
+try:
+    import curses
+except ImportError:  # Windows without the windows-curses package
+    curses = None
+
+from monitor_core.procfs import get_reader
+from monitor_core.metrics import publish
+from monitor_core.sampling import (
+    cpu_usage, boot_time, process_counts, virtual_memory, disk_io_counters, net_io_counters, RateMeter,
+)
+from monitor_core.supervisor import SupervisedCollector
+from monitor_core.budget import sampling_scale
+from application.cli import start_services, stop_services
+
+# Terminal dashboard (`python -m application --tui`). Samples through the
+# same Qt-free helpers as the GUI workers and publishes to the same metric
+# pipeline (sketches, archive, shared memory). Only lines whose text changed
+# are rewritten, and curses sends just the changed cells to the terminal.
+
+SPARK = "▁▂▃▄▅▆▇█"
+HISTORY = 240
+COUNTS_INTERVAL = 5  # seconds between process/thread counts (walks every process)
+
+
+def sparkline(values, width, top=None):
+    values = list(values)[-width:]
+    if not values:
+        return ""
+    top = top or max(max(values), 1e-9)
+    return "".join(SPARK[max(0, min(int(v / top * (len(SPARK) - 1) + 0.5), len(SPARK) - 1))] for v in values)
+
+
+def format_bytes_rate(bytes_per_sec):
+    if bytes_per_sec < 1024 * 1024:
+        return f"{bytes_per_sec / 1024:.0f} KB/s"
+    return f"{bytes_per_sec / (1024 * 1024):.2f} MB/s"
+
+
+def format_speed(speed_kbps):
+    if speed_kbps < 1000:
+        return f"{int(speed_kbps)} Kbps"
+    elif speed_kbps < 1024 * 1000:
+        return f"{int(speed_kbps / 1024)} Mbps"
+    return f"{speed_kbps / (1024 * 8):.2f} MB/s"
+
+
+class Dashboard:
+    def __init__(self, interval):
+        self.interval = interval
+        self.reader = get_reader()
+        self.disk = RateMeter(lambda: disk_io_counters(self.reader))
+        self.network = RateMeter(lambda: net_io_counters(self.reader))
+        self.gpu = SupervisedCollector("monitor_core.collectors:gpu_sample", interval=interval, deadline=5)
+        self.gpu_info = None
+        self.history = {name: collections.deque(maxlen=HISTORY) for name in ('cpu', 'memory', 'disk', 'network', 'gpu')}
+        self.counts = None
+        self.counts_time = 0
+        self.hostname = socket.gethostname()
+        cpu_usage(self.reader)  # prime the busy/total baseline
+
+    def sample(self):
+        # [(label, summary, history key, sparkline ceiling or None for auto)]
+        now = time.time()
+        rows = []
+
+        usage = cpu_usage(self.reader)
+        if now - self.counts_time >= COUNTS_INTERVAL:
+            self.counts = process_counts()
+            self.counts_time = now
+        processes, threads = self.counts
+        publish("cpu", {"utilization": usage, "processes": processes, "threads": threads})
+        self.history['cpu'].append(usage)
+        rows.append(("CPU", f"{usage:5.1f}%   processes {processes}   threads {threads}", 'cpu', 100))
+
+        total, available, used, free, percent = virtual_memory(self.reader)
+        gb = 1024 ** 3
+        publish("memory", {"percent": percent, "used": used / gb, "available": available / gb})
+        self.history['memory'].append(percent)
+        rows.append(("Memory", f"{percent:5.1f}%   {used / gb:.1f} / {total / gb:.1f} GB", 'memory', 100))
+
+        read, write = self.disk.rates()
+        publish("disk", {"read": read / (1024 * 1024), "write": write / (1024 * 1024)})
+        self.history['disk'].append(read + write)
+        rows.append(("Disk", f"read {format_bytes_rate(read)}   write {format_bytes_rate(write)}", 'disk', None))
+
+        sent, received = self.network.rates()
+        upload, download = sent / 1024 * 8, received / 1024 * 8
+        publish("network", {"upload": upload, "download": download})
+        self.history['network'].append(upload + download)
+        rows.append(("Network", f"down {format_speed(download)}   up {format_speed(upload)}", 'network', None))
+
+        self.gpu.set_interval(self.interval * sampling_scale())
+        for ts, gpu in self.gpu.poll():
+            self.gpu_info = gpu
+            if gpu:
+                mem_percent = gpu["mem_used"] / gpu["mem_total"] * 100
+                publish("gpu", {"load": gpu["load"], "memory": mem_percent, "temp": gpu["temp"]}, ts)
+                self.history['gpu'].append(gpu["load"])
+        if self.gpu_info:
+            gpu = self.gpu_info
+            summary = f"{gpu['load']:5.1f}%   {gpu['mem_used'] / 1024:.1f} / {gpu['mem_total'] / 1024:.1f} GB   {gpu['temp']}°C   {gpu['name']}"
+        else:
+            summary = f"unavailable ({self.gpu.last_error})" if self.gpu.last_error else "detecting..."
+        if self.gpu.stale and self.gpu_info:
+            summary += "   [stale]"
+        rows.append(("GPU", summary, 'gpu', 100))
+        return rows
+
+    def header(self):
+        uptime = timedelta(seconds=int(time.time() - boot_time(self.reader)))
+        return f"OS Monitor  {self.hostname}  up {uptime}  {time.strftime('%H:%M:%S')}"
+
+    def close(self):
+        self.gpu.close()
+
+
+class Screen:
+    def __init__(self, stdscr):
+        self.stdscr = stdscr
+        self.lines = {}  # row -> (text, attr) currently on screen
+
+    def draw(self, row, text, attr=0):
+        height, width = self.stdscr.getmaxyx()
+        if row >= height:
+            return
+        text = text[:width - 1].ljust(width - 1)
+        if self.lines.get(row) == (text, attr):
+            return
+        self.lines[row] = (text, attr)
+        self.stdscr.addstr(row, 0, text, attr)
+
+    def reset(self):
+        self.lines.clear()
+        self.stdscr.erase()
+
+    def flush(self):
+        self.stdscr.noutrefresh()
+        curses.doupdate()
+
+
+def run(stdscr, interval):
+    curses.curs_set(0)
+    stdscr.timeout(int(interval * 1000))
+    bold = curses.A_BOLD
+    spark_attr = 0
+    if curses.has_colors():
+        curses.use_default_colors()
+        curses.init_pair(1, curses.COLOR_CYAN, -1)
+        spark_attr = curses.color_pair(1)
+
+    dashboard = Dashboard(interval)
+    screen = Screen(stdscr)
+    try:
+        while True:
+            rows = dashboard.sample()
+            width = stdscr.getmaxyx()[1]
+            screen.draw(0, dashboard.header() + "   (q to quit)", bold | curses.A_REVERSE)
+            row = 2
+            for label, summary, key, top in rows:
+                screen.draw(row, f"{label:<9}{summary}", bold)
+                screen.draw(row + 1, " " * 9 + sparkline(dashboard.history[key], max(width - 10, 1), top), spark_attr)
+                row += 3
+            screen.flush()
+
+            deadline = time.time() + interval * sampling_scale()
+            while time.time() < deadline:
+                key = stdscr.getch()
+                if key in (ord('q'), ord('Q'), 27):
+                    return
+                if key == curses.KEY_RESIZE:
+                    screen.reset()
+                    break
+                stdscr.timeout(max(int((deadline - time.time()) * 1000), 1))
+            stdscr.timeout(int(interval * 1000))
+    finally:
+        dashboard.close()
+
+
+def main(args):
+    if curses is None:
+        print("The terminal dashboard needs curses (on Windows: pip install windows-curses).")
+        return 1
+    locale.setlocale(locale.LC_ALL, "")  # so curses can draw the sparkline blocks
+    start_services(args)
+    try:
+        curses.wrapper(run, args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_services()
+    return 0
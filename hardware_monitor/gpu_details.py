@@ -1,31 +1,53 @@
-import GPUtil
 from PyQt5.QtWidgets import QWidget, QLabel, QGridLayout, QHBoxLayout, QSizePolicy
 from PyQt5.QtCore import QThread, pyqtSignal, Qt
 import pyqtgraph as pg
-import time
+
+from monitor_core.metrics import publish, percentile_text
+from monitor_core.decimate import PlotHistory, DEFAULT_WINDOW, WINDOW_LABELS, window_seconds
+from monitor_core.archive import get_archive
+from monitor_core.supervisor import SupervisedCollector
+from monitor_core.samples import GPUSample, SampleRing
+from monitor_core.budget import sampling_scale, RenderThrottle
+from system_monitor.details_panel import DetailsPanel
+
 
 class GPUWorker(QThread):
-    gpu_data_updated = pyqtSignal(float, float, dict)
+    samples_ready = pyqtSignal()
+    stale_changed = pyqtSignal(bool, str)
+
+    def __init__(self, parent=None, interval=1):
+        super().__init__(parent)
+        self.interval = interval
+        self.samples = SampleRing(GPUSample)
 
     def run(self):
         self.running = True
+        # GPUtil runs in a supervised child process: a hung or crashing
+        # driver call only marks the data stale until the child is restarted
+        collector = SupervisedCollector("monitor_core.collectors:gpu_sample",
+                                        interval=self.interval * sampling_scale(), deadline=5)
+        stale = False
         while self.running:
-            gpus = GPUtil.getGPUs()
-            if gpus:
-                gpu = gpus[0]
-                load = gpu.load * 100
-                mem_percent = (gpu.memoryUsed / gpu.memoryTotal) * 100
-
-                details = {
-                    "name": gpu.name,
-                    "temp": gpu.temperature,
-                    "load": load,
-                    "mem_used": gpu.memoryUsed/1024,
-                    "mem_total": gpu.memoryTotal/1024,
-                    "driver": gpu.driver,
-                }
-                self.gpu_data_updated.emit(load, mem_percent, details)
-            time.sleep(1)
+            # Slower over the overhead budget, like the other collectors
+            collector.set_interval(self.interval * sampling_scale())
+            for ts, gpu in collector.poll(timeout=1):
+                if gpu:
+                    sample = self.samples.acquire()
+                    sample.ts = ts
+                    sample.load = gpu["load"]
+                    sample.memory_percent = (gpu["mem_used"] / gpu["mem_total"]) * 100
+                    sample.temp = gpu["temp"]
+                    sample.mem_used = gpu["mem_used"] / 1024
+                    sample.mem_total = gpu["mem_total"] / 1024
+                    sample.name = gpu["name"]
+                    sample.driver = gpu["driver"]
+                    publish("gpu", {"load": sample.load, "memory": sample.memory_percent, "temp": sample.temp}, ts)
+                    if self.samples.commit():
+                        self.samples_ready.emit()
+            if collector.stale != stale:
+                stale = collector.stale
+                self.stale_changed.emit(stale, collector.last_error or "no data yet")
+        collector.close()
 
     def stop(self):
         self.running = False
@@ -37,8 +59,12 @@ class GPUMonitorWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
 
-        self.gpu_usage_data = [0] * 60
-        self.gpu_mem_data = [0] * 60
+        self.window = DEFAULT_WINDOW
+        self.render = RenderThrottle()
+        self.gpu_history = PlotHistory('gpu.load')
+        self.gpu_mem_history = PlotHistory('gpu.memory')
+        self.gpu_history.seed_from_archive(get_archive())
+        self.gpu_mem_history.seed_from_archive(get_archive())
 
         layout = QGridLayout(self)
 
@@ -88,11 +114,12 @@ class GPUMonitorWidget(QWidget):
         bottom_label_layout.addWidget(self.bottom_left_label, alignment=Qt.AlignLeft)
         bottom_label_layout.addWidget(self.bottom_right_label, alignment=Qt.AlignRight)
         layout.addLayout(bottom_label_layout, 3, 0, 1, 2)
+        self.window_labels = [self.bottom_left_label]
 
         top_labels_layout = QHBoxLayout()
         self.top_left_label = QLabel("GPU memory usage")
         self.top_left_label.setStyleSheet("color: white; font-size: 8pt;")
-        self.top_right_label = QLabel(str(GPUtil.getGPUs()[0].memoryTotal/1024)+" GB")
+        self.top_right_label = QLabel("-- GB")
         self.top_right_label.setStyleSheet("color: white; font-size: 8pt;")
         top_labels_layout.addWidget(self.top_left_label, alignment=Qt.AlignLeft)
         top_labels_layout.addWidget(self.top_right_label, alignment=Qt.AlignRight)
@@ -122,13 +149,18 @@ class GPUMonitorWidget(QWidget):
         bottom_label_layout.addWidget(self.bottom_left_label, alignment=Qt.AlignLeft)
         bottom_label_layout.addWidget(self.bottom_right_label, alignment=Qt.AlignRight)
         layout.addLayout(bottom_label_layout, 6, 0, 1, 2)
+        self.window_labels.append(self.bottom_left_label)
 
         # Details label
-        self.details_label = QLabel()
-        self.details_label.setStyleSheet("color: #E0E0E0; font-size: 10pt;")
-        self.details_label.setWordWrap(True)
+        self.details_label = DetailsPanel(['load', 'temp', 'memory', 'driver', 'load_percentiles', 'temp_percentiles'])
         layout.addWidget(self.details_label, 7, 0, 1, 2)
 
+        # Shown while the GPU collector process is hung or restarting
+        self.stale_label = QLabel()
+        self.stale_label.setStyleSheet("color: #FF6347; font-size: 10pt;")
+        self.stale_label.hide()
+        layout.addWidget(self.stale_label, 8, 0, 1, 2)
+
         layout.setRowStretch(0, 0)
         layout.setRowStretch(1, 0)
         layout.setRowStretch(2, 10)
@@ -137,28 +169,58 @@ class GPUMonitorWidget(QWidget):
         layout.setRowStretch(5, 5)
         layout.setRowStretch(6, 0)
         layout.setRowStretch(7, 0)
+        layout.setRowStretch(8, 0)
+
+        self.plots = [self.gpu_plot, self.gpu_mem_plot]
+        self.set_window(DEFAULT_WINDOW)
 
         # Worker
         self.worker = GPUWorker()
-        self.worker.gpu_data_updated.connect(self.update_graph_and_info)
+        self.worker.samples_ready.connect(self.update_graph_and_info)
+        self.worker.stale_changed.connect(self.show_stale)
         self.worker.start()
 
-    def update_graph_and_info(self, load, mem_percent, details):
-        self.gpu_usage_data = self.gpu_usage_data[1:] + [load]
-        self.gpu_mem_data = self.gpu_mem_data[1:] + [mem_percent]
-
-        self.gpu_curve.setData(self.gpu_usage_data)
-        self.gpu_mem_curve.setData(self.gpu_mem_data)
-
-        self.right_label.setText(details["name"])
-
-        details_str = (
-            f"<b>Load:</b> {details['load']:.2f}%<br>"
-            f"<b>Temperature:</b> {details['temp']}°C<br>"
-            f"<b>Memory Used:</b> {details['mem_used']} / {details['mem_total']} GB<br>"
-            f"<b>Driver:</b> {details['driver']}"
-        )
-        self.details_label.setText(details_str)
+    def set_window(self, window):
+        self.window = window
+        for label in self.window_labels:
+            label.setText(WINDOW_LABELS[window])
+        for plot in self.plots:
+            plot.setXRange(-window_seconds(window), 0, padding=0)
+        self.redraw()
+
+    def redraw(self):
+        self.gpu_curve.setData(*self.gpu_history.points(self.window))
+        self.gpu_mem_curve.setData(*self.gpu_mem_history.points(self.window))
+
+    def update_graph_and_info(self):
+        samples = self.worker.samples.drain()
+        if not samples:
+            return
+        for sample in samples:
+            self.gpu_history.add(sample.load, sample.ts)
+            self.gpu_mem_history.add(sample.memory_percent, sample.ts)
+        if self.render.due():
+            self.redraw()
+
+        sample = samples[-1]
+        if self.right_label.text() != sample.name:
+            self.right_label.setText(sample.name)
+        memory_total = f"{sample.mem_total} GB"
+        if self.top_right_label.text() != memory_total:
+            self.top_right_label.setText(memory_total)
+
+        details = self.details_label
+        details.set_value('load', round(sample.load, 2), "<b>Load:</b> {:.2f}%")
+        details.set_value('temp', sample.temp, "<b>Temperature:</b> {}°C")
+        details.set_value('memory', (sample.mem_used, sample.mem_total),
+                          lambda v: f"<b>Memory Used:</b> {v[0]} / {v[1]} GB")
+        details.set_value('driver', sample.driver, "<b>Driver:</b> {}")
+        details.set_line('load_percentiles', percentile_text('gpu.load', 'Load', '%'))
+        details.set_line('temp_percentiles', percentile_text('gpu.temp', 'Temperature', '°C', '{:.0f}'))
+
+    def show_stale(self, stale, reason):
+        self.stale_label.setText(f"Data stale ({reason}); restarting GPU collector...")
+        self.stale_label.setVisible(stale)
 
     def closeEvent(self, event):
         self.worker.stop()
@@ -1,88 +1,174 @@
-import psutil
+import os
 import time
-import wmi
-import subprocess
 from PyQt5.QtCore import QObject, QThread, pyqtSignal, Qt
 from PyQt5.QtWidgets import QWidget, QLabel, QGridLayout, QHBoxLayout
 import pyqtgraph as pg
 
+from monitor_core.procfs import get_reader
+from monitor_core.metrics import publish, percentile_text
+from monitor_core.decimate import PlotHistory, DEFAULT_WINDOW, WINDOW_LABELS, window_seconds
+from monitor_core.archive import get_archive
+from monitor_core import netlink
+from monitor_core.net_attribution import NetworkAttribution
+from monitor_core.supervisor import SupervisedCollector
+from monitor_core.sampling import net_io_counters
+from monitor_core.samples import NetworkSample, SampleRing
+from monitor_core.net_health import NetHealth
+from monitor_core.journal import record_alert
+from monitor_core.budget import sampling_scale, Pacer, RenderThrottle
+from system_monitor.details_panel import DetailsPanel
+
+
+def format_speed(speed_kbps):
+    if speed_kbps < 1000:
+        return f"{int(speed_kbps)} Kbps"
+    elif speed_kbps < 1024 * 1000:
+        return f"{int(speed_kbps / 1024)} Mbps"
+    else:
+        return f"{speed_kbps / (1024 * 8):.2f} MB/s"
+
+
+class LinkMonitorThread(QThread):
+    link_changed = pyqtSignal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.running = True
+        self.watcher = netlink.LinkWatcher(timeout=1.0)
+
+    def link_info(self, events):
+        link = self.watcher.primary_link()
+        if link is None:
+            return {
+                'adapter': "No Active Adapter", 'type': "Unknown", 'state': "down",
+                'mac': "N/A", 'addresses': "N/A", 'events': events,
+            }
+        return {
+            'adapter': link['name'],
+            'type': self.watcher.connection_type(link['name']),
+            'state': link['state'],
+            'mac': link['mac'] or "N/A",
+            'addresses': ", ".join(link['addresses']) or "N/A",
+            'events': events,
+        }
+
+    def run(self):
+        self.link_changed.emit(self.link_info([]))
+        while self.running:
+            events = self.watcher.read_events()
+            if events:
+                self.link_changed.emit(self.link_info(events))
+        self.watcher.close()
+
+    def stop(self):
+        self.running = False
+        self.wait()
+
+
+class TopTalkersThread(QThread):
+    talkers_updated = pyqtSignal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.running = True
+        self.attribution = NetworkAttribution(top_n=5)
+        self.pacer = Pacer(1.0)
+
+    def run(self):
+        while self.running:
+            if self.pacer.due():
+                try:
+                    self.talkers_updated.emit(self.attribution.sample())
+                except OSError as e:
+                    print(f"[ERROR] Failed to attribute network traffic: {e}")
+            self.msleep(1000)
+        self.attribution.close()
+
+    def stop(self):
+        self.running = False
+        self.wait()
+
 
 class NetworkWorker(QObject):
-    data_ready = pyqtSignal(float, float, str, str, str, str)
+    samples_ready = pyqtSignal()
+    health_alert = pyqtSignal(str)
     finished = pyqtSignal()
 
-    def __init__(self):
+    def __init__(self, poll_metadata=True):
         super().__init__()
         self.running = True
-        self.prev_net = psutil.net_io_counters()
+        # Adapter identity is polled through WMI/netsh only where no
+        # event source is available; on Linux it is pushed via netlink.
+        self.poll_metadata = poll_metadata
+        self.reader = get_reader()
+        self.prev_net = net_io_counters(self.reader)
         self.prev_time = time.time()
         self.adapter_name = "Detecting..."
         self.connection_type = "Detecting..."
         self.ssid = "Detecting..."
         self.bssid = "Detecting..."
-        self.last_ssid_update = 0
-
-    def get_network_info(self):
-        try:
-            w = wmi.WMI()
-            for nic in w.Win32_NetworkAdapterConfiguration(IPEnabled=True):
-                adapter_name = nic.Description
-                lower_name = adapter_name.lower()
-
-                # Broaden detection of Wi-Fi keywords
-                if "wireless" in lower_name or "wi-fi" in lower_name or "802.11" in lower_name:
-                    connection_type = "Wi-Fi"
-                    ssid = self.get_wifi_ssid()["SSID"]
-                    bssid = self.get_wifi_ssid()["BSSID"]
-                else:
-                    connection_type = "Ethernet"
-                    ssid = "N/A"
-                    bssid = "N/A"
-
-                # Only return info for the first active/connected adapter
-                return adapter_name, connection_type, ssid, bssid
-
-            return "No Active Adapter", "Unknown", "N/A", "N/A"
-
-        except Exception as e:
-            print(f"[ERROR] Failed to get network info: {e}")
-            return "Unknown Adapter", "Unknown", "N/A", "N/A"
-
-
-    def get_wifi_ssid(self):
-        try:
-            output = subprocess.check_output("netsh wlan show interfaces", shell=True).decode(errors="ignore")
-            ssid = None
-            bssid = None
-            for line in output.splitlines():
-                if "SSID" in line and "BSSID" not in line:
-                    ssid = line.split(":", 1)[1].strip()
-                elif "BSSID" in line:
-                    bssid = line.split(":",1)[1].strip()
-            return {"SSID": ssid if ssid else "Not Connected", "BSSID": bssid if bssid else "Unknown"}
-        except Exception as e:
-            print(f"[ERROR] Failed to get SSID: {e}")
-            return {"SSID": "Unknown", "BSSID": "Unknown"}
+        self.metadata = None
+        self.samples = SampleRing(NetworkSample)
+        # TCP/UDP counters (Linux); sampled in the same tick as throughput
+        self.health = NetHealth(self.reader) if NetHealth.available(self.reader) else None
+        self.health_alerting = False
+
+    def check_health(self, sample):
+        for metric, message in self.health.check_alerts(sample):
+            record_alert('network', message, metric=metric)
+            self.health_alert.emit(message)
+        alerting = bool(self.health.active)
+        if self.health_alerting and not alerting:
+            self.health_alert.emit("")
+        self.health_alerting = alerting
+
+    def poll_network_info(self):
+        # WMI and netsh run in a supervised child process every 10 s, so a
+        # stuck query can never stall the throughput updates
+        if self.metadata is None:
+            self.metadata = SupervisedCollector("monitor_core.collectors:network_info", interval=10, deadline=15)
+        for ts, info in self.metadata.poll():
+            self.adapter_name, self.connection_type, self.ssid, self.bssid = info
+        if self.metadata.stale:
+            return f"{self.adapter_name} (stale: {self.metadata.last_error or 'no response'})"
+        return self.adapter_name
 
     def run(self):
         while self.running:
-            curr_net = psutil.net_io_counters()
+            curr_net = net_io_counters(self.reader)
             interval = time.time() - self.prev_time
 
-            upload = (curr_net.bytes_sent - self.prev_net.bytes_sent) / interval / 1024 * 8 if interval > 0 else 0
-            download = (curr_net.bytes_recv - self.prev_net.bytes_recv) / interval / 1024 * 8 if interval > 0 else 0
+            upload = (curr_net[0] - self.prev_net[0]) / interval / 1024 * 8 if interval > 0 else 0
+            download = (curr_net[1] - self.prev_net[1]) / interval / 1024 * 8 if interval > 0 else 0
 
             self.prev_net = curr_net
             self.prev_time = time.time()
 
-            now = time.time()
-            if now - self.last_ssid_update > 10:
-                self.adapter_name, self.connection_type, self.ssid, self.bssid = self.get_network_info()
-                self.last_ssid_update = now
-
-            self.data_ready.emit(upload, download, self.adapter_name, self.connection_type, self.ssid, self.bssid)
-            time.sleep(1)
-
+            adapter_name = self.poll_network_info() if self.poll_metadata else self.adapter_name
+
+            sample = self.samples.acquire()
+            sample.ts = self.prev_time
+            sample.upload = upload
+            sample.download = download
+            sample.adapter = adapter_name
+            sample.connection_type = self.connection_type
+            sample.ssid = self.ssid
+            sample.bssid = self.bssid
+            values = {"upload": upload, "download": download}
+            if self.health:
+                self.health.fill(sample, interval if interval > 0 else 1)
+                self.check_health(sample)
+                values.update(self.health.publish_values(sample))
+            publish("network", values, self.prev_time)
+            if self.samples.commit():
+                self.samples_ready.emit()
+            for _ in range(sampling_scale()):
+                if not self.running:
+                    break
+                time.sleep(1)
+
+        if self.metadata:
+            self.metadata.close()
         self.finished.emit()
 
 
@@ -133,6 +219,7 @@ class NetworkMonitorWidget(QWidget):
         x_label_layout.addWidget(self.left_label, alignment=Qt.AlignLeft)
         x_label_layout.addWidget(self.right_label, alignment=Qt.AlignRight)
         layout.addLayout(x_label_layout, 3, 0, 1, 2)
+        self.window_labels = [self.left_label]
 
         # Upload Label
         upload_label = QHBoxLayout()
@@ -165,12 +252,61 @@ class NetworkMonitorWidget(QWidget):
         x_label_layout.addWidget(self.left_label, alignment=Qt.AlignLeft)
         x_label_layout.addWidget(self.right_label, alignment=Qt.AlignRight)
         layout.addLayout(x_label_layout, 6, 0, 1, 2)
+        self.window_labels.append(self.left_label)
+
+        # TCP/UDP health Label
+        health_label = QHBoxLayout()
+        self.health_left_label = QLabel("TCP/UDP health (retransmits / resets / drops per sec)")
+        self.health_left_label.setStyleSheet("color: white; font-size: 8pt;")
+        self.health_right_label = QLabel()
+        self.health_right_label.setStyleSheet("color: white; font-size: 8pt;")
+        health_label.addWidget(self.health_left_label, alignment=Qt.AlignLeft)
+        health_label.addWidget(self.health_right_label, alignment=Qt.AlignRight)
+        layout.addLayout(health_label, 7, 0, 1, 2)
+
+        # TCP/UDP health Plot
+        self.health_plot = pg.PlotWidget()
+        self.health_plot.setBackground('#1C1C1C')
+        self.health_plot.getPlotItem().showGrid(x=True, y=True, alpha=0.7)
+        for axis in ['bottom', 'left', 'top', 'right']:
+            self.health_plot.getPlotItem().showAxis(axis, True)
+            self.health_plot.getPlotItem().getAxis(axis).setTicks([])
+        self.health_plot.getPlotItem().hideButtons()
+        self.health_plot.setMouseEnabled(x=False, y=False)
+        self.retrans_curve = self.health_plot.plot(pen=pg.mkPen('#FFD700', width=2))
+        self.resets_curve = self.health_plot.plot(pen=pg.mkPen('#FF69B4', width=2))
+        self.drops_curve = self.health_plot.plot(pen=pg.mkPen('#FF4500', width=2))
+        self.health_plot.setMinimumHeight(120)
+        layout.addWidget(self.health_plot, 8, 0, 1, 2)
+
+        x_label_layout = QHBoxLayout()
+        self.left_label = QLabel("60 seconds")
+        self.left_label.setStyleSheet("color: #E0E0E0; font-size: 8pt;")
+        self.right_label = QLabel("0")
+        self.right_label.setStyleSheet("color: #E0E0E0; font-size: 8pt;")
+        x_label_layout.addWidget(self.left_label, alignment=Qt.AlignLeft)
+        x_label_layout.addWidget(self.right_label, alignment=Qt.AlignRight)
+        layout.addLayout(x_label_layout, 9, 0, 1, 2)
+        self.window_labels.append(self.left_label)
+
+        # Health alert label (hidden until a TCP/UDP alert fires)
+        self.alert_label = QLabel()
+        self.alert_label.setStyleSheet("color: #FF4500; font-size: 10pt; font-weight: bold;")
+        self.alert_label.setWordWrap(True)
+        self.alert_label.hide()
+        layout.addWidget(self.alert_label, 10, 0, 1, 2)
 
         # Detail label
-        self.details_label = QLabel()
-        self.details_label.setStyleSheet("color: #E0E0E0; font-size: 10pt;")
-        self.details_label.setWordWrap(True)
-        layout.addWidget(self.details_label, 7, 0, 1, 2)
+        self.details_label = DetailsPanel(['upload', 'download', 'type', 'link', 'name', 'address', 'mac',
+                                           'download_percentiles', 'upload_percentiles', 'tcp', 'udp',
+                                           'retrans_percentiles', 'events'])
+        layout.addWidget(self.details_label, 11, 0, 1, 2)
+
+        # Per-process attribution (Linux)
+        self.talkers_label = QLabel()
+        self.talkers_label.setStyleSheet("color: #E0E0E0; font-size: 9pt;")
+        self.talkers_label.setWordWrap(True)
+        layout.addWidget(self.talkers_label, 12, 0, 1, 2)
 
         layout.setRowStretch(0, 0)
         layout.setRowStretch(1, 0)
@@ -180,51 +316,191 @@ class NetworkMonitorWidget(QWidget):
         layout.setRowStretch(5, 4)
         layout.setRowStretch(6, 0)
         layout.setRowStretch(7, 0)
+        layout.setRowStretch(8, 3)
+        for row in range(9, 13):
+            layout.setRowStretch(row, 0)
 
         # Initialize data
-        self.upload_data = [0] * 60
-        self.download_data = [0] * 60
+        self.window = DEFAULT_WINDOW
+        self.render = RenderThrottle()
+        self.upload_history = PlotHistory('network.upload')
+        self.download_history = PlotHistory('network.download')
+        self.retrans_history = PlotHistory('network.tcp_retrans')
+        self.resets_history = PlotHistory('network.tcp_resets')
+        self.drops_history = PlotHistory('network.drops')  # listen queue + UDP receive drops
+        for history in (self.upload_history, self.download_history, self.retrans_history, self.resets_history,
+                        self.drops_history):
+            history.seed_from_archive(get_archive())
+        self.plots = [self.download_plot, self.upload_plot, self.health_plot]
+        self.set_window(DEFAULT_WINDOW)
+
+        # Link change events (Linux): replaces periodic adapter polling
+        self.link_thread = None
+        if netlink.available():
+            try:
+                self.link_thread = LinkMonitorThread()
+            except OSError as e:
+                print(f"[ERROR] Failed to subscribe to link events: {e}")
 
         # Worker thread setup
         self.thread = QThread()
-        self.worker = NetworkWorker()
+        self.thread.setObjectName("NetworkWorker")
+        self.worker = NetworkWorker(poll_metadata=self.link_thread is None)
         self.worker.moveToThread(self.thread)
-        self.worker.data_ready.connect(self.update_display)
+        self.worker.samples_ready.connect(self.update_display)
+        self.worker.health_alert.connect(self.show_health_alert)
+        if self.worker.health is None:
+            self.health_right_label.setText("unavailable")
+            self.health_plot.hide()
         self.thread.started.connect(self.worker.run)
         self.thread.start()
 
-    def update_display(self, upload, download, adapter_name, connection_type, ssid, bssid):
-        self.upload_data = self.upload_data[1:] + [upload]
-        self.download_data = self.download_data[1:] + [download]
-
-        self.upload_curve.setData(self.upload_data)
-        self.download_curve.setData(self.download_data)
-
-        def format_speed(speed_kbps):
-            if speed_kbps < 1000:
-                return f"{int(speed_kbps)} Kbps"
-            elif speed_kbps < 1024 * 1000:
-                return f"{int(speed_kbps / 1024)} Mbps"
-            else:
-                return f"{speed_kbps / (1024 * 8):.2f} MB/s"
-
-        upload_label = format_speed(upload)
-        download_label = format_speed(download)
-
-        self.upload_right_label.setText(upload_label)
-        self.download_right_label.setText(download_label)
+        self.link_info = None
+        self.link_events = []
+        if self.link_thread:
+            self.link_thread.link_changed.connect(self.update_link)
+            self.link_thread.start()
+
+        self.talkers_thread = None
+        if os.path.exists("/proc/net/tcp"):
+            self.talkers_thread = TopTalkersThread()
+            self.talkers_thread.talkers_updated.connect(self.update_talkers)
+            self.talkers_thread.start()
+        else:
+            self.talkers_label.hide()
+
+    def update_link(self, info):
+        self.link_info = info
+        self.link_events = (self.link_events + info['events'])[-3:]
+        self.top_left_label.setText(info['type'] if info['type'] != "Unknown" else "Network Adapter")
+        self.top_right_label.setText(f"{info['adapter']} ({info['state']})")
+        self.show_link_details(self.upload_right_label.text(), self.download_right_label.text())
+
+    def set_window(self, window):
+        self.window = window
+        for label in self.window_labels:
+            label.setText(WINDOW_LABELS[window])
+        for plot in self.plots:
+            plot.setXRange(-window_seconds(window), 0, padding=0)
+        self.redraw()
+
+    def redraw(self):
+        self.upload_curve.setData(*self.upload_history.points(self.window))
+        self.download_curve.setData(*self.download_history.points(self.window))
+        self.retrans_curve.setData(*self.retrans_history.points(self.window))
+        self.resets_curve.setData(*self.resets_history.points(self.window))
+        self.drops_curve.setData(*self.drops_history.points(self.window))
+
+    def update_display(self):
+        samples = self.worker.samples.drain()
+        if not samples:
+            return
+        for sample in samples:
+            self.upload_history.add(sample.upload, sample.ts)
+            self.download_history.add(sample.download, sample.ts)
+            if sample.tcp_retrans is not None:
+                self.retrans_history.add(sample.tcp_retrans, sample.ts)
+                self.resets_history.add(sample.tcp_resets, sample.ts)
+                self.drops_history.add(sample.listen_drops + sample.udp_drops, sample.ts)
+        if self.render.due():
+            self.redraw()
+
+        sample = samples[-1]
+        if sample.tcp_retrans is not None:
+            self.show_health(sample)
+        upload_label = format_speed(sample.upload)
+        download_label = format_speed(sample.download)
+        if self.upload_right_label.text() != upload_label:
+            self.upload_right_label.setText(upload_label)
+        if self.download_right_label.text() != download_label:
+            self.download_right_label.setText(download_label)
+
+        if self.link_info:
+            self.show_link_details(upload_label, download_label)
+            return
+
+        connection_type = sample.connection_type
         self.top_left_label.setText(connection_type if connection_type != "Unknown" else "Network Adapter")
-        self.top_right_label.setText(adapter_name)
-
-        self.details_label.setText(
-            f"<b>Upload:</b> {upload_label}<br>"
-            f"<b>Download:</b> {download_label}<br>"
-            f"<b>Type:</b> {connection_type}<br>"
-            f"<b>Name:</b> {ssid}<br>"
-            f"<b>MAC Address:</b> {bssid}"
-        )
+        self.top_right_label.setText(sample.adapter)
+
+        details = self.details_label
+        details.set_line('upload', f"<b>Upload:</b> {upload_label}")
+        details.set_line('download', f"<b>Download:</b> {download_label}")
+        details.set_value('type', connection_type, "<b>Type:</b> {}")
+        details.set_value('name', sample.ssid, "<b>Name:</b> {}")
+        details.set_value('mac', sample.bssid, "<b>MAC Address:</b> {}")
+        self.show_rate_percentiles()
+
+    def show_health(self, sample):
+        rates = f"{sample.tcp_retrans:.0f} / {sample.tcp_resets:.0f} / {sample.listen_drops + sample.udp_drops:.0f}"
+        if self.health_right_label.text() != rates:
+            self.health_right_label.setText(rates)
+        details = self.details_label
+        details.set_value('tcp', (sample.tcp_estab, sample.tcp_tw, sample.tcp_orphan, round(sample.tcp_retrans, 1),
+                                  round(sample.tcp_retrans_pct, 2), round(sample.tcp_resets, 1),
+                                  round(sample.tcp_attempt_fails, 1), round(sample.listen_overflows, 1)),
+                          lambda v: (f"<b>TCP:</b> {v[0]:.0f} established, {v[1]:.0f} time-wait, {v[2]:.0f} orphaned"
+                                     f" &middot; retransmits {v[3]:.1f}/s ({v[4]:.2f}%) &middot; resets {v[5]:.1f}/s"
+                                     f" &middot; failed connects {v[6]:.1f}/s &middot; listen overflows {v[7]:.1f}/s"))
+        details.set_value('udp', (sample.udp_inuse, round(sample.udp_drops, 1), round(sample.udp_rcvbuf_errors, 1),
+                                  round(sample.udp_noports, 1)),
+                          lambda v: (f"<b>UDP:</b> {v[0]:.0f} sockets &middot; receive errors {v[1]:.1f}/s"
+                                     f" (buffer full {v[2]:.1f}/s) &middot; no port {v[3]:.1f}/s"))
+        details.set_line('retrans_percentiles',
+                         percentile_text('network.tcp_retrans_pct', 'Retransmitted', '%', '{:.2f}'))
+
+    def show_health_alert(self, message):
+        if message:
+            self.alert_label.setText(f"⚠️ {message}")
+            self.alert_label.show()
+        else:
+            self.alert_label.hide()
+
+    def update_talkers(self, result):
+        def format_rate(bytes_per_sec):
+            if bytes_per_sec < 1024 * 1024:
+                return f"{bytes_per_sec / 1024:.1f} KB/s"
+            return f"{bytes_per_sec / (1024 * 1024):.2f} MB/s"
+
+        rows = [f"<b>Top talkers</b> ({result['sockets']} sockets)"]
+        for talker in result['talkers']:
+            pid = talker['pid'] if talker['pid'] is not None else "-"
+            rows.append(
+                f"{talker['name']} (PID {pid}): &uarr; {format_rate(talker['sent'])}"
+                f" &darr; {format_rate(talker['recv'])}, {talker['sockets']} sockets"
+            )
+        for conn in result['connections'][:3]:
+            rows.append(
+                f"&nbsp;&nbsp;{conn['proto']} {conn['local']} &rarr; {conn['remote']}"
+                f" ({format_rate(conn['sent'] + conn['recv'])})"
+            )
+        self.talkers_label.setText("<br>".join(rows))
+
+    def show_rate_percentiles(self):
+        self.details_label.set_line('download_percentiles',
+                                    percentile_text('network.download', 'Download', ' Kbps', '{:.0f}'))
+        self.details_label.set_line('upload_percentiles',
+                                    percentile_text('network.upload', 'Upload', ' Kbps', '{:.0f}'))
+
+    def show_link_details(self, upload_label, download_label):
+        info = self.link_info
+        details = self.details_label
+        details.set_line('upload', f"<b>Upload:</b> {upload_label}")
+        details.set_line('download', f"<b>Download:</b> {download_label}")
+        details.set_value('type', info['type'], "<b>Type:</b> {}")
+        details.set_value('link', info['state'], "<b>Link:</b> {}")
+        details.set_value('name', None, "")
+        details.set_value('address', info['addresses'], "<b>IP Address:</b> {}")
+        details.set_value('mac', info['mac'], "<b>MAC Address:</b> {}")
+        self.show_rate_percentiles()
+        if self.link_events:
+            details.set_line('events', f"<b>Recent changes:</b> {'; '.join(self.link_events)}")
 
     def closeEvent(self, event):
+        if self.link_thread:
+            self.link_thread.stop()
+        if self.talkers_thread:
+            self.talkers_thread.stop()
         self.worker.running = False
         self.thread.quit()
         self.thread.wait()
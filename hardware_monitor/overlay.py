@@ -1,55 +1,110 @@
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QFrame, QGraphicsDropShadowEffect,
-    QPushButton, QHBoxLayout, QLabel
+    QWidget, QVBoxLayout, QFrame, QPushButton, QHBoxLayout, QLabel, QComboBox,
+    QListWidget, QListWidgetItem, QScrollArea, QLineEdit,
+    QGraphicsScene, QGraphicsPixmapItem, QGraphicsBlurEffect
 )
-from PyQt5.QtCore import Qt, QEasingCurve, QRect, QPropertyAnimation, QTimer
-from PyQt5.QtGui import QColor
-import psutil
+from PyQt5.QtCore import (
+    Qt, QPoint, QRectF, QPropertyAnimation, QParallelAnimationGroup, QEasingCurve
+)
+from PyQt5.QtGui import QColor, QPainter, QPainterPath, QPen, QPixmap, QImage
+import time
+
+from monitor_core.journal import record_alert, get_journal
+from monitor_core.snapshot import format_snapshot
+from monitor_core.process_tree import format_groups, PROCESS_ALERT
+from monitor_core.budget import hold_rendering, release_rendering
+
+# The notifications panel: the alert journal with filters and paging, the
+# snapshot of the selected alert, and the per-process CPU/memory check that
+# journals single processes over PROCESS_ALERT. The check scans nothing
+# itself: it runs on the CPU worker's process walk, whose memory figures
+# are the Memory worker's PSS reads.
+#
+# The frosted-glass chrome (translucent sheet, cyan border and glow) is
+# painted once into a pixmap by render_chrome(); the one blur it needs runs
+# there, off screen, instead of QGraphicsEffects re-rendering the panel and
+# everything in it on every repaint. While the panel slides in or out, the
+# whole panel is drawn from a snapshot pixmap with the live widgets hidden,
+# so each frame is one pixmap blit, and the plots behind it skip their
+# redraws until the animation ends.
+
+ALERT_PAGE_SIZE = 50
+ALL_METRICS = "All metrics"
+CLEARED = "Since clear"
+ALERT_KINDS = {"All alerts": None, "Anomalies": "anomaly", "Memory pressure": "pressure",
+               "Sensors": "sensor", "Processes": "process", "Network": "network", "Monitor overhead": "overhead"}
+TIME_FILTERS = {"All": None, "Last hour": 3600, "Last 24 hours": 86400, CLEARED: 'cleared'}
+
+ANIMATION_MS = 500
+GLOW = 16           # px around the panel kept for the glow
+GLOW_RADIUS = 24
+CORNER_RADIUS = 18
+ACCENT = QColor(0, 206, 209)
+
+
+def blurred(image, radius):
+    # One off-screen pass of QGraphicsBlurEffect over an image
+    scene = QGraphicsScene()
+    item = QGraphicsPixmapItem(QPixmap.fromImage(image))
+    effect = QGraphicsBlurEffect()
+    effect.setBlurRadius(radius)
+    effect.setBlurHints(QGraphicsBlurEffect.QualityHint)
+    item.setGraphicsEffect(effect)
+    scene.addItem(item)
+    result = QImage(image.size(), QImage.Format_ARGB32_Premultiplied)
+    result.fill(Qt.transparent)
+    painter = QPainter(result)
+    scene.render(painter, QRectF(result.rect()), QRectF(image.rect()))
+    painter.end()
+    return result
 
 
 class Overlay(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent_window = parent
-        self.setWindowFlags(Qt.FramelessWindowHint)
+        self.setWindowFlags(Qt.FramelessWindowHint | Qt.Tool)
         self.setAttribute(Qt.WA_TranslucentBackground)
 
         self.full_width = 500
         self.full_height = 600
         self.setFixedSize(self.full_width, self.full_height)
+        self.chrome = None      # cached frame, built on first paint
+        self.snapshot = None    # whole panel while animating
+        self.animation = None
+        self.closing = False    # sliding out; a click on the button brings it back
 
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(10, 10, 10, 10)
-
-        # Container
+        # Live widgets; the frame behind them is painted by paintEvent
         self.container = QFrame(self)
+        self.container.setObjectName("overlayPanel")
+        self.container.setGeometry(GLOW, GLOW, self.full_width - 2 * GLOW, self.full_height - 2 * GLOW)
         self.container.setStyleSheet("""
             QFrame {
-                background-color: #2D2D2D;
+                background-color: rgba(40, 40, 40, 200);
+                border-radius: 18px;
                 border: 2px solid #00CED1;
-                border-radius: 10px;
+            }
+            QFrame#overlayPanel {
+                background-color: transparent;
+                border: none;
             }
         """)
-        self.container.setGeometry(0, 0, self.full_width, self.full_height)
-
-        # Glow Effect
-        glow = QGraphicsDropShadowEffect(self)
-        glow.setBlurRadius(30)
-        glow.setOffset(0, 0)
-        glow.setColor(QColor(0, 206, 209, 160))
-        self.container.setGraphicsEffect(glow)
 
+        # Layout inside container
         container_layout = QVBoxLayout(self.container)
+        container_layout.setContentsMargins(12, 12, 12, 12)
 
-        # Close Button
+        # Close button
+        close_btn_layout = QHBoxLayout()
+        close_btn_layout.addStretch()
         close_btn = QPushButton("✖")
-        close_btn.setFixedSize(24, 24)
+        close_btn.setFixedSize(26, 26)
         close_btn.clicked.connect(self.animate_hide)
         close_btn.setStyleSheet("""
             QPushButton {
                 background-color: #00CED1;
                 color: black;
-                border-radius: 12px;
+                border-radius: 13px;
                 font-weight: bold;
             }
             QPushButton:hover {
@@ -57,85 +112,205 @@ class Overlay(QWidget):
                 color: white;
             }
         """)
-        close_layout = QHBoxLayout()
-        close_layout.addStretch()
-        close_layout.addWidget(close_btn)
-        container_layout.addLayout(close_layout)
+        close_btn_layout.addWidget(close_btn)
+        container_layout.addLayout(close_btn_layout)
 
         # Title
-        container_layout.addWidget(QLabel("🤖 AI Module Panel"))
+        self.title_label = QLabel("No new notifications")
+        self.title_label.setAlignment(Qt.AlignCenter)
+        self.title_label.setStyleSheet("font-size: 18px; font-weight: bold;")
+        container_layout.addWidget(self.title_label)
+
+        # Busiest process trees from the last process check
+        self.process_label = QLabel()
+        self.process_label.setStyleSheet("color: #E0E0E0; font-size: 9pt; border: none;")
+        self.process_label.setWordWrap(True)
+        self.process_label.hide()
+        container_layout.addWidget(self.process_label)
+
+        # Filters over the alert journal
+        filter_layout = QHBoxLayout()
+        self.kind_filter = QComboBox()
+        self.kind_filter.addItems(list(ALERT_KINDS))
+        self.kind_filter.currentTextChanged.connect(self.filters_changed)
+        filter_layout.addWidget(self.kind_filter)
+        self.metric_filter = QComboBox()
+        self.metric_filter.addItem(ALL_METRICS)
+        self.metric_filter.currentTextChanged.connect(self.filters_changed)
+        filter_layout.addWidget(self.metric_filter)
+        self.time_filter = QComboBox()
+        self.time_filter.addItems(list(TIME_FILTERS))
+        self.time_filter.currentTextChanged.connect(self.filters_changed)
+        filter_layout.addWidget(self.time_filter)
+        container_layout.addLayout(filter_layout)
+
+        self.process_filter = QLineEdit()
+        self.process_filter.setPlaceholderText("Process name")
+        self.process_filter.editingFinished.connect(self.filters_changed)
+        container_layout.addWidget(self.process_filter)
+
+        # One page of alerts, newest first; selecting one shows its details
+        self.entries = QListWidget()
+        self.entries.setStyleSheet("QListWidget { border: 1px solid #00CED1; border-radius: 6px; }")
+        self.entries.setMinimumHeight(160)
+        self.entries.currentItemChanged.connect(self.show_entry)
+        container_layout.addWidget(self.entries, 1)
+
+        pager_layout = QHBoxLayout()
+        self.prev_button = QPushButton("◀")
+        self.prev_button.setFixedWidth(40)
+        self.prev_button.clicked.connect(lambda: self.go_to_page(self.page - 1))
+        self.next_button = QPushButton("▶")
+        self.next_button.setFixedWidth(40)
+        self.next_button.clicked.connect(lambda: self.go_to_page(self.page + 1))
+        self.page_label = QLabel()
+        self.page_label.setAlignment(Qt.AlignCenter)
+        self.page_label.setStyleSheet("border: none;")
+        pager_layout.addWidget(self.prev_button)
+        pager_layout.addWidget(self.page_label, 1)
+        pager_layout.addWidget(self.next_button)
+        container_layout.addLayout(pager_layout)
+
+        self.snapshot_label = QLabel()
+        self.snapshot_label.setStyleSheet("color: #E0E0E0; font-size: 9pt; border: none;")
+        self.snapshot_label.setWordWrap(True)
+        self.snapshot_label.setAlignment(Qt.AlignTop | Qt.AlignLeft)
+        self.snapshot_scroll = QScrollArea()
+        self.snapshot_scroll.setWidgetResizable(True)
+        self.snapshot_scroll.setStyleSheet("QScrollArea { border: none; }")
+        self.snapshot_scroll.setWidget(self.snapshot_label)
+        container_layout.addWidget(self.snapshot_scroll, 1)
+
+        # Clear hides what has been seen; the journal keeps it ("All")
+        clear_btn = QPushButton("Clear")
+        clear_btn.clicked.connect(self.clear_entries)
+        container_layout.addWidget(clear_btn)
+
+        self.page = 0
+        self.pages = 1
+        self.cleared_at = None
+        self.refresh()
+
+        # Single processes over the limit; groups are raised by the CPU tab
+        self.alerting = set()  # PIDs already journaled while over the limit
+
+    def render_chrome(self):
+        # Glow, translucent sheet and border at the screen's pixel ratio
+        ratio = self.devicePixelRatioF()
+        width, height = self.full_width, self.full_height
+        panel = QRectF(GLOW, GLOW, width - 2 * GLOW, height - 2 * GLOW)
+        path = QPainterPath()
+        path.addRoundedRect(panel, CORNER_RADIUS, CORNER_RADIUS)
+
+        glow = QImage(int(width * ratio), int(height * ratio), QImage.Format_ARGB32_Premultiplied)
+        glow.fill(Qt.transparent)
+        painter = QPainter(glow)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.scale(ratio, ratio)
+        painter.setPen(QPen(QColor(ACCENT.red(), ACCENT.green(), ACCENT.blue(), 200), 6))
+        painter.drawPath(path)
+        painter.end()
+        glow = blurred(glow, GLOW_RADIUS * ratio)
+
+        chrome = QPixmap(glow.size())
+        chrome.fill(Qt.transparent)
+        painter = QPainter(chrome)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.drawImage(0, 0, glow)
+        painter.scale(ratio, ratio)
+        painter.fillPath(path, QColor(255, 255, 255, 25))
+        painter.fillPath(path, QColor(40, 40, 40, 200))
+        painter.setPen(QPen(ACCENT, 2))
+        painter.drawPath(path)
+        painter.end()
+        chrome.setDevicePixelRatio(ratio)
+        return chrome
 
-        # Notification label
-        self.notification_label = QLabel("No new notifications")
-        self.notification_label.setStyleSheet("color: white;")
-        self.notification_label.setWordWrap(True)
-        container_layout.addWidget(self.notification_label)
+    def paintEvent(self, event):
+        if self.chrome is None or self.chrome.devicePixelRatioF() != self.devicePixelRatioF():
+            self.chrome = self.render_chrome()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self.snapshot if self.snapshot is not None else self.chrome)
+        painter.end()
 
-        # Placeholder
-        container_layout.addWidget(QPushButton("AI Placeholder Button"))
+    def take_snapshot(self):
+        if self.chrome is None or self.chrome.devicePixelRatioF() != self.devicePixelRatioF():
+            self.chrome = self.render_chrome()
+        snapshot = QPixmap(self.chrome.size())
+        snapshot.setDevicePixelRatio(self.chrome.devicePixelRatioF())
+        snapshot.fill(Qt.transparent)
+        painter = QPainter(snapshot)
+        painter.drawPixmap(0, 0, self.chrome)
+        self.container.layout().activate()
+        self.container.render(painter, self.container.pos(), flags=QWidget.DrawChildren)
+        painter.end()
+        return snapshot
 
-        # Notification checker timer
-        self.notification_timer = QTimer(self)
-        self.notification_timer.timeout.connect(self.check_high_usage_processes)
-        self.notification_timer.start(5000)  # check every 5 seconds
+    def animate(self, start_pos, end_pos, start_opacity, end_opacity, easing, finished=None):
+        # Slide and fade the snapshot; the live widgets come back at the end
+        if self.animation is not None:
+            self.animation.stop()
+        else:
+            hold_rendering()
+            self.snapshot = self.take_snapshot()
+            self.container.hide()
+        fade = QPropertyAnimation(self, b"windowOpacity")
+        fade.setDuration(ANIMATION_MS)
+        fade.setStartValue(start_opacity)
+        fade.setEndValue(end_opacity)
+        slide = QPropertyAnimation(self, b"pos")
+        slide.setDuration(ANIMATION_MS)
+        slide.setStartValue(start_pos)
+        slide.setEndValue(end_pos)
+        slide.setEasingCurve(easing)
+        self.animation = QParallelAnimationGroup(self)
+        self.animation.addAnimation(fade)
+        self.animation.addAnimation(slide)
+        self.animation.finished.connect(lambda: self.end_animation(finished))
+        self.animation.start()
 
-        self.opacity_anim = None
-        self.resize_anim = None
+    def end_animation(self, finished):
+        self.animation = None
+        self.closing = False
+        self.snapshot = None
+        self.container.show()
+        release_rendering()
+        if finished is not None:
+            finished()
+        self.update()
 
     def snap_to_corner(self):
         if self.parent_window:
             parent_geo = self.parent_window.geometry()
-            new_x = parent_geo.x() + parent_geo.width() - self.full_width - 20
-            new_y = parent_geo.y() + 60
-            self.move(new_x, new_y)
+            self.target_x = parent_geo.x() + parent_geo.width() - self.full_width - 20
+            self.target_y = parent_geo.y() + 60
+        else:
+            self.target_x, self.target_y = self.x(), self.y()
 
     def animate_hide(self):
-        self.opacity_anim = QPropertyAnimation(self, b"windowOpacity")
-        self.opacity_anim.setDuration(500)
-        self.opacity_anim.setStartValue(1.0)
-        self.opacity_anim.setEndValue(0.0)
-
-        self.resize_anim = QPropertyAnimation(self, b"geometry")
-        self.resize_anim.setDuration(500)
-        self.resize_anim.setStartValue(self.geometry())
-        end_rect = QRect(self.x() + self.full_width, self.y(), 0, self.full_height)
-        self.resize_anim.setEndValue(end_rect)
-        self.resize_anim.setEasingCurve(QEasingCurve.InBack)
-
-        self.opacity_anim.finished.connect(self.hide)
-        self.opacity_anim.start()
-        self.resize_anim.start()
+        if not self.isVisible() or self.closing:
+            return
+        self.closing = True
+        self.animate(self.pos(), QPoint(self.x() + self.full_width + 20, self.y()),
+                     self.windowOpacity(), 0.0, QEasingCurve.InBack, finished=self.hide)
 
     def show_with_animation(self):
         self.snap_to_corner()
-        start_rect = QRect(self.x() + self.full_width, self.y(), 0, self.full_height)
-        end_rect = QRect(self.x(), self.y(), self.full_width, self.full_height)
-
-        self.setGeometry(start_rect)
+        if self.closing:
+            # Turn around from wherever the slide-out got to
+            self.closing = False
+            self.animate(self.pos(), QPoint(self.target_x, self.target_y),
+                         self.windowOpacity(), 1.0, QEasingCurve.OutBack)
+            return
+        start = QPoint(self.target_x + self.full_width + 20, self.target_y)
+        self.move(start)
         self.setWindowOpacity(0.0)
+        self.animate(start, QPoint(self.target_x, self.target_y), 0.0, 1.0, QEasingCurve.OutBack)
         self.show()
-        self.raise_()
-        self.activateWindow()
-
-        self.opacity_anim = QPropertyAnimation(self, b"windowOpacity")
-        self.opacity_anim.setDuration(500)
-        self.opacity_anim.setStartValue(0.0)
-        self.opacity_anim.setEndValue(1.0)
-
-        self.resize_anim = QPropertyAnimation(self, b"geometry")
-        self.resize_anim.setDuration(500)
-        self.resize_anim.setStartValue(start_rect)
-        self.resize_anim.setEndValue(end_rect)
-        self.resize_anim.setEasingCurve(QEasingCurve.OutBack)
-
-        self.opacity_anim.start()
-        self.resize_anim.start()
 
     def showEvent(self, event):
-        self.snap_to_corner()
-        self.setWindowOpacity(1.0)
-        self.show_with_animation()
         self.installEventFilter(self.parent_window)
+        super().showEvent(event)
 
     def eventFilter(self, obj, event):
         if event.type() == event.MouseButtonPress:
@@ -143,18 +318,112 @@ class Overlay(QWidget):
                 self.animate_hide()
         return super().eventFilter(obj, event)
 
-    def check_high_usage_processes(self):
-        alerts = []
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent', 'username']):
-            try:
-                info = proc.info
-                if info['username'] and not info['username'].lower().startswith('system'):
-                    if info['cpu_percent'] > 75 or info['memory_percent'] > 75:
-                        alerts.append(f"⚠️ {info['name']} (PID {info['pid']}) is using {info['cpu_percent']:.1f}% CPU / {info['memory_percent']:.1f}% Memory")
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
+    def query(self, page=0, page_size=ALERT_PAGE_SIZE, since=None):
+        journal = get_journal()
+        if journal is None:
+            return 0, []
+        window = TIME_FILTERS[self.time_filter.currentText()]
+        if window == 'cleared':
+            since = max(since or 0, self.cleared_at or 0)
+        elif window:
+            since = max(since or 0, time.time() - window)
+        metric = self.metric_filter.currentText()
+        return journal.query(
+            kind=ALERT_KINDS[self.kind_filter.currentText()],
+            metric=None if metric == ALL_METRICS else metric,
+            process=self.process_filter.text().strip() or None,
+            since=since, page=page, page_size=page_size,
+        )
+
+    def refresh(self):
+        total, rows = self.query(self.page)
+        self.pages = max((total + ALERT_PAGE_SIZE - 1) // ALERT_PAGE_SIZE, 1)
+        if self.page >= self.pages:
+            self.page = self.pages - 1
+            total, rows = self.query(self.page)
+
+        selected = self.entries.currentItem().data(Qt.UserRole) if self.entries.currentItem() else None
+        self.entries.blockSignals(True)
+        self.entries.clear()
+        for row in rows:
+            item = QListWidgetItem(f"⚠️ {time.strftime('%m-%d %H:%M:%S', time.localtime(row['ts']))} "
+                                   f"{row['message'].replace('&rarr;', '→')}")
+            item.setData(Qt.UserRole, row['id'])
+            item.setToolTip(" · ".join(str(v) for v in (row['kind'], row['metric'], row['process']) if v))
+            self.entries.addItem(item)
+            if row['id'] == selected:
+                self.entries.setCurrentItem(item)
+        self.entries.blockSignals(False)
+
+        self.page_label.setText(f"Page {self.page + 1} of {self.pages} ({total} alerts)")
+        self.prev_button.setEnabled(self.page > 0)
+        self.next_button.setEnabled(self.page < self.pages - 1)
+        self.update_title()
 
-        if alerts:
-            self.notification_label.setText('\n\n'.join(alerts))
+    def update_metrics(self):
+        journal = get_journal()
+        known = {self.metric_filter.itemText(i) for i in range(self.metric_filter.count())}
+        for metric in (journal.metrics() if journal else []):
+            if metric not in known:
+                self.metric_filter.addItem(metric)
+
+    def filters_changed(self, *args):
+        self.page = 0
+        self.refresh()
+
+    def go_to_page(self, page):
+        self.page = min(max(page, 0), self.pages - 1)
+        self.refresh()
+
+    def add_alert(self, alert_id):
+        # Stay on an older page if the user is reading it
+        self.update_metrics()
+        if self.page == 0:
+            self.refresh()
         else:
-            self.notification_label.setText("No new notifications")
\ No newline at end of file
+            self.update_title()
+
+    def show_entry(self, item, previous=None):
+        if item is None:
+            self.snapshot_label.setText("")
+            return
+        journal = get_journal()
+        details = journal.details(item.data(Qt.UserRole)) if journal else None
+        if isinstance(details, dict) and 'by_cpu' in details:
+            self.snapshot_label.setText(format_snapshot(details))
+        else:
+            self.snapshot_label.setText(item.text())
+
+    def clear_entries(self):
+        self.cleared_at = time.time()
+        self.time_filter.setCurrentText(CLEARED)
+        self.refresh()
+
+    def update_title(self):
+        # Unseen = alerts since the last Clear, whatever the filters
+        journal = get_journal()
+        count = journal.query(since=self.cleared_at, page_size=0)[0] if journal else 0
+        self.title_label.setText(f"{count} notification{'s' if count != 1 else ''}" if count else "No new notifications")
+        if self.parent_window:
+            self.parent_window.button.setText(f"Notifications ({count})" if count else "Notifications")
+
+    def check_high_usage_processes(self, busy, trees):
+        # Each process is journaled once when it goes over the limit, not on
+        # every check; the journal listener then refreshes the list
+        offending = set()
+        for pid, name, user, cpu, memory_percent in busy:
+            # Candidates are picked by RSS, which counts pages shared with
+            # other processes in full; PSS decides (RSS until it is read)
+            if cpu <= PROCESS_ALERT and memory_percent <= PROCESS_ALERT:
+                continue
+            if user and not user.lower().startswith('system'):
+                offending.add(pid)
+                if pid not in self.alerting:
+                    message = f"{name} (PID {pid}) is using {cpu:.1f}% CPU / {memory_percent:.1f}% Memory"
+                    metric = 'cpu.utilization' if cpu > PROCESS_ALERT else 'memory.percent'
+                    record_alert('process', message, metric=metric, process=name, pid=pid)
+        self.alerting = offending
+
+        groups = format_groups(trees)
+        self.process_label.setText(f"Top process trees: {groups}" if groups else "")
+        self.process_label.setVisible(bool(groups))
@@ -0,0 +1,269 @@
+from PyQt5.QtWidgets import QWidget, QLabel, QGridLayout, QHBoxLayout, QSizePolicy
+from PyQt5.QtCore import QThread, pyqtSignal, Qt
+import pyqtgraph as pg
+
+from monitor_core.metrics import publish, percentile_text
+from monitor_core.decimate import PlotHistory, DEFAULT_WINDOW, WINDOW_LABELS, window_seconds
+from monitor_core.archive import get_archive
+from monitor_core.sensors import SensorCollector, slug
+from monitor_core.journal import record_alert
+from monitor_core.budget import sampling_scale, RenderThrottle
+
+SENSOR_ALERT_CLEAR = 5.0  # deg C below the threshold before a temperature alert re-arms
+CURVE_COLORS = [(255, 99, 71), (255, 140, 0), (0, 206, 209), (0, 255, 127), (186, 85, 211), (255, 215, 0)]
+
+
+class SensorsWorker(QThread):
+    data_updated = pyqtSignal(dict)
+    sensor_alert = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.running = True
+        self.collector = SensorCollector()
+        self.hot = {}  # sensor key -> message, while above its threshold
+
+    def check_thresholds(self, temperatures):
+        changed = False
+        for sensor in temperatures:
+            limit = sensor['crit'] or sensor['high']
+            if sensor['key'] not in self.hot and sensor['value'] >= sensor['high']:
+                kind = "critical" if sensor['crit'] and sensor['value'] >= sensor['crit'] else "high"
+                self.hot[sensor['key']] = f"{sensor['label']} {sensor['value']:.0f}°C ({kind}, limit {limit:.0f}°C)"
+                record_alert('sensor', f"Temperature alert: {self.hot[sensor['key']]}", metric=f"sensors.{sensor['key']}")
+                changed = True
+            elif sensor['key'] in self.hot and sensor['value'] < sensor['high'] - SENSOR_ALERT_CLEAR:
+                del self.hot[sensor['key']]
+                changed = True
+        if changed:
+            self.sensor_alert.emit(f"Temperature alert: {'; '.join(self.hot.values())}" if self.hot else "")
+
+    def publish(self, result):
+        # Every sensor by key, plus the hottest reading of each group
+        values = {}
+        for kind in ('temperatures', 'fans', 'power'):
+            for sensor in result[kind]:
+                values[sensor['key']] = sensor['value']
+        for group, value in result['group_max'].items():
+            values[f"{slug(group)}_temp"] = value
+        publish("sensors", values)
+
+    def run(self):
+        while self.running:
+            try:
+                result = self.collector.sample()
+            except (OSError, ValueError, IndexError) as e:
+                print(f"[ERROR] Failed to read sensors: {e}")
+                result = {'temperatures': [], 'fans': [], 'power': []}
+            group_max = {}
+            for sensor in result['temperatures']:
+                group_max[sensor['group']] = max(group_max.get(sensor['group'], sensor['value']), sensor['value'])
+            result['group_max'] = group_max
+            result['counts'] = (len(self.collector.temps), len(self.collector.fans), len(self.collector.power))
+            result['power_unreadable'] = self.collector.power_unreadable
+            self.check_thresholds(result['temperatures'])
+            self.publish(result)
+            self.data_updated.emit(result)
+            for _ in range(sampling_scale()):
+                if not self.running:
+                    break
+                self.msleep(1000)
+        self.collector.close()
+
+    def stop(self):
+        self.running = False
+        self.wait()
+
+
+class SensorsMonitorWidget(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.window = DEFAULT_WINDOW
+        self.render = RenderThrottle()
+        self.temp_histories = {}   # group -> PlotHistory of its hottest sensor
+        self.power_histories = {}  # RAPL key -> PlotHistory
+        self.temp_curves = {}
+        self.power_curves = {}
+
+        layout = QGridLayout(self)
+
+        # Top Title
+        title_layout = QHBoxLayout()
+        self.left_label = QLabel("Sensors")
+        self.left_label.setStyleSheet("color: white; font-size: 20pt;")
+        self.right_label = QLabel("hwmon / RAPL")
+        self.right_label.setStyleSheet("color: white; font-size: 12pt;")
+        title_layout.addWidget(self.left_label, alignment=Qt.AlignLeft)
+        title_layout.addWidget(self.right_label, alignment=Qt.AlignRight)
+        layout.addLayout(title_layout, 0, 0, 1, 2)
+
+        # Temperature plot labels
+        top_labels_layout = QHBoxLayout()
+        self.temp_left_label = QLabel("Temperature (hottest sensor per device)")
+        self.temp_left_label.setStyleSheet("color: white; font-size: 8pt;")
+        self.temp_right_label = QLabel("110°C")
+        self.temp_right_label.setStyleSheet("color: white; font-size: 8pt;")
+        top_labels_layout.addWidget(self.temp_left_label, alignment=Qt.AlignLeft)
+        top_labels_layout.addWidget(self.temp_right_label, alignment=Qt.AlignRight)
+        layout.addLayout(top_labels_layout, 1, 0, 1, 2)
+
+        # Temperature Plot
+        self.temp_plot = pg.PlotWidget()
+        self.temp_plot.setBackground('#1C1C1C')
+        self.temp_plot.getPlotItem().showGrid(x=True, y=True, alpha=0.7)
+        self.temp_plot.getPlotItem().showAxis('top', True)
+        self.temp_plot.getPlotItem().showAxis('right', True)
+        for axis in ['bottom', 'left', 'top', 'right']:
+            self.temp_plot.getPlotItem().getAxis(axis).setTicks([])
+        self.temp_plot.setYRange(0, 110)
+        self.temp_plot.setMouseEnabled(x=False, y=False)
+        self.temp_plot.setMenuEnabled(False)
+        self.temp_plot.getPlotItem().hideButtons()
+        self.temp_plot.addLegend(offset=(10, 10))
+        self.temp_plot.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.temp_plot.setMinimumHeight(250)
+        layout.addWidget(self.temp_plot, 2, 0, 1, 2)
+
+        bottom_label_layout = QHBoxLayout()
+        self.bottom_left_label = QLabel("60 seconds")
+        self.bottom_left_label.setStyleSheet("color: #E0E0E0; font-size: 8pt;")
+        self.bottom_right_label = QLabel("0")
+        self.bottom_right_label.setStyleSheet("color: #E0E0E0; font-size: 8pt;")
+        bottom_label_layout.addWidget(self.bottom_left_label, alignment=Qt.AlignLeft)
+        bottom_label_layout.addWidget(self.bottom_right_label, alignment=Qt.AlignRight)
+        layout.addLayout(bottom_label_layout, 3, 0, 1, 2)
+        self.window_labels = [self.bottom_left_label]
+
+        # Power plot labels
+        top_labels_layout = QHBoxLayout()
+        self.power_left_label = QLabel("Power (RAPL)")
+        self.power_left_label.setStyleSheet("color: white; font-size: 8pt;")
+        self.power_right_label = QLabel("W")
+        self.power_right_label.setStyleSheet("color: white; font-size: 8pt;")
+        top_labels_layout.addWidget(self.power_left_label, alignment=Qt.AlignLeft)
+        top_labels_layout.addWidget(self.power_right_label, alignment=Qt.AlignRight)
+        layout.addLayout(top_labels_layout, 4, 0, 1, 2)
+
+        # Power Plot
+        self.power_plot = pg.PlotWidget()
+        self.power_plot.setBackground('#1C1C1C')
+        self.power_plot.getPlotItem().showGrid(x=True, y=True, alpha=0.7)
+        self.power_plot.getPlotItem().showAxis('top', True)
+        self.power_plot.getPlotItem().showAxis('right', True)
+        for axis in ['bottom', 'left', 'top', 'right']:
+            self.power_plot.getPlotItem().getAxis(axis).setTicks([])
+        self.power_plot.setMouseEnabled(x=False, y=False)
+        self.power_plot.setMenuEnabled(False)
+        self.power_plot.getPlotItem().hideButtons()
+        self.power_plot.addLegend(offset=(10, 10))
+        self.power_plot.setMinimumHeight(150)
+        layout.addWidget(self.power_plot, 5, 0, 1, 2)
+
+        bottom_label_layout = QHBoxLayout()
+        self.bottom_left_label = QLabel("60 seconds")
+        self.bottom_left_label.setStyleSheet("color: #E0E0E0; font-size: 8pt;")
+        self.bottom_right_label = QLabel("0")
+        self.bottom_right_label.setStyleSheet("color: #E0E0E0; font-size: 8pt;")
+        bottom_label_layout.addWidget(self.bottom_left_label, alignment=Qt.AlignLeft)
+        bottom_label_layout.addWidget(self.bottom_right_label, alignment=Qt.AlignRight)
+        layout.addLayout(bottom_label_layout, 6, 0, 1, 2)
+        self.window_labels.append(self.bottom_left_label)
+
+        # Details label
+        self.details_label = QLabel()
+        self.details_label.setStyleSheet("color: #E0E0E0; font-size: 10pt;")
+        self.details_label.setWordWrap(True)
+        layout.addWidget(self.details_label, 7, 0, 1, 2)
+
+        # Temperature alert label (hidden until a sensor crosses its threshold)
+        self.alert_label = QLabel()
+        self.alert_label.setStyleSheet("color: #FF4500; font-size: 10pt; font-weight: bold;")
+        self.alert_label.setWordWrap(True)
+        self.alert_label.hide()
+        layout.addWidget(self.alert_label, 8, 0, 1, 2)
+
+        layout.setRowStretch(0, 0)
+        layout.setRowStretch(1, 0)
+        layout.setRowStretch(2, 10)
+        layout.setRowStretch(3, 0)
+        layout.setRowStretch(4, 0)
+        layout.setRowStretch(5, 5)
+        layout.setRowStretch(6, 0)
+        layout.setRowStretch(7, 0)
+        layout.setRowStretch(8, 0)
+
+        self.plots = [self.temp_plot, self.power_plot]
+        self.set_window(DEFAULT_WINDOW)
+
+        # Worker
+        self.worker = SensorsWorker()
+        self.worker.data_updated.connect(self.update_display)
+        self.worker.sensor_alert.connect(self.show_sensor_alert)
+        self.worker.start()
+
+    def set_window(self, window):
+        self.window = window
+        for label in self.window_labels:
+            label.setText(WINDOW_LABELS[window])
+        for plot in self.plots:
+            plot.setXRange(-window_seconds(window), 0, padding=0)
+        self.redraw()
+
+    def redraw(self):
+        for key, history in self.temp_histories.items():
+            self.temp_curves[key].setData(*history.points(self.window))
+        for key, history in self.power_histories.items():
+            self.power_curves[key].setData(*history.points(self.window))
+
+    def add_series(self, histories, curves, plot, key, name, metric):
+        # Curves are created the first time a sensor reports
+        color = CURVE_COLORS[len(curves) % len(CURVE_COLORS)]
+        history = histories[key] = PlotHistory(metric)
+        history.seed_from_archive(get_archive())
+        curves[key] = plot.plot(pen=pg.mkPen(color, width=2), name=name)
+
+    def update_display(self, result):
+        for group, value in result['group_max'].items():
+            if group not in self.temp_histories:
+                self.add_series(self.temp_histories, self.temp_curves, self.temp_plot,
+                                group, group, f"sensors.{slug(group)}_temp")
+            self.temp_histories[group].add(value)
+        for sensor in result['power']:
+            if sensor['key'] not in self.power_histories:
+                self.add_series(self.power_histories, self.power_curves, self.power_plot,
+                                sensor['key'], sensor['label'], f"sensors.{sensor['key']}")
+            self.power_histories[sensor['key']].add(sensor['value'])
+        if self.render.due():
+            self.redraw()
+
+        temps, fans, domains = result['counts']
+        self.right_label.setText(f"{temps} temperatures · {fans} fans · {domains} power domains")
+
+        lines = []
+        for sensor in result['temperatures']:
+            lines.append(f"<b>{sensor['label']}:</b> {sensor['value']:.1f}°C (high {sensor['high']:.0f}°C)")
+        for sensor in result['fans']:
+            lines.append(f"<b>{sensor['label']}:</b> {sensor['value']} RPM")
+        for sensor in result['power']:
+            lines.append(f"<b>{sensor['label']}:</b> {sensor['value']:.1f} W")
+        if result['power_unreadable']:
+            lines.append("<b>Power:</b> RAPL energy counters need root to read")
+        if not lines:
+            lines.append("No hwmon or RAPL sensors found")
+        for group in result['group_max']:
+            text = percentile_text(f"sensors.{slug(group)}_temp", f"{group} temperature", "°C", "{:.0f}")
+            if text:
+                lines.append(text)
+        self.details_label.setText("<br>".join(lines))
+
+    def show_sensor_alert(self, message):
+        if message:
+            self.alert_label.setText(f"⚠️ {message}")
+            self.alert_label.show()
+        else:
+            self.alert_label.hide()
+
+    def closeEvent(self, event):
+        self.worker.stop()
+        super().closeEvent(event)
@@ -0,0 +1,191 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# Optional on-disk history for every collector. Collectors hand samples to
+# record(), which only enqueues; a background writer drains the queue once
+# per flush interval and inserts the whole batch in one transaction, so
+# sampling never waits on disk. The database runs in WAL mode, so queries
+# from the GUI or external scripts do not block the writer.
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".os_monitor", "metrics.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metrics (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS samples (
+    metric_id INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_metric_ts ON samples (metric_id, ts);
+"""
+
+
+def connect(path, read_only=False):
+    if read_only:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=2000")
+    return conn
+
+
+class MetricArchive:
+    def __init__(self, path=DEFAULT_PATH, flush_interval=1.0, retention_days=30, read_only=False):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.retention = retention_days * 86400 if retention_days else None
+        self.read_only = read_only
+        self.queue = queue.SimpleQueue()
+        self.metric_ids = {}
+        self.local = threading.local()
+        self.running = False
+        self.writer = None
+        if not read_only:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            conn = connect(path)
+            conn.executescript(SCHEMA)
+            conn.close()
+            self.running = True
+            self.writer = threading.Thread(target=self.write_loop, name="metric-archive", daemon=True)
+            self.writer.start()
+
+    def record(self, source, values, ts=None):
+        # Called from collector threads; never touches the database
+        if self.running:
+            self.queue.put((ts or time.time(), source, values))
+
+    def write_loop(self):
+        try:
+            conn = connect(self.path)
+            for metric_id, name in conn.execute("SELECT id, name FROM metrics"):
+                self.metric_ids[name] = metric_id
+        except sqlite3.Error as e:
+            print(f"[ERROR] Failed to open metric archive {self.path}: {e}")
+            self.running = False  # nothing drains the queue any more; stop filling it
+            return
+        last_prune = 0
+        while self.running:
+            time.sleep(self.flush_interval)
+            # A failed batch (disk full, database locked past the timeout) is
+            # dropped: flush() has already drained it, so the queue stays bounded
+            try:
+                self.flush(conn)
+                if self.retention and time.time() - last_prune > 3600:
+                    last_prune = time.time()
+                    with conn:
+                        conn.execute("DELETE FROM samples WHERE ts < ?", (last_prune - self.retention,))
+            except Exception as e:
+                print(f"[ERROR] Failed to write metric archive: {e}")
+        try:
+            self.flush(conn)
+        except Exception as e:
+            print(f"[ERROR] Failed to write metric archive: {e}")
+        conn.close()
+
+    def flush(self, conn):
+        rows = []
+        while True:
+            try:
+                ts, source, values = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            for name, value in values.items():
+                if value is None:
+                    continue
+                rows.append((self.metric_id(conn, f"{source}.{name}"), ts, float(value)))
+        if rows:
+            with conn:
+                conn.executemany("INSERT INTO samples (metric_id, ts, value) VALUES (?, ?, ?)", rows)
+
+    def metric_id(self, conn, name):
+        metric_id = self.metric_ids.get(name)
+        if metric_id is None:
+            with conn:
+                conn.execute("INSERT OR IGNORE INTO metrics (name) VALUES (?)", (name,))
+            metric_id = conn.execute("SELECT id FROM metrics WHERE name = ?", (name,)).fetchone()[0]
+            self.metric_ids[name] = metric_id
+        return metric_id
+
+    def reader(self):
+        # One read connection per calling thread (sqlite3 objects are not
+        # meant to be shared between threads)
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = connect(self.path, read_only=True)
+        return conn
+
+    def metrics(self):
+        return [name for name, in self.reader().execute("SELECT name FROM metrics ORDER BY name")]
+
+    def query(self, metric, start, end=None, points=300):
+        # Returns [(ts, avg, min, max)] for the range, bucketed in SQL to at
+        # most `points` rows so the cost is independent of the range length.
+        end = end or time.time()
+        bucket = max((end - start) / max(points, 1), 1e-6)
+        return self.reader().execute(
+            """
+            SELECT MIN(ts), AVG(value), MIN(value), MAX(value)
+            FROM samples
+            WHERE metric_id = (SELECT id FROM metrics WHERE name = ?) AND ts >= ? AND ts < ?
+            GROUP BY CAST((ts - ?) / ? AS INTEGER)
+            ORDER BY 1
+            """,
+            (metric, start, end, start, bucket),
+        ).fetchall()
+
+    def close(self):
+        if self.running:
+            self.running = False
+            self.writer.join()
+        conn = getattr(self.local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+
+_archive = None
+
+
+def enable_archive(path=DEFAULT_PATH, **kwargs):
+    global _archive
+    if _archive is None:
+        _archive = MetricArchive(path, **kwargs)
+    return _archive
+
+
+def get_archive():
+    # None unless the application enabled archiving (--archive)
+    return _archive
+
+
+def close_archive():
+    global _archive
+    if _archive is not None:
+        _archive.close()
+        _archive = None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query the OS Monitor metric archive")
+    parser.add_argument("metric", nargs="?", help="metric name, e.g. cpu.utilization (omit to list metrics)")
+    parser.add_argument("--db", default=DEFAULT_PATH)
+    parser.add_argument("--hours", type=float, default=1.0)
+    parser.add_argument("--points", type=int, default=60)
+    args = parser.parse_args()
+
+    archive = MetricArchive(args.db, read_only=True)
+    if not args.metric:
+        print("\n".join(archive.metrics()))
+    else:
+        for ts, avg, low, high in archive.query(args.metric, time.time() - args.hours * 3600, points=args.points):
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts))}  avg={avg:.2f}  min={low:.2f}  max={high:.2f}")
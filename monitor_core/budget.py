@@ -0,0 +1,220 @@
+import os
+import threading
+import time
+
+import psutil
+
+from monitor_core.metrics import publish
+from monitor_core.journal import record_alert
+
+# Self-limiting overhead budget. A background thread measures the monitor's
+# own CPU share and RSS every CHECK_INTERVAL seconds (and, on Linux, the CPU
+# of each collector thread from /proc/self/task). When the process stays
+# over its budget it degrades one level at a time, and it restores a level
+# once it has stayed well under budget for a while:
+#
+#   level  sampling     expensive scans       plot redraws
+#   0      1 s          every period          every update
+#   1      2 s          every 5 periods       every 2nd update
+#   2      4 s          every 15 periods      every 4th update
+#   3      8 s          paused                every 8th update
+#
+# "Expensive" collectors are the per-process walks (process tree, per-process
+# memory, process I/O, top talkers). Regular workers sleep
+# sampling_scale() one-second slices between samples, and expensive ones ask
+# a Pacer whether a scan is due. Widgets ask a RenderThrottle whether to
+# redraw. Without enable_budget() everything runs at full rate.
+#
+# Independently of the level, hold_rendering() stops all plot redraws until
+# the matching release_rendering(); the notifications panel holds them while
+# it animates over the tabs.
+
+DEFAULT_CPU_BUDGET = 5.0       # percent of one CPU for the whole monitor
+DEFAULT_MEMORY_BUDGET = 400.0  # MB of RSS
+CHECK_INTERVAL = 5.0
+DEGRADE_AFTER = 2              # checks over budget before dropping a level
+RESTORE_AFTER = 6              # checks under RESTORE_SHARE of budget before restoring one
+RESTORE_SHARE = 0.6
+
+# (label, sampling scale, expensive scan scale or None when paused, redraw every n updates)
+LEVELS = [
+    ("Full", 1, 1, 1),
+    ("Reduced", 2, 5, 2),
+    ("Minimal", 4, 15, 4),
+    ("Essential", 8, None, 8),
+]
+
+
+def thread_cpu_times():
+    # {thread name: user + system seconds} for this process (Linux only); the
+    # main thread is reported as "GUI" since it does all the rendering
+    times = {}
+    tick = os.sysconf('SC_CLK_TCK')
+    pid = str(os.getpid())
+    try:
+        tids = os.listdir('/proc/self/task')
+    except OSError:
+        return times
+    for tid in tids:
+        try:
+            with open(f'/proc/self/task/{tid}/comm') as f:
+                name = "GUI" if tid == pid else f.read().strip()
+            with open(f'/proc/self/task/{tid}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        times[name] = times.get(name, 0.0) + (int(fields[11]) + int(fields[12])) / tick
+    return times
+
+
+class OverheadBudget:
+    def __init__(self, cpu_budget=DEFAULT_CPU_BUDGET, memory_budget=DEFAULT_MEMORY_BUDGET, check_interval=CHECK_INTERVAL):
+        self.cpu_budget = cpu_budget
+        self.memory_budget = memory_budget
+        self.check_interval = check_interval
+        self.level = 0
+        self.over = 0
+        self.under = 0
+        self.cpu = 0.0
+        self.memory = 0.0
+        self.threads = []  # [(name, percent of one CPU)], busiest first
+        self.process = psutil.Process()
+        self.prev_cpu = None
+        self.prev_threads = {}
+        self.prev_time = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="budget", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stop_event.wait(self.check_interval):
+            try:
+                self.check()
+            except (OSError, psutil.Error) as e:
+                print(f"[ERROR] Failed to measure monitor overhead: {e}")
+
+    def measure(self):
+        now = time.monotonic()
+        times = self.process.cpu_times()
+        cpu_time = times.user + times.system
+        threads = thread_cpu_times()
+        self.memory = self.process.memory_info().rss / (1024 * 1024)
+        if self.prev_time is not None:
+            interval = max(now - self.prev_time, 1e-3)
+            self.cpu = (cpu_time - self.prev_cpu) / interval * 100
+            self.threads = sorted(((name, (value - self.prev_threads.get(name, 0.0)) / interval * 100)
+                                   for name, value in threads.items()), key=lambda item: -item[1])
+        self.prev_time = now
+        self.prev_cpu = cpu_time
+        self.prev_threads = threads
+
+    def check(self):
+        self.measure()
+        publish("monitor", {"cpu": self.cpu, "memory": self.memory, "level": self.level})
+        over = self.cpu > self.cpu_budget or self.memory > self.memory_budget
+        under = self.cpu < self.cpu_budget * RESTORE_SHARE and self.memory < self.memory_budget * RESTORE_SHARE
+        self.over = self.over + 1 if over else 0
+        self.under = self.under + 1 if under else 0
+        if self.over >= DEGRADE_AFTER and self.level < len(LEVELS) - 1:
+            self.set_level(self.level + 1)
+        elif self.under >= RESTORE_AFTER and self.level > 0:
+            self.set_level(self.level - 1)
+
+    def set_level(self, level):
+        previous = self.level
+        self.level = level
+        self.over = self.under = 0
+        action = "degraded" if level > previous else "restored"
+        busiest = ", ".join(f"{name} {cpu:.1f}%" for name, cpu in self.threads[:3] if cpu > 0)
+        message = (f"Monitor overhead {self.cpu:.1f}% CPU / {self.memory:.0f} MB "
+                   f"(budget {self.cpu_budget:g}% / {self.memory_budget:g} MB): {action} to {LEVELS[level][0]}")
+        if busiest:
+            message += f"; busiest threads: {busiest}"
+        record_alert('overhead', message, metric='monitor.cpu' if self.cpu > self.cpu_budget else 'monitor.memory')
+
+    def status(self):
+        label = LEVELS[self.level][0]
+        if self.prev_time is None:
+            return f"Overhead: {label}"
+        return f"Overhead: {label} ({self.cpu:.1f}% CPU, {self.memory:.0f} MB)"
+
+    def close(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(1)
+
+
+_budget = None
+
+
+def enable_budget(cpu_budget=DEFAULT_CPU_BUDGET, memory_budget=DEFAULT_MEMORY_BUDGET):
+    global _budget
+    if _budget is None:
+        _budget = OverheadBudget(cpu_budget, memory_budget)
+        _budget.start()
+    return _budget
+
+
+def get_budget():
+    return _budget
+
+
+def close_budget():
+    global _budget
+    if _budget is not None:
+        _budget.close()
+        _budget = None
+
+
+def degradation_level():
+    return _budget.level if _budget is not None else 0
+
+
+def sampling_scale():
+    # Base sampling periods between two samples of a regular collector
+    return LEVELS[degradation_level()][1]
+
+
+class Pacer:
+    # Decides when an expensive scan with a nominal period is due
+    def __init__(self, period):
+        self.period = period
+        self.last = None
+
+    def due(self):
+        scale = LEVELS[degradation_level()][2]
+        if scale is None:
+            return False
+        now = time.monotonic()
+        if self.last is not None and now - self.last < self.period * scale - 0.05:
+            return False
+        self.last = now
+        return True
+
+
+_render_holds = 0
+
+
+def hold_rendering():
+    global _render_holds
+    _render_holds += 1
+
+
+def release_rendering():
+    global _render_holds
+    _render_holds = max(_render_holds - 1, 0)
+
+
+class RenderThrottle:
+    # Widgets redraw their plots every n-th update at degraded levels
+    def __init__(self):
+        self.count = 0
+
+    def due(self):
+        self.count += 1
+        if _render_holds:
+            return False
+        return self.count % LEVELS[degradation_level()][3] == 0
@@ -0,0 +1,66 @@
+import subprocess
+
+# Collectors that call into drivers or external tools (GPUtil, WMI, netsh).
+# They can hang or crash inside native code, so the GUI runs them through
+# monitor_core.supervisor in a separate process rather than in its threads.
+# Nothing here imports Qt; the optional dependencies are imported per call.
+
+
+def gpu_sample():
+    # First GPU as a plain dict, or None when no GPU is reported
+    import GPUtil
+    gpus = GPUtil.getGPUs()
+    if not gpus:
+        return None
+    gpu = gpus[0]
+    return {
+        "name": gpu.name,
+        "load": gpu.load * 100,
+        "mem_used": gpu.memoryUsed,
+        "mem_total": gpu.memoryTotal,
+        "temp": gpu.temperature,
+        "driver": gpu.driver,
+    }
+
+
+def cpu_name():
+    import wmi
+    return wmi.WMI().Win32_Processor()[0].Name
+
+
+def disk_identity():
+    # (model, capacity in bytes) of the first physical disk
+    import wmi
+    disk = wmi.WMI().Win32_DiskDrive()[0]
+    return disk.Model, int(disk.Size)
+
+
+def wifi_ssid():
+    output = subprocess.check_output("netsh wlan show interfaces", shell=True).decode(errors="ignore")
+    ssid = None
+    bssid = None
+    for line in output.splitlines():
+        if "SSID" in line and "BSSID" not in line:
+            ssid = line.split(":", 1)[1].strip()
+        elif "BSSID" in line:
+            bssid = line.split(":", 1)[1].strip()
+    return {"SSID": ssid if ssid else "Not Connected", "BSSID": bssid if bssid else "Unknown"}
+
+
+def network_info():
+    # (adapter name, connection type, SSID, BSSID) of the first active adapter
+    import wmi
+    for nic in wmi.WMI().Win32_NetworkAdapterConfiguration(IPEnabled=True):
+        adapter_name = nic.Description
+        lower_name = adapter_name.lower()
+
+        # Broaden detection of Wi-Fi keywords
+        if "wireless" in lower_name or "wi-fi" in lower_name or "802.11" in lower_name:
+            try:
+                wifi = wifi_ssid()
+            except (OSError, subprocess.CalledProcessError):
+                wifi = {"SSID": "Unknown", "BSSID": "Unknown"}
+            return adapter_name, "Wi-Fi", wifi["SSID"], wifi["BSSID"]
+        return adapter_name, "Ethernet", "N/A", "N/A"
+
+    return "No Active Adapter", "Unknown", "N/A", "N/A"
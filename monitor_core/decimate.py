@@ -0,0 +1,116 @@
+import time
+
+import numpy as np
+
+# Plot history for long windows. Each window keeps a fixed number of time
+# buckets (roughly half the plot's pixel width); a sample only updates the
+# min/max of the current bucket, and closed buckets go into a ring buffer.
+# The plot receives each bucket's min and max in the order they occurred,
+# so short spikes survive decimation and redraw cost is bounded by the
+# bucket count, whatever the window length.
+
+PLOT_WINDOWS = {
+    '1 min': (60, 60),           # window seconds, buckets
+    '1 h': (3600, 300),
+    '24 h': (86400, 300),
+    '7 d': (7 * 86400, 300),
+}
+DEFAULT_WINDOW = '1 min'
+
+WINDOW_LABELS = {
+    '1 min': "60 seconds",
+    '1 h': "1 hour",
+    '24 h': "24 hours",
+    '7 d': "7 days",
+}
+
+
+class DecimatedSeries:
+    def __init__(self, window, buckets):
+        self.window = window
+        self.buckets = buckets
+        self.bucket_length = window / buckets
+        self.times = np.zeros(2 * buckets)
+        self.values = np.zeros(2 * buckets)
+        self.head = 0
+        self.filled = 0
+        self.current = None  # [bucket index, low_t, low, high_t, high]
+
+    def add(self, value, now):
+        index = int(now // self.bucket_length)
+        current = self.current
+        if current is None or current[0] != index:
+            if current is not None:
+                self.commit(current)
+            self.current = [index, now, value, now, value]
+            return
+        # Keep the extremes; slot 1 holds the low, slot 3 the high
+        if value < current[2]:
+            current[1], current[2] = now, value
+        if value > current[4]:
+            current[3], current[4] = now, value
+
+    def commit(self, bucket):
+        _, low_t, low, high_t, high = bucket
+        if low_t <= high_t:
+            self.push(low_t, low)
+            self.push(high_t, high)
+        else:
+            self.push(high_t, high)
+            self.push(low_t, low)
+
+    def push(self, t, value):
+        self.times[self.head] = t
+        self.values[self.head] = value
+        self.head = (self.head + 1) % len(self.times)
+        self.filled = min(self.filled + 1, len(self.times))
+
+    def seed(self, rows):
+        # rows of (ts, avg, min, max), e.g. from MetricArchive.query
+        for ts, _, low, high in rows:
+            self.push(ts, low)
+            self.push(ts + self.bucket_length / 2, high)
+
+    def points(self, now):
+        # x is seconds relative to now (negative), y the values
+        start = (self.head - self.filled) % len(self.times)
+        if start + self.filled <= len(self.times):
+            times = self.times[start:start + self.filled]
+            values = self.values[start:start + self.filled]
+        else:
+            times = np.concatenate([self.times[start:], self.times[:self.head]])
+            values = np.concatenate([self.values[start:], self.values[:self.head]])
+        if self.current is not None:
+            _, low_t, low, high_t, high = self.current
+            extra_t, extra_v = ([low_t, high_t], [low, high]) if low_t <= high_t else ([high_t, low_t], [high, low])
+            times = np.concatenate([times, extra_t])
+            values = np.concatenate([values, extra_v])
+        keep = times >= now - self.window
+        return times[keep] - now, values[keep]
+
+
+class PlotHistory:
+    def __init__(self, metric=None, windows=PLOT_WINDOWS):
+        self.metric = metric
+        self.series = {name: DecimatedSeries(window, buckets) for name, (window, buckets) in windows.items()}
+
+    def add(self, value, now=None):
+        now = now or time.time()
+        for series in self.series.values():
+            series.add(value, now)
+
+    def seed_from_archive(self, archive):
+        # Fill the long windows from history recorded by earlier runs
+        if archive is None or self.metric is None:
+            return
+        now = time.time()
+        for series in self.series.values():
+            if series.window > 60:
+                series.seed(archive.query(self.metric, now - series.window, now, points=series.buckets))
+
+    def points(self, window, now=None):
+        return self.series[window].points(now or time.time())
+
+
+def window_seconds(window):
+    return PLOT_WINDOWS[window][0]
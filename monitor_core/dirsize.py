@@ -0,0 +1,237 @@
+import heapq
+import os
+import queue
+import threading
+import time
+
+# "What is using space" for one mount, like `du -x` but incremental. A pool
+# of threads walks the tree with os.scandir, taking directories from a
+# shared queue so several subtrees are read at once (the syscalls release
+# the GIL, which pays off most on a cold cache or slow storage).
+#
+# Every directory's listing is cached under its (device, inode) together
+# with its mtime: the file bytes directly inside it, its subdirectories and
+# its largest files. On a rescan a directory whose mtime is unchanged is not
+# listed again; it costs one stat and its cached subdirectories are visited
+# in turn. Only directories where entries were added, removed or renamed
+# are read again. A file that grows in place does not change its
+# directory's mtime, so its new size shows up on a full rescan (new
+# DirectoryScanner) rather than an incremental one.
+#
+# Sizes are allocated bytes (st_blocks), so sparse files count what they
+# really use. A file with several hard links is counted once, in the first
+# directory summarize() meets it in. Other filesystems mounted below the
+# root are skipped.
+
+TOP_N = 10
+DOMINANT = 0.9  # a directory is left out of the largest list when one child holds this share
+PROGRESS_INTERVAL = 0.5
+
+
+def allocated(stat):
+    blocks = getattr(stat, 'st_blocks', None)
+    return blocks * 512 if blocks is not None else stat.st_size
+
+
+class DirRecord:
+    __slots__ = ('path', 'mtime', 'files', 'file_bytes', 'subdirs', 'largest', 'links')
+
+    def __init__(self, path, mtime):
+        self.path = path
+        self.mtime = mtime
+        self.files = 0
+        self.file_bytes = 0
+        self.subdirs = []   # [(name, (dev, ino))]
+        self.largest = []   # [(bytes, name)], at most TOP_N
+        self.links = []     # [(inode, bytes)] of hard-linked files, not in file_bytes
+
+
+class DirectoryScanner:
+    def __init__(self, root, workers=None, top_n=TOP_N):
+        self.root = os.path.abspath(root)
+        self.workers = workers or min(8, (os.cpu_count() or 1) * 2)
+        self.top_n = top_n
+        self.cache = {}          # (dev, ino) -> DirRecord, from the last complete scan
+        self.lock = threading.Lock()
+        self.cancelled = threading.Event()
+        self.reset_progress()
+
+    def reset_progress(self):
+        self.progress = {'dirs': 0, 'reused': 0, 'files': 0, 'bytes': 0, 'errors': 0, 'elapsed': 0.0}
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def read_directory(self, path, mtime, root_dev):
+        record = DirRecord(path, mtime)
+        largest = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        if stat.st_dev == root_dev:  # stay on this filesystem
+                            record.subdirs.append((entry.name, (stat.st_dev, stat.st_ino)))
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        size = allocated(stat)
+                        record.files += 1
+                        if stat.st_nlink > 1:
+                            record.links.append((stat.st_ino, size))
+                        else:
+                            record.file_bytes += size
+                        if len(largest) < self.top_n:
+                            heapq.heappush(largest, (size, entry.name))
+                        elif size > largest[0][0]:
+                            heapq.heapreplace(largest, (size, entry.name))
+                except OSError:
+                    with self.lock:
+                        self.progress['errors'] += 1
+        record.largest = sorted(largest, reverse=True)
+        return record
+
+    def worker(self, pending, found, root_dev):
+        while True:
+            path = pending.get()
+            if path is None:
+                pending.task_done()
+                return
+            try:
+                if self.cancelled.is_set():
+                    continue
+                stat = os.stat(path, follow_symlinks=False)
+                key = (stat.st_dev, stat.st_ino)
+                record = self.cache.get(key)
+                reused = record is not None and record.mtime == stat.st_mtime_ns and record.path == path
+                if not reused:
+                    record = self.read_directory(path, stat.st_mtime_ns, root_dev)
+                found[key] = record
+                with self.lock:
+                    self.progress['dirs'] += 1
+                    self.progress['reused'] += reused
+                    self.progress['files'] += record.files
+                    self.progress['bytes'] += record.file_bytes
+                for name, child in record.subdirs:
+                    pending.put(os.path.join(path, name))
+            except OSError:
+                with self.lock:
+                    self.progress['errors'] += 1
+            finally:
+                pending.task_done()
+
+    def scan(self, progress=None):
+        # Walks the tree (reusing unchanged directories from the previous
+        # scan) and returns the summary; progress(dict) is called every
+        # PROGRESS_INTERVAL seconds from the calling thread
+        started = time.perf_counter()
+        self.cancelled.clear()
+        self.reset_progress()
+        root_dev = os.stat(self.root).st_dev
+        pending = queue.Queue()
+        found = {}
+        threads = [threading.Thread(target=self.worker, args=(pending, found, root_dev),
+                                    name=f"dirsize-{i}", daemon=True) for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        pending.put(self.root)
+        done = threading.Thread(target=pending.join, daemon=True)
+        done.start()
+        while done.is_alive():
+            done.join(PROGRESS_INTERVAL)
+            self.progress['elapsed'] = time.perf_counter() - started
+            if progress is not None and done.is_alive():
+                progress(dict(self.progress))
+        for _ in threads:
+            pending.put(None)
+        for thread in threads:
+            thread.join()
+
+        complete = not self.cancelled.is_set()
+        if complete:
+            self.cache = found  # directories that vanished drop out here
+        summary = self.summarize(found)
+        summary.update(self.progress, elapsed=time.perf_counter() - started, complete=complete)
+        return summary
+
+    def summarize(self, found):
+        # Inclusive sizes, children before parents
+        try:
+            stat = os.stat(self.root)
+        except OSError:
+            return {'root': self.root, 'total': 0, 'top_dirs': [], 'top_files': []}
+        root_key = (stat.st_dev, stat.st_ino)
+        order = []
+        stack = [root_key]
+        while stack:
+            key = stack.pop()
+            record = found.get(key)
+            if record is None:
+                continue
+            order.append(key)
+            stack.extend(child for name, child in record.subdirs)
+        totals = {}
+        candidates = []
+        files = []
+        linked = set()
+        for key in reversed(order):
+            record = found[key]
+            total = record.file_bytes
+            for inode, size in record.links:
+                if inode not in linked:
+                    linked.add(inode)
+                    total += size
+            count = record.files
+            heaviest = 0
+            for name, child in record.subdirs:
+                child_total = totals.get(child)
+                if child_total is not None:
+                    total += child_total[0]
+                    count += child_total[1]
+                    heaviest = max(heaviest, child_total[0])
+            totals[key] = (total, count)
+            # A parent that is one big child is that child; list the child
+            if key != root_key and total > 0 and heaviest < total * DOMINANT:
+                candidates.append((total, count, record.path))
+            for size, name in record.largest:
+                files.append((size, os.path.join(record.path, name)))
+        total, count = totals.get(root_key, (0, 0))
+        return {
+            'root': self.root,
+            'total': total,
+            'total_files': count,
+            'top_dirs': heapq.nlargest(self.top_n, candidates),
+            'top_files': heapq.nlargest(self.top_n, files),
+        }
+
+
+def format_size(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.2f} TB"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Largest directories and files below a path")
+    parser.add_argument("path", nargs="?", default=".")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=TOP_N)
+    parser.add_argument("--repeat", type=int, default=1, help="rescan N times to show the incremental cost")
+    args = parser.parse_args()
+
+    scanner = DirectoryScanner(args.path, workers=args.workers, top_n=args.top)
+    for _ in range(args.repeat):
+        result = scanner.scan(lambda p: print(f"  {p['dirs']} directories, {p['files']} files, "
+                                              f"{format_size(p['bytes'])}...", flush=True))
+        print(f"{result['root']}: {format_size(result['total'])} in {result['total_files']} files; "
+              f"{result['dirs']} directories ({result['reused']} unchanged), {result['errors']} errors, "
+              f"{result['elapsed']:.2f} s")
+    print("Largest directories:")
+    for size, count, path in result['top_dirs']:
+        print(f"  {format_size(size):>10}  {path} ({count} files)")
+    print("Largest files:")
+    for size, path in result['top_files']:
+        print(f"  {format_size(size):>10}  {path}")
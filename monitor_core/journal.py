@@ -0,0 +1,235 @@
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+
+# Append-only alert journal. Alerts are written as JSON lines to numbered
+# segment files (alerts-000001.jsonl, ...); a segment is closed once it
+# reaches SEGMENT_BYTES and the oldest segments are deleted beyond
+# MAX_SEGMENTS. An in-memory index holds one short row per alert, plus
+# position lists per metric and per process, so the notification panel can
+# page and filter thousands of alerts without reading the files. Large
+# per-alert details (snapshots) stay on disk and are read back by offset
+# when an entry is opened.
+
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".os_monitor", "alerts")
+SEGMENT_BYTES = 1024 * 1024
+MAX_SEGMENTS = 8
+
+
+def segment_path(directory, number):
+    return os.path.join(directory, f"alerts-{number:06d}.jsonl")
+
+
+class AlertJournal:
+    def __init__(self, directory=DEFAULT_DIR, segment_bytes=SEGMENT_BYTES, max_segments=MAX_SEGMENTS):
+        # directory=None keeps the journal in memory only
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.lock = threading.Lock()
+        self.listeners = []
+
+        # Index columns, oldest first; alert ids are base + list index
+        self.base = 0
+        self.times = []
+        self.rows = []        # (kind, metric, process, pid, message)
+        self.locations = []   # (segment, offset) or, in memory, the details
+        self.by_metric = {}   # metric -> ascending alert ids
+        self.by_process = {}  # process name -> ascending alert ids
+        self.by_kind = {}
+
+        self.segments = []    # segment numbers on disk, oldest first
+        self.file = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self.load()
+
+    def load(self):
+        numbers = []
+        for path in glob.glob(os.path.join(self.directory, "alerts-*.jsonl")):
+            try:
+                numbers.append(int(os.path.basename(path)[7:13]))
+            except ValueError:
+                continue
+        for number in sorted(numbers):
+            self.segments.append(number)
+            with open(segment_path(self.directory, number), 'rb') as f:
+                offset = 0
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        self.index(record, (number, offset))
+                    except (ValueError, KeyError):
+                        pass  # a line cut short by a crash
+                    offset += len(line)
+        self.open_segment(self.segments[-1] if self.segments else 1)
+
+    def open_segment(self, number):
+        if self.file:
+            self.file.close()
+        if not self.segments or self.segments[-1] != number:
+            self.segments.append(number)
+        self.file = open(segment_path(self.directory, number), 'ab')
+        if self.file.tell():
+            with open(segment_path(self.directory, number), 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self.file.write(b"\n")  # terminate a line cut short by a crash
+
+    def index(self, record, location):
+        alert_id = self.base + len(self.rows)
+        self.times.append(record['ts'])
+        self.rows.append((record['kind'], record.get('metric'), record.get('process'), record.get('pid'), record['message']))
+        self.locations.append(location)
+        for key, table in ((record['kind'], self.by_kind), (record.get('metric'), self.by_metric),
+                           (record.get('process'), self.by_process)):
+            if key:
+                table.setdefault(key, []).append(alert_id)
+        return alert_id
+
+    def drop_segment(self):
+        number = self.segments.pop(0)
+        count = 0
+        while count < len(self.locations) and self.locations[count][0] == number:
+            count += 1
+        del self.times[:count]
+        del self.rows[:count]
+        del self.locations[:count]
+        self.base += count
+        for table in (self.by_kind, self.by_metric, self.by_process):
+            for key in list(table):
+                ids = table[key]
+                del ids[:bisect.bisect_left(ids, self.base)]
+                if not ids:
+                    del table[key]
+        try:
+            os.remove(segment_path(self.directory, number))
+        except OSError:
+            pass
+
+    def append(self, kind, message, metric=None, process=None, pid=None, details=None, ts=None):
+        record = {'ts': ts or time.time(), 'kind': kind, 'message': message}
+        if metric:
+            record['metric'] = metric
+        if process:
+            record['process'] = process
+        if pid is not None:
+            record['pid'] = pid
+        if details is not None:
+            record['details'] = details
+        with self.lock:
+            if self.directory is None:
+                alert_id = self.index(record, details)
+            else:
+                line = (json.dumps(record, separators=(',', ':'), default=str) + "\n").encode()
+                offset = self.file.tell()
+                self.file.write(line)
+                self.file.flush()
+                alert_id = self.index(record, (self.segments[-1], offset))
+                if offset + len(line) >= self.segment_bytes:
+                    self.open_segment(self.segments[-1] + 1)
+                    while len(self.segments) > self.max_segments:
+                        self.drop_segment()
+        for callback in self.listeners:
+            callback(alert_id, record)
+        return alert_id
+
+    def add_listener(self, callback):
+        # callback(alert_id, record) runs on the thread that appended the alert
+        self.listeners.append(callback)
+
+    def query(self, kind=None, metric=None, process=None, since=None, until=None, page=0, page_size=50):
+        # (total matches, rows of the requested page), newest first
+        with self.lock:
+            selected = None
+            for key, table in ((kind, self.by_kind), (metric, self.by_metric), (process, self.by_process)):
+                if key is None:
+                    continue
+                ids = table.get(key, [])
+                if selected is None:
+                    selected = ids
+                else:
+                    members = set(ids)
+                    selected = [alert_id for alert_id in selected if alert_id in members]
+            # Alerts are appended in time order, so a time range is an id range
+            first = self.base + (bisect.bisect_left(self.times, since) if since else 0)
+            last = self.base + (bisect.bisect_right(self.times, until) if until else len(self.times))
+            if selected is None:
+                selected = range(first, last)
+            else:
+                selected = selected[bisect.bisect_left(selected, first):bisect.bisect_left(selected, last)]
+            total = len(selected)
+            end = total - page * page_size
+            page_ids = selected[max(end - page_size, 0):max(end, 0)]
+            rows = []
+            for alert_id in reversed(page_ids):
+                kind_, metric_, process_, pid, message = self.rows[alert_id - self.base]
+                rows.append({'id': alert_id, 'ts': self.times[alert_id - self.base], 'kind': kind_,
+                             'metric': metric_, 'process': process_, 'pid': pid, 'message': message})
+            return total, rows
+
+    def details(self, alert_id):
+        # The details stored with an alert, read back from its segment
+        with self.lock:
+            if alert_id < self.base or alert_id >= self.base + len(self.rows):
+                return None
+            location = self.locations[alert_id - self.base]
+            if self.directory is None:
+                return location
+            number, offset = location
+            if number == self.segments[-1]:
+                self.file.flush()
+        try:
+            with open(segment_path(self.directory, number), 'rb') as f:
+                f.seek(offset)
+                return json.loads(f.readline()).get('details')
+        except (OSError, ValueError):
+            return None
+
+    def metrics(self):
+        with self.lock:
+            return sorted(self.by_metric)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+
+_journal = None
+
+
+def enable_journal(directory=DEFAULT_DIR, **kwargs):
+    global _journal
+    if _journal is None:
+        try:
+            _journal = AlertJournal(directory, **kwargs)
+        except OSError as e:
+            print(f"[ERROR] Failed to open alert journal {directory}: {e}; keeping alerts in memory")
+            _journal = AlertJournal(None, **kwargs)
+    return _journal
+
+
+def get_journal():
+    return _journal
+
+
+def close_journal():
+    global _journal
+    if _journal is not None:
+        _journal.close()
+        _journal = None
+
+
+def record_alert(kind, message, **fields):
+    # No-op unless the application enabled the journal
+    if _journal is not None:
+        return _journal.append(kind, message, **fields)
+    return None
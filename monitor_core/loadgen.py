@@ -0,0 +1,165 @@
+import multiprocessing
+import os
+import socket
+import threading
+import time
+
+# Known, controllable load for checking the collectors (see
+# application/loadtest.py). Every generator runs in child processes so the
+# load it creates is never charged to the monitor process whose overhead
+# is being measured. Each one reports the load it actually produced, which
+# can differ from the request when the box cannot keep up.
+
+PACE = 0.05  # seconds per pacing slice for the rate-limited generators
+
+
+def spin(stop, busy_fraction):
+    # Busy for busy_fraction of every 100 ms, idle for the rest
+    period = 0.1
+    while not stop.is_set():
+        start = time.perf_counter()
+        while time.perf_counter() - start < period * busy_fraction:
+            pass
+        rest = period - (time.perf_counter() - start)
+        if rest > 0:
+            stop.wait(rest)
+
+
+def hold_memory(stop, ready, size):
+    buf = bytearray(size)
+    buf[::4096] = b'\x01' * len(range(0, size, 4096))  # touch every page
+    ready.set()
+    stop.wait()
+    del buf
+
+
+def write_disk(stop, produced, directory, bytes_per_sec, chunk=1024 * 1024):
+    # Paced writes, each followed by fsync so they reach the device instead
+    # of sitting in the page cache
+    path = os.path.join(directory, f".os_monitor_loadgen_{os.getpid()}")
+    data = os.urandom(chunk)
+    written = 0
+    started = time.perf_counter()
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        while not stop.is_set():
+            due = (time.perf_counter() - started) * bytes_per_sec
+            if written + chunk <= due:
+                if os.lseek(fd, 0, os.SEEK_CUR) >= 256 * chunk:
+                    os.lseek(fd, 0, os.SEEK_SET)  # stay within 256 MB of disk
+                os.write(fd, data)
+                os.fsync(fd)
+                written += chunk
+                with produced.get_lock():
+                    produced.value = written / (time.perf_counter() - started)
+            else:
+                stop.wait(PACE)
+    finally:
+        os.close(fd)
+        os.remove(path)
+
+
+def send_loopback(stop, produced, bytes_per_sec, chunk=16 * 1024):
+    # A paced TCP stream over 127.0.0.1; loopback counts every byte once as
+    # sent and once as received
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+
+    def drain(conn):
+        while conn.recv(1 << 16):
+            pass
+
+    client = socket.create_connection(server.getsockname())
+    conn, _ = server.accept()
+    reader = threading.Thread(target=drain, args=(conn,), daemon=True)
+    reader.start()
+    data = b'\x00' * chunk
+    sent = 0
+    started = time.perf_counter()
+    while not stop.is_set():
+        due = (time.perf_counter() - started) * bytes_per_sec
+        if sent + chunk <= due:
+            client.sendall(data)
+            sent += chunk
+            with produced.get_lock():
+                produced.value = sent / (time.perf_counter() - started)
+        else:
+            stop.wait(min(PACE, chunk / bytes_per_sec))
+    client.close()
+    reader.join(1)
+    conn.close()
+    server.close()
+
+
+class Load:
+    # Base for the generators: start() launches the child processes,
+    # stop() ends them; `produced` is the achieved rate where one applies
+    def __init__(self):
+        self.stop_event = multiprocessing.Event()
+        self.processes = []
+        self.produced = multiprocessing.Value('d', 0.0)
+
+    def spawn(self, target, *args):
+        proc = multiprocessing.Process(target=target, args=(self.stop_event,) + args, daemon=True)
+        proc.start()
+        self.processes.append(proc)
+
+    def stop(self):
+        self.stop_event.set()
+        for proc in self.processes:
+            proc.join(5)
+            if proc.is_alive():
+                proc.terminate()
+        self.processes = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class CPULoad(Load):
+    # `cores` fully busy CPUs (fractions spread over one extra process)
+    def __init__(self, cores):
+        super().__init__()
+        self.cores = cores
+
+    def start(self):
+        whole, part = divmod(self.cores, 1)
+        for _ in range(int(whole)):
+            self.spawn(spin, 1.0)
+        if part > 0.01:
+            self.spawn(spin, part)
+
+
+class MemoryLoad(Load):
+    def __init__(self, size):
+        super().__init__()
+        self.size = size
+
+    def start(self):
+        ready = multiprocessing.Event()
+        self.spawn(hold_memory, ready, self.size)
+        ready.wait(30)
+
+
+class DiskLoad(Load):
+    def __init__(self, bytes_per_sec, directory=None):
+        super().__init__()
+        self.bytes_per_sec = bytes_per_sec
+        self.directory = directory or os.getcwd()
+
+    def start(self):
+        self.spawn(write_disk, self.produced, self.directory, self.bytes_per_sec)
+
+
+class NetworkLoad(Load):
+    def __init__(self, bytes_per_sec):
+        super().__init__()
+        self.bytes_per_sec = bytes_per_sec
+
+    def start(self):
+        self.spawn(send_loopback, self.produced, self.bytes_per_sec)
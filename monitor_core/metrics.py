@@ -0,0 +1,40 @@
+from monitor_core.archive import get_archive
+from monitor_core.shm import get_publisher
+from monitor_core.sketch import get_stats
+from monitor_core.snapshot import get_recorder
+
+# Single hand-off point for collector samples: every value published here
+# feeds the percentile sketches and, when enabled, the on-disk archive and
+# the shared-memory snapshot for other local readers, and is checked by the
+# anomaly triggers that capture root-cause snapshots.
+
+
+def publish(source, values, ts=None):
+    stats = get_stats()
+    for name, value in values.items():
+        if value is not None:
+            stats.add(f"{source}.{name}", value, ts)
+    archive = get_archive()
+    if archive:
+        archive.record(source, values, ts)
+    publisher = get_publisher()
+    if publisher:
+        publisher.publish({f"{source}.{name}": value for name, value in values.items() if value is not None}, ts)
+    recorder = get_recorder()
+    if recorder:
+        recorder.observe(source, values)
+
+
+def percentile_text(metric, label, unit="", fmt="{:.1f}", windows=('1m', '1h', '24h')):
+    # "<b>label p50/p95/p99/max:</b> 1m 3.0/9.1/12.0/15.2% · 1h ..." for the details labels
+    stats = get_stats()
+    parts = []
+    for window in windows:
+        summary = stats.summary(metric, window)
+        if summary is None:
+            continue
+        values = "/".join(fmt.format(summary[key]) for key in ('p50', 'p95', 'p99', 'max'))
+        parts.append(f"{window} {values}{unit}")
+    if not parts:
+        return ""
+    return f"<b>{label} p50/p95/p99/max:</b> {' &middot; '.join(parts)}"
@@ -0,0 +1,304 @@
+import os
+import socket
+import struct
+import time
+
+from monitor_core.procfs import ProcFile
+
+# Per-process network attribution. The socket inventory comes from
+# /proc/net/{tcp,tcp6,udp,udp6}; sockets are tied to processes through a
+# cached socket-inode -> PID map that only rescans /proc/<pid>/fd for
+# processes that are new or whose fd count changed; per-connection TCP byte
+# counters come from a sock_diag dump (tcp_info.bytes_acked/bytes_received).
+# The kernel keeps no byte counters for UDP sockets, so those are attributed
+# by queued bytes and socket count only.
+
+NET_TABLES = (
+    ('tcp', '/proc/net/tcp'),
+    ('tcp6', '/proc/net/tcp6'),
+    ('udp', '/proc/net/udp'),
+    ('udp6', '/proc/net/udp6'),
+)
+
+TCP_STATES = {
+    0x01: 'ESTABLISHED', 0x02: 'SYN_SENT', 0x03: 'SYN_RECV', 0x04: 'FIN_WAIT1',
+    0x05: 'FIN_WAIT2', 0x06: 'TIME_WAIT', 0x07: 'CLOSE', 0x08: 'CLOSE_WAIT',
+    0x09: 'LAST_ACK', 0x0A: 'LISTEN', 0x0B: 'CLOSING',
+}
+
+NETLINK_SOCK_DIAG = 4
+SOCK_DIAG_BY_FAMILY = 20
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+INET_DIAG_INFO = 2
+TCP_INFO_BYTES_ACKED = 120
+TCP_INFO_BYTES_RECEIVED = 128
+
+NLMSGHDR = struct.Struct('=IHHII')
+INET_DIAG_REQ_V2 = struct.Struct('=BBBxI48x')
+INET_DIAG_MSG_INODE = struct.Struct('=I')  # inode is the last field of the 72-byte inet_diag_msg
+INET_DIAG_MSG_SIZE = 72
+RTATTR = struct.Struct('=HH')
+U64 = struct.Struct('=Q')
+
+
+def decode_endpoint(text):
+    # "0100007F:1F90" (IPv4, little-endian words) or 32 hex digits for IPv6
+    address, port = text.split(b':')
+    raw = bytes.fromhex(address.decode())
+    if len(raw) == 4:
+        host = socket.inet_ntop(socket.AF_INET, raw[::-1])
+    else:
+        raw = b''.join(raw[i:i + 4][::-1] for i in range(0, 16, 4))
+        host = socket.inet_ntop(socket.AF_INET6, raw)
+    return f"{host}:{int(port, 16)}"
+
+
+class SocketTable:
+    def __init__(self):
+        self.files = []
+        self.rows = 0  # table rows parsed by the last read, orphaned sockets included
+        for proto, path in NET_TABLES:
+            try:
+                self.files.append((proto, ProcFile(path, size=65536)))
+            except OSError:
+                pass
+
+    def read(self):
+        # inode -> (proto, local, remote, state, queued_bytes, uid)
+        # Endpoints stay as raw hex and are only decoded for displayed rows.
+        sockets = {}
+        self.rows = 0
+        for proto, procfile in self.files:
+            with procfile.lock:
+                n = procfile.read()
+                data = procfile.view[:n].tobytes()
+            lines = data.split(b'\n')[1:]
+            if lines and lines[-1]:
+                # Every row ends with a newline; anything else is a cut-off read
+                print(f"[ERROR] Truncated socket table {procfile.path}: {len(lines)} rows, last one incomplete")
+            for line in lines:
+                fields = line.split(None, 10)
+                if len(fields) < 10:
+                    continue
+                self.rows += 1
+                inode = int(fields[9])
+                if inode == 0:  # TIME_WAIT and other orphaned sockets
+                    continue
+                tx_queue, rx_queue = fields[4].split(b':')
+                sockets[inode] = (
+                    proto, fields[1], fields[2], int(fields[3], 16),
+                    int(tx_queue, 16) + int(rx_queue, 16), int(fields[7]),
+                )
+        return sockets
+
+
+class InodeOwnerMap:
+    def __init__(self):
+        self.inode_pid = {}
+        self.pid_inodes = {}
+        self.pid_fd_count = {}
+        self.pid_uid = {}
+        self.names = {}
+        self.scans = 0
+        # /proc/<pid>/fd reports its fd count as st_size on Linux 6.2+
+        self.fd_count_supported = os.stat('/proc/self/fd').st_size > 0
+
+    def scan_pid(self, pid):
+        self.scans += 1
+        inodes = set()
+        fd_dir = f'/proc/{pid}/fd'
+        try:
+            for entry in os.scandir(fd_dir):
+                try:
+                    target = os.readlink(entry.path)
+                except OSError:
+                    continue
+                if target.startswith('socket:['):
+                    inodes.add(int(target[8:-1]))
+            self.pid_fd_count[pid] = os.stat(fd_dir).st_size
+        except OSError:
+            # Exited, or not ours to inspect without privileges
+            self.pid_fd_count[pid] = -1
+        for inode in self.pid_inodes.get(pid, ()):
+            if self.inode_pid.get(inode) == pid:
+                del self.inode_pid[inode]
+        self.pid_inodes[pid] = inodes
+        for inode in inodes:
+            self.inode_pid[inode] = pid
+
+    def forget(self, pid):
+        for inode in self.pid_inodes.pop(pid, ()):
+            if self.inode_pid.get(inode) == pid:
+                del self.inode_pid[inode]
+        self.pid_fd_count.pop(pid, None)
+        self.pid_uid.pop(pid, None)
+        self.names.pop(pid, None)
+
+    def fd_count_changed(self, pid):
+        # Without fd counts (older kernels) we cannot tell, so assume it changed
+        if not self.fd_count_supported:
+            return True
+        try:
+            count = os.stat(f'/proc/{pid}/fd').st_size
+        except OSError:
+            return False
+        return count != self.pid_fd_count.get(pid)
+
+    def refresh(self, sockets):
+        pids = {int(name) for name in os.listdir('/proc') if name.isdigit()}
+        for pid in list(self.pid_inodes):
+            if pid not in pids:
+                self.forget(pid)
+        for pid in pids:
+            if pid not in self.pid_inodes:
+                try:
+                    self.pid_uid[pid] = os.stat(f'/proc/{pid}').st_uid
+                except OSError:
+                    continue
+                self.scan_pid(pid)
+
+        # Sockets we cannot attribute yet belong to a process that opened
+        # them since its last scan; only rescan same-uid processes whose fd
+        # table changed size.
+        unknown_uids = {sock[5] for inode, sock in sockets.items() if inode not in self.inode_pid}
+        if unknown_uids:
+            for pid, uid in list(self.pid_uid.items()):
+                if uid in unknown_uids and self.pid_fd_count.get(pid, -1) >= 0 and self.fd_count_changed(pid):
+                    self.scan_pid(pid)
+
+        # Drop inodes whose socket has closed
+        for inode in [inode for inode in self.inode_pid if inode not in sockets]:
+            del self.inode_pid[inode]
+
+    def name(self, pid):
+        name = self.names.get(pid)
+        if name is None:
+            try:
+                with open(f'/proc/{pid}/comm') as f:
+                    name = f.read().strip()
+            except OSError:
+                name = "?"
+            self.names[pid] = name
+        return name
+
+
+class TcpByteCounters:
+    # Dumps all TCP sockets through NETLINK_SOCK_DIAG with tcp_info attached
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_SOCK_DIAG)
+        self.sock.settimeout(2.0)
+        self.seq = 0
+
+    def read(self):
+        counters = {}  # inode -> (bytes_sent, bytes_recv)
+        for family in (socket.AF_INET, socket.AF_INET6):
+            self.seq += 1
+            payload = INET_DIAG_REQ_V2.pack(family, socket.IPPROTO_TCP, 1 << (INET_DIAG_INFO - 1), 0xFFF)
+            self.sock.send(NLMSGHDR.pack(NLMSGHDR.size + len(payload), SOCK_DIAG_BY_FAMILY, NLM_F_REQUEST | NLM_F_DUMP, self.seq, 0) + payload)
+            done = False
+            while not done:
+                data = self.sock.recv(1 << 20)
+                offset = 0
+                while offset + NLMSGHDR.size <= len(data):
+                    length, msg_type, _, _, _ = NLMSGHDR.unpack_from(data, offset)
+                    if length < NLMSGHDR.size:
+                        break
+                    if msg_type in (NLMSG_DONE, NLMSG_ERROR):
+                        done = True
+                        break
+                    self.parse(data, offset + NLMSGHDR.size, offset + length, counters)
+                    offset += (length + 3) & ~3
+        return counters
+
+    def parse(self, data, start, end, counters):
+        inode, = INET_DIAG_MSG_INODE.unpack_from(data, start + INET_DIAG_MSG_SIZE - 4)
+        if inode == 0:
+            return
+        offset = start + INET_DIAG_MSG_SIZE
+        while offset + RTATTR.size <= end:
+            length, kind = RTATTR.unpack_from(data, offset)
+            if length < RTATTR.size:
+                break
+            if kind == INET_DIAG_INFO and length - RTATTR.size >= TCP_INFO_BYTES_RECEIVED + 8:
+                info = offset + RTATTR.size
+                counters[inode] = (
+                    U64.unpack_from(data, info + TCP_INFO_BYTES_ACKED)[0],
+                    U64.unpack_from(data, info + TCP_INFO_BYTES_RECEIVED)[0],
+                )
+                return
+            offset += (length + 3) & ~3
+
+    def close(self):
+        self.sock.close()
+
+
+class NetworkAttribution:
+    def __init__(self, top_n=10):
+        self.top_n = top_n
+        self.table = SocketTable()
+        self.owners = InodeOwnerMap()
+        try:
+            self.tcp_bytes = TcpByteCounters()
+        except OSError:
+            self.tcp_bytes = None
+        self.prev_bytes = None
+        self.prev_time = time.time()
+
+    def sample(self):
+        now = time.time()
+        interval = max(now - self.prev_time, 1e-3)
+        self.prev_time = now
+
+        sockets = self.table.read()
+        self.owners.refresh(sockets)
+        counters = self.tcp_bytes.read() if self.tcp_bytes else {}
+
+        per_pid = {}
+        connections = []
+        for inode, (proto, local, remote, state, queued, _) in sockets.items():
+            sent = recv = 0.0
+            if inode in counters and self.prev_bytes is not None:
+                # A socket first seen this tick started within the interval
+                prev_sent, prev_recv = self.prev_bytes.get(inode, (0, 0))
+                sent = (counters[inode][0] - prev_sent) / interval
+                recv = (counters[inode][1] - prev_recv) / interval
+            pid = self.owners.inode_pid.get(inode)
+            entry = per_pid.get(pid)
+            if entry is None:
+                entry = per_pid[pid] = [0.0, 0.0, 0, 0]
+            entry[0] += sent
+            entry[1] += recv
+            entry[2] += 1
+            entry[3] += queued
+            if sent or recv:
+                connections.append((sent + recv, sent, recv, pid, proto, local, remote, state))
+        self.prev_bytes = counters
+
+        top = sorted(per_pid.items(), key=lambda item: (item[1][0] + item[1][1], item[1][3]), reverse=True)[:self.top_n]
+        talkers = [
+            {
+                'pid': pid,
+                'name': self.owners.name(pid) if pid is not None else "(unattributed)",
+                'sent': sent, 'recv': recv,
+                'sockets': count, 'queued': queued,
+            }
+            for pid, (sent, recv, count, queued) in top
+        ]
+        connections.sort(reverse=True)
+        top_connections = [
+            {
+                'pid': pid, 'proto': proto,
+                'local': decode_endpoint(local), 'remote': decode_endpoint(remote),
+                'state': TCP_STATES.get(state, str(state)) if proto.startswith('tcp') else '',
+                'sent': sent, 'recv': recv,
+            }
+            for _, sent, recv, pid, proto, local, remote, state in connections[:self.top_n]
+        ]
+        return {'talkers': talkers, 'connections': top_connections, 'sockets': len(sockets)}
+
+    def close(self):
+        if self.tcp_bytes:
+            self.tcp_bytes.close()
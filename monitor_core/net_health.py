@@ -0,0 +1,108 @@
+from array import array
+
+from monitor_core.procfs import SNMP_FIELDS, NETSTAT_FIELDS, SOCKSTAT_FIELDS
+
+# TCP/UDP health from /proc/net/snmp, /proc/net/netstat and
+# /proc/net/sockstat (Linux). The kernel counters are cumulative; fill()
+# turns them into per-second rates over the same interval the throughput
+# uses and writes them straight into the tick's NetworkSample. Socket
+# counts from sockstat are reported as they are.
+
+SNMP = {name: i for i, name in enumerate(SNMP_FIELDS)}
+NETSTAT = {name: i for i, name in enumerate(NETSTAT_FIELDS)}
+SOCKSTAT = {name: i for i, name in enumerate(SOCKSTAT_FIELDS)}
+
+RETRANS_ALERT = 5.0          # percent of outgoing segments retransmitted...
+RETRANS_MIN_SEGMENTS = 100   # ...while sending at least this many segments/s
+RESET_ALERT = 100.0          # resets sent per second
+CLEAR_AFTER = 3              # quiet ticks before an alert re-arms
+
+# (key, metric, active, message) for the alert hooks: `active` decides from
+# a filled sample whether the condition holds, `message` describes it
+HEALTH_ALERTS = [
+    ('retransmits', 'network.tcp_retrans_pct',
+     lambda s: s.tcp_retrans_pct >= RETRANS_ALERT and s.tcp_out_segments >= RETRANS_MIN_SEGMENTS,
+     lambda s: f"TCP retransmit storm: {s.tcp_retrans_pct:.1f}% of segments ({s.tcp_retrans:.0f}/s)"),
+    ('listen', 'network.listen_overflows',
+     lambda s: s.listen_overflows > 0 or s.listen_drops > 0,
+     lambda s: f"Listen queue overflow: {s.listen_overflows:.0f}/s overflows, {s.listen_drops:.0f}/s SYNs dropped"),
+    ('udp', 'network.udp_drops',
+     lambda s: s.udp_drops > 0,
+     lambda s: f"UDP receive drops: {s.udp_drops:.0f}/s ({s.udp_rcvbuf_errors:.0f}/s receive buffer full)"),
+    ('resets', 'network.tcp_resets',
+     lambda s: s.tcp_resets >= RESET_ALERT,
+     lambda s: f"TCP reset burst: {s.tcp_resets:.0f} resets/s sent"),
+]
+
+
+class NetHealth:
+    def __init__(self, reader):
+        self.snmp = reader.snmp
+        self.netstat = reader.netstat
+        self.sockstat = reader.sockstat
+        self.prev_snmp = array('d', self.snmp.update())
+        self.prev_netstat = array('d', self.netstat.update())
+        self.active = {}  # alert key -> quiet ticks since the condition last held
+
+    @staticmethod
+    def available(reader):
+        return reader is not None and reader.snmp is not None
+
+    def fill(self, sample, interval):
+        snmp = self.snmp.update()
+        netstat = self.netstat.update()
+        sockstat = self.sockstat.update()
+        prev_snmp = self.prev_snmp
+        prev_netstat = self.prev_netstat
+
+        def rate(values, prev, index):
+            # Counters only go backwards on a namespace reset; treat that as 0
+            return max(values[index] - prev[index], 0.0) / interval
+
+        out_segments = rate(snmp, prev_snmp, SNMP['Tcp.OutSegs'])
+        sample.tcp_out_segments = out_segments
+        sample.tcp_retrans = rate(snmp, prev_snmp, SNMP['Tcp.RetransSegs'])
+        sample.tcp_retrans_pct = sample.tcp_retrans / out_segments * 100 if out_segments else 0.0
+        sample.tcp_resets = rate(snmp, prev_snmp, SNMP['Tcp.OutRsts'])
+        sample.tcp_estab_resets = rate(snmp, prev_snmp, SNMP['Tcp.EstabResets'])
+        sample.tcp_attempt_fails = rate(snmp, prev_snmp, SNMP['Tcp.AttemptFails'])
+        sample.tcp_in_errors = rate(snmp, prev_snmp, SNMP['Tcp.InErrs'])
+        sample.tcp_timeouts = rate(netstat, prev_netstat, NETSTAT['TcpExt.TCPTimeouts'])
+        sample.listen_overflows = rate(netstat, prev_netstat, NETSTAT['TcpExt.ListenOverflows'])
+        sample.listen_drops = rate(netstat, prev_netstat, NETSTAT['TcpExt.ListenDrops'])
+        sample.udp_rcvbuf_errors = rate(snmp, prev_snmp, SNMP['Udp.RcvbufErrors'])
+        sample.udp_drops = rate(snmp, prev_snmp, SNMP['Udp.InErrors'])  # includes RcvbufErrors
+        sample.udp_noports = rate(snmp, prev_snmp, SNMP['Udp.NoPorts'])
+        sample.tcp_estab = snmp[SNMP['Tcp.CurrEstab']]
+        sample.tcp_inuse = sockstat[SOCKSTAT['TCP.inuse']]
+        sample.tcp_tw = sockstat[SOCKSTAT['TCP.tw']]
+        sample.tcp_orphan = sockstat[SOCKSTAT['TCP.orphan']]
+        sample.udp_inuse = sockstat[SOCKSTAT['UDP.inuse']]
+
+        prev_snmp[:] = snmp
+        prev_netstat[:] = netstat
+        return sample
+
+    def check_alerts(self, sample):
+        # [(metric, message)] for conditions that just started; a condition
+        # re-arms after CLEAR_AFTER consecutive ticks without it
+        raised = []
+        for key, metric, active, message in HEALTH_ALERTS:
+            if active(sample):
+                if key not in self.active:
+                    raised.append((metric, message(sample)))
+                self.active[key] = 0
+            elif key in self.active:
+                self.active[key] += 1
+                if self.active[key] >= CLEAR_AFTER:
+                    del self.active[key]
+        return raised
+
+    def publish_values(self, sample):
+        drops = None if sample.listen_drops is None else sample.listen_drops + sample.udp_drops
+        return {
+            'tcp_retrans': sample.tcp_retrans, 'tcp_retrans_pct': sample.tcp_retrans_pct,
+            'tcp_resets': sample.tcp_resets, 'tcp_timeouts': sample.tcp_timeouts,
+            'listen_overflows': sample.listen_overflows, 'listen_drops': sample.listen_drops,
+            'udp_drops': sample.udp_drops, 'drops': drops, 'tcp_estab': sample.tcp_estab, 'tcp_tw': sample.tcp_tw,
+        }
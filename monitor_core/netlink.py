@@ -0,0 +1,185 @@
+import errno
+import os
+import socket
+import struct
+
+# rtnetlink link/address change listener. Subscribing to the multicast
+# groups needs no privileges; the kernel pushes a message whenever an
+# interface goes up/down, is renamed, or gains/loses an address.
+
+NETLINK_ROUTE = 0
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV6_IFADDR = 0x100
+
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_GETADDR = 22
+
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+
+IFLA_ADDRESS = 1
+IFLA_IFNAME = 3
+IFLA_OPERSTATE = 16
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+
+IFF_UP = 0x1
+IFF_LOOPBACK = 0x8
+IFF_RUNNING = 0x40
+
+OPERSTATES = ('unknown', 'notpresent', 'down', 'lowerlayerdown', 'testing', 'dormant', 'up')
+
+NLMSGHDR = struct.Struct('=IHHII')
+IFINFOMSG = struct.Struct('=BxHiII')
+IFADDRMSG = struct.Struct('=BBBBI')
+RTATTR = struct.Struct('=HH')
+
+
+def available():
+    return hasattr(socket, 'AF_NETLINK')
+
+
+def parse_attrs(data, offset, end):
+    attrs = {}
+    while offset + RTATTR.size <= end:
+        length, kind = RTATTR.unpack_from(data, offset)
+        if length < RTATTR.size:
+            break
+        attrs[kind] = data[offset + RTATTR.size:offset + length]
+        offset += (length + 3) & ~3
+    return attrs
+
+
+def format_address(family, raw):
+    try:
+        return socket.inet_ntop(family, raw)
+    except (ValueError, OSError):
+        return raw.hex()
+
+
+class LinkWatcher:
+    def __init__(self, timeout=1.0):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        self.sock.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV6_IFADDR))
+        self.sock.settimeout(timeout)
+        self.seq = 0
+        self.links = {}  # ifindex -> {'name', 'flags', 'state', 'mac', 'addresses'}
+        self.dump(RTM_GETLINK, IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0))
+        self.dump(RTM_GETADDR, IFADDRMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0))
+
+    def dump(self, msg_type, payload):
+        # Initial state comes from a one-off dump request on the same socket;
+        # change notifications that race with it are applied in order anyway.
+        self.seq += 1
+        header = NLMSGHDR.pack(NLMSGHDR.size + len(payload), msg_type, NLM_F_REQUEST | NLM_F_DUMP, self.seq, 0)
+        self.sock.send(header + payload)
+        done = False
+        while not done:
+            data = self.sock.recv(65536)
+            for msg_type, msg in self.messages(data):
+                if msg_type in (NLMSG_DONE, NLMSG_ERROR):
+                    done = True
+                else:
+                    self.apply(msg_type, msg)
+
+    def messages(self, data):
+        offset = 0
+        while offset + NLMSGHDR.size <= len(data):
+            length, msg_type, _, _, _ = NLMSGHDR.unpack_from(data, offset)
+            if length < NLMSGHDR.size:
+                break
+            yield msg_type, data[offset + NLMSGHDR.size:offset + length]
+            offset += (length + 3) & ~3
+
+    def apply(self, msg_type, msg):
+        # Returns a short description of what changed, or None
+        if msg_type in (RTM_NEWLINK, RTM_DELLINK):
+            _, _, index, flags, _ = IFINFOMSG.unpack_from(msg, 0)
+            attrs = parse_attrs(msg, IFINFOMSG.size, len(msg))
+            if msg_type == RTM_DELLINK:
+                link = self.links.pop(index, None)
+                return f"{link['name']} removed" if link else None
+            name = attrs.get(IFLA_IFNAME, b'').rstrip(b'\0').decode(errors='replace')
+            state = OPERSTATES[attrs[IFLA_OPERSTATE][0]] if IFLA_OPERSTATE in attrs and attrs[IFLA_OPERSTATE][0] < len(OPERSTATES) else 'unknown'
+            if state == 'unknown':
+                # Virtual devices often never report an operstate
+                state = 'up' if flags & IFF_UP else 'down'
+            mac = ':'.join(f'{b:02x}' for b in attrs.get(IFLA_ADDRESS, b''))
+            link = self.links.get(index)
+            if link is None:
+                self.links[index] = {'name': name, 'flags': flags, 'state': state, 'mac': mac, 'addresses': []}
+                return f"{name} added ({state})"
+            changes = []
+            if name and name != link['name']:
+                changes.append(f"{link['name']} renamed to {name}")
+                link['name'] = name
+            if state != link['state']:
+                changes.append(f"{link['name']} is {state}")
+                link['state'] = state
+            link['flags'] = flags
+            link['mac'] = mac or link['mac']
+            return '; '.join(changes) or None
+
+        if msg_type in (RTM_NEWADDR, RTM_DELADDR):
+            family, prefixlen, _, _, index = IFADDRMSG.unpack_from(msg, 0)
+            attrs = parse_attrs(msg, IFADDRMSG.size, len(msg))
+            raw = attrs.get(IFA_LOCAL) or attrs.get(IFA_ADDRESS)
+            link = self.links.get(index)
+            if raw is None or link is None:
+                return None
+            address = f"{format_address(family, raw)}/{prefixlen}"
+            if msg_type == RTM_NEWADDR and address not in link['addresses']:
+                link['addresses'].append(address)
+                return f"{link['name']} gained {address}"
+            if msg_type == RTM_DELADDR and address in link['addresses']:
+                link['addresses'].remove(address)
+                return f"{link['name']} lost {address}"
+        return None
+
+    def read_events(self):
+        # Blocks until the kernel reports something or the timeout expires
+        try:
+            data = self.sock.recv(65536)
+        except socket.timeout:
+            return []
+        except OSError as e:
+            if e.errno != errno.ENOBUFS:
+                raise
+            # The receive queue overflowed and notifications were lost:
+            # rebuild the state from a fresh dump.
+            self.links = {}
+            self.dump(RTM_GETLINK, IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0))
+            self.dump(RTM_GETADDR, IFADDRMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0))
+            return ["link state resynchronised"]
+        events = []
+        for msg_type, msg in self.messages(data):
+            event = self.apply(msg_type, msg)
+            if event:
+                events.append(event)
+        return events
+
+    def primary_link(self):
+        # First non-loopback interface that is up and has an address,
+        # falling back to any non-loopback interface.
+        candidates = [link for link in self.links.values() if not link['flags'] & IFF_LOOPBACK]
+        for link in candidates:
+            if link['flags'] & IFF_UP and link['state'] == 'up' and link['addresses']:
+                return link
+        return candidates[0] if candidates else None
+
+    @staticmethod
+    def connection_type(name):
+        if os.path.exists(f'/sys/class/net/{name}/wireless'):
+            return "Wi-Fi"
+        return "Ethernet"
+
+    def close(self):
+        self.sock.close()
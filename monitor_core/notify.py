@@ -0,0 +1,384 @@
+import asyncio
+import html
+import json
+import os
+import re
+import shutil
+import socket
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Pushes journaled alerts to external sinks without touching the sampling or
+# GUI threads. submit() only hands the alert to an asyncio loop running on
+# its own thread. Each sink has its own queue and task, so a slow webhook
+# never delays the desktop notification:
+#
+#   - alerts that arrive within DIGEST_WINDOW of each other are coalesced
+#     into one digest message;
+#   - a token bucket limits each sink to `rate` messages per `per` seconds,
+#     and alerts that arrive while a sink waits for a token join the next
+#     digest instead of being sent one by one;
+#   - a failed delivery is retried with exponential backoff, then dropped.
+#
+# Sinks are chosen with --notify (or OS_MONITOR_NOTIFY, comma separated):
+#   desktop                      notify-send / osascript
+#   webhook:http://host:port/path  JSON POST
+#   file:/path/to/alerts.log       one JSON line per message
+#   syslog[:host:port]             /dev/log, or UDP to a syslog server
+
+DIGEST_WINDOW = 5.0
+MAX_DIGEST = 100       # alerts kept per digest; the rest are only counted
+QUEUE_LIMIT = 1000     # alerts waiting per sink before new ones are dropped
+RETRIES = 3
+RETRY_DELAY = 1.0      # doubled after every failed attempt
+SEND_TIMEOUT = 5.0
+
+
+def plain(text):
+    return html.unescape(re.sub(r'<[^>]+>', '', text))
+
+
+def build_message(alerts, dropped=0):
+    # {'title', 'body', 'alerts'} for one alert or a digest of several
+    if len(alerts) == 1 and not dropped:
+        alert = alerts[0]
+        title = f"OS Monitor: {alert['kind']}"
+        body = plain(alert['message'])
+    else:
+        count = len(alerts) + dropped
+        title = f"OS Monitor: {count} alerts"
+        lines = [plain(alert['message']) for alert in alerts[:10]]
+        if count > len(lines):
+            lines.append(f"... and {count - len(lines)} more")
+        body = "\n".join(lines)
+    return {'title': title, 'body': body, 'alerts': alerts, 'dropped': dropped}
+
+
+class TokenBucket:
+    def __init__(self, rate, per):
+        self.capacity = rate
+        self.fill_rate = rate / per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+        self.updated = now
+
+    def delay(self):
+        # Seconds until a token is available
+        self.refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.fill_rate
+
+    def take(self):
+        self.refill()
+        self.tokens -= 1
+
+
+class DesktopSink:
+    name = "desktop"
+    rate, per = 3, 60
+
+    def __init__(self):
+        if sys.platform == "darwin":
+            self.command = shutil.which("osascript")
+        else:
+            self.command = shutil.which("notify-send")
+        if self.command is None:
+            raise OSError("no desktop notification command (notify-send / osascript) found")
+
+    async def send(self, message):
+        if sys.platform == "darwin":
+            script = f"display notification {json.dumps(message['body'])} with title {json.dumps(message['title'])}"
+            args = [self.command, "-e", script]
+        else:
+            args = [self.command, "--app-name=OS Monitor", message['title'], message['body']]
+        proc = await asyncio.create_subprocess_exec(*args, stdout=asyncio.subprocess.DEVNULL,
+                                                    stderr=asyncio.subprocess.DEVNULL)
+        if await proc.wait() != 0:
+            raise OSError(f"{os.path.basename(self.command)} exited with {proc.returncode}")
+
+
+class WebhookSink:
+    name = "webhook"
+    rate, per = 6, 60
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        if parts.scheme != "http" or not parts.hostname:
+            raise ValueError(f"webhook URL must be http://host[:port]/path, got {url!r}")
+        self.url = url
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+    async def send(self, message):
+        body = json.dumps(message, default=str).encode()
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(
+                f"POST {self.path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+        finally:
+            writer.close()
+        try:
+            status = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            raise OSError(f"bad response from {self.url}: {status_line[:80]!r}")
+        if not 200 <= status < 300:
+            raise OSError(f"{self.url} returned HTTP {status}")
+
+
+class FileSink:
+    name = "file"
+    rate, per = 60, 60
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def write(self, line):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+    async def send(self, message):
+        line = json.dumps({'ts': time.time(), **message}, default=str) + "\n"
+        await asyncio.get_running_loop().run_in_executor(None, self.write, line)
+
+
+class SyslogSink:
+    name = "syslog"
+    rate, per = 30, 60
+    PRIORITY = 8 * 1 + 4  # facility user, severity warning
+
+    def __init__(self, address=None):
+        if address:
+            host, _, port = address.rpartition(':')
+            self.address = (host or address, int(port) if host else 514)
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        else:
+            self.address = "/dev/log"
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+
+    async def send(self, message):
+        text = f"{message['title']}: {message['body']}".replace("\n", "; ")
+        packet = f"<{self.PRIORITY}>{time.strftime('%b %d %H:%M:%S')} os_monitor[{os.getpid()}]: {text}"
+        self.sock.sendto(packet.encode()[:2048], self.address)
+
+    def close(self):
+        self.sock.close()
+
+
+def make_sink(spec):
+    kind, _, arg = spec.strip().partition(':')
+    if kind == "desktop":
+        return DesktopSink()
+    if kind == "webhook":
+        return WebhookSink(arg)
+    if kind == "file":
+        return FileSink(arg or os.path.join("~", ".os_monitor", "notifications.log"))
+    if kind == "syslog":
+        return SyslogSink(arg or None)
+    raise ValueError(f"unknown notification sink {spec!r}")
+
+
+class SinkState:
+    def __init__(self, sink, bucket):
+        self.sink = sink
+        self.bucket = bucket
+        self.queue = asyncio.Queue()
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.last_error = None
+
+
+class NotificationDispatcher:
+    def __init__(self, sinks, digest_window=DIGEST_WINDOW, retries=RETRIES, retry_delay=RETRY_DELAY):
+        self.sinks = sinks
+        self.digest_window = digest_window
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.states = []
+        self.loop = asyncio.new_event_loop()
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="notify", daemon=True)
+        self.thread.start()
+        self.ready.wait()
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.states = [SinkState(sink, TokenBucket(sink.rate, sink.per)) for sink in self.sinks]
+        self.tasks = [self.loop.create_task(self.deliver(state)) for state in self.states]
+        self.ready.set()
+        self.loop.run_until_complete(asyncio.gather(*self.tasks, return_exceptions=True))
+        self.loop.close()
+
+    def submit(self, alert):
+        # Thread-safe and non-blocking; alert is a dict with at least
+        # 'kind' and 'message' (a journal record)
+        alert = {key: value for key, value in alert.items() if key != 'details'}
+        try:
+            self.loop.call_soon_threadsafe(self.enqueue, alert)
+        except RuntimeError:
+            pass  # loop already closed
+
+    def enqueue(self, alert):
+        for state in self.states:
+            if state.queue.qsize() >= QUEUE_LIMIT:
+                state.dropped += 1
+            else:
+                state.queue.put_nowait(alert)
+
+    async def deliver(self, state):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            alert = await state.queue.get()
+            if alert is None:
+                break
+            batch = [alert]
+            # Wait out the digest window (or the rate limit, if longer) and
+            # take everything that arrived meanwhile
+            deadline = loop.time() + max(self.digest_window, state.bucket.delay())
+            while True:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    alert = await asyncio.wait_for(state.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if alert is None:
+                    stopping = True
+                    break
+                if len(batch) < MAX_DIGEST:
+                    batch.append(alert)
+                else:
+                    state.dropped += 1
+            await asyncio.sleep(state.bucket.delay())
+            state.bucket.take()
+            await self.send(state, build_message(batch, state.dropped))
+            state.dropped = 0
+
+    async def send(self, state, message):
+        delay = self.retry_delay
+        for attempt in range(self.retries + 1):
+            try:
+                await asyncio.wait_for(state.sink.send(message), SEND_TIMEOUT)
+                state.sent += 1
+                state.last_error = None
+                return True
+            except (OSError, asyncio.TimeoutError, ValueError) as e:
+                state.last_error = f"{type(e).__name__}: {e}"
+            if attempt < self.retries:
+                await asyncio.sleep(delay)
+                delay *= 2
+        state.failed += 1
+        print(f"[ERROR] Notification to {state.sink.name} failed: {state.last_error}")
+        return False
+
+    def status(self):
+        return [{'sink': state.sink.name, 'sent': state.sent, 'failed': state.failed,
+                 'queued': state.queue.qsize(), 'last_error': state.last_error} for state in self.states]
+
+    def close(self, timeout=2.0):
+        # Flush what is queued (without waiting out the digest window), then stop
+        def stop():
+            self.digest_window = 0
+            for state in self.states:
+                state.queue.put_nowait(None)
+        try:
+            self.loop.call_soon_threadsafe(stop)
+        except RuntimeError:
+            return
+        self.thread.join(timeout)
+        for sink in self.sinks:
+            close = getattr(sink, 'close', None)
+            if close:
+                close()
+
+
+_dispatcher = None
+
+
+def enable_notifications(specs, **kwargs):
+    # Sinks that cannot be set up are reported and skipped
+    global _dispatcher
+    if _dispatcher is None:
+        sinks = []
+        for spec in specs:
+            try:
+                sinks.append(make_sink(spec))
+            except (OSError, ValueError) as e:
+                print(f"[ERROR] Notification sink {spec}: {e}")
+        if sinks:
+            _dispatcher = NotificationDispatcher(sinks, **kwargs)
+    return _dispatcher
+
+
+def get_dispatcher():
+    return _dispatcher
+
+
+def close_notifications():
+    global _dispatcher
+    if _dispatcher is not None:
+        _dispatcher.close()
+        _dispatcher = None
+
+
+if __name__ == "__main__":
+    import argparse
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    parser = argparse.ArgumentParser(description="Test OS Monitor notification sinks")
+    parser.add_argument("--listen", type=int, metavar="PORT",
+                        help="run a local webhook stand-in that prints every POST it receives")
+    parser.add_argument("--fail", type=int, default=0, metavar="N",
+                        help="with --listen, answer the first N requests with HTTP 503")
+    parser.add_argument("--send", nargs="+", metavar="SINK", help="send test alerts to these sinks")
+    parser.add_argument("--count", type=int, default=1, help="number of test alerts to send")
+    args = parser.parse_args()
+
+    if args.listen:
+        failures = [args.fail]
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if failures[0] > 0:
+                    failures[0] -= 1
+                    self.send_response(503)
+                else:
+                    message = json.loads(body)
+                    print(f"{time.strftime('%H:%M:%S')} {message['title']}\n{message['body']}\n", flush=True)
+                    self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        HTTPServer(("127.0.0.1", args.listen), Handler).serve_forever()
+    elif args.send:
+        dispatcher = enable_notifications(args.send)
+        if dispatcher is None:
+            sys.exit(1)
+        for i in range(args.count):
+            dispatcher.submit({'ts': time.time(), 'kind': 'test', 'message': f"Test alert {i + 1} of {args.count}"})
+        time.sleep(dispatcher.digest_window + 0.5)
+        close_notifications()
+        for status in dispatcher.status():
+            print(status)
+    else:
+        parser.print_help()
@@ -0,0 +1,141 @@
+import os
+import re
+import time
+from collections import namedtuple
+from importlib import import_module
+
+try:
+    from importlib.metadata import entry_points
+except ImportError:  # Python < 3.8
+    entry_points = None
+
+# Third-party metric sources. A plugin package registers a collector class
+# under the "os_monitor.collectors" entry point group, e.g. in pyproject.toml:
+#
+#     [project.entry-points."os_monitor.collectors"]
+#     ups = "os_monitor_ups:UPSCollector"
+#
+# The class declares what it measures and how often; the application
+# instantiates it, calls sample() on its own thread every `period` seconds,
+# feeds the values into the metric pipeline (percentiles, archive, shared
+# memory) and builds a tab with one plot per metric:
+#
+#     class UPSCollector:
+#         name = "UPS"
+#         metrics = [Metric("charge", "%", "Battery charge", 100), Metric("load", "W", "Load")]
+#         period = 5.0           # seconds between samples
+#         budget = 0.05          # seconds one sample() may take (optional)
+#
+#         def sample(self):
+#             return {"charge": 97.0, "load": 180.0}
+#
+#         def close(self):       # optional
+#             ...
+#
+# For local development, OS_MONITOR_PLUGINS="module:Class,other:Class" loads
+# collectors without installing a package.
+
+ENTRY_POINT_GROUP = "os_monitor.collectors"
+DEFAULT_BUDGET = 0.05
+MAX_THROTTLE = 16  # longest period is MAX_THROTTLE x the declared one
+RECOVER_AFTER = 5  # samples within budget before the period is halved again
+
+Metric = namedtuple('Metric', ['name', 'unit', 'label', 'max'], defaults=['', None, None])
+
+
+def load(spec):
+    module, attr = spec.split(':')
+    return getattr(import_module(module), attr)
+
+
+def plugin_specs():
+    # [(label, loader)] from installed entry points and OS_MONITOR_PLUGINS
+    specs = []
+    if entry_points is not None:
+        found = entry_points()
+        group = found.select(group=ENTRY_POINT_GROUP) if hasattr(found, 'select') else found.get(ENTRY_POINT_GROUP, [])
+        specs.extend((entry.value, entry.load) for entry in group)
+    for spec in filter(None, os.environ.get("OS_MONITOR_PLUGINS", "").split(",")):
+        specs.append((spec, lambda spec=spec: load(spec.strip())))
+    return specs
+
+
+def discover():
+    # Instantiated collectors wrapped in PluginRunner; broken plugins are
+    # reported and skipped so they cannot prevent the application starting
+    runners = []
+    for label, loader in plugin_specs():
+        try:
+            runners.append(PluginRunner(loader()()))
+        except Exception as e:
+            print(f"[ERROR] Failed to load collector plugin {label}: {e}")
+    return runners
+
+
+class PluginRunner:
+    def __init__(self, collector):
+        self.collector = collector
+        self.name = collector.name
+        self.source = re.sub(r'\W+', '_', getattr(collector, 'source', collector.name)).strip('_').lower()
+        self.metrics = [metric if isinstance(metric, Metric) else Metric(*metric) for metric in collector.metrics]
+        self.period = float(collector.period)
+        self.budget = float(getattr(collector, 'budget', DEFAULT_BUDGET))
+        self.throttle = 1
+        self.within_budget = 0
+        self.overruns = 0
+        self.last_duration = 0.0
+        self.overrun_duration = 0.0
+        self.last_error = None
+        self.next_run = 0.0
+
+    @property
+    def effective_period(self):
+        return self.period * self.throttle
+
+    @property
+    def throttled(self):
+        return self.throttle > 1
+
+    def wait_time(self, now=None):
+        return max(self.next_run - (now or time.time()), 0)
+
+    def run(self):
+        # One sample; returns {metric: value} or None if sample() failed.
+        # Overrunning the budget doubles the period (up to MAX_THROTTLE x);
+        # RECOVER_AFTER samples within budget halve it again.
+        started = time.perf_counter()
+        try:
+            values = self.collector.sample()
+            self.last_error = None
+        except Exception as e:
+            values = None
+            self.last_error = f"{type(e).__name__}: {e}"
+        self.last_duration = time.perf_counter() - started
+
+        if self.last_duration > self.budget:
+            self.overruns += 1
+            self.overrun_duration = self.last_duration
+            self.within_budget = 0
+            self.throttle = min(self.throttle * 2, MAX_THROTTLE)
+        else:
+            self.within_budget += 1
+            if self.throttled and self.within_budget >= RECOVER_AFTER:
+                self.throttle //= 2
+                self.within_budget = 0
+        self.next_run = time.time() + self.effective_period
+        if values is None:
+            return None
+        return {metric.name: values.get(metric.name) for metric in self.metrics}
+
+    def status(self):
+        if self.last_error:
+            return f"Error: {self.last_error}"
+        if self.throttled:
+            return (f"Throttled: a sample took {self.overrun_duration * 1000:.0f} ms "
+                    f"(budget {self.budget * 1000:.0f} ms); every {self.effective_period:g}s instead of {self.period:g}s")
+        return ""
+
+    def close(self):
+        close = getattr(self.collector, 'close', None)
+        if close:
+            close()
@@ -0,0 +1,181 @@
+import bisect
+import os
+import time
+
+import numpy as np
+
+from monitor_core.process_table import post_io, process_table
+
+# Per-process disk I/O from /proc/<pid>/io. Processes are sampled in
+# round-robin batches under a per-tick time budget, so on hosts with a very
+# large process table each tick reads as many processes as fit in the budget
+# and the rest are picked up on the following ticks. The round-robin goes
+# by PID order and resumes after the last PID read, so processes starting
+# or exiting do not make it skip or repeat others. Counters live in
+# preallocated numpy arrays indexed by slot; rates and top-k are computed
+# vectorized over all slots. The PIDs and start times come from the table
+# ProcessTree posts after its walk (see monitor_core.process_table), so this
+# lists /proc itself only when running without one. The rates of processes
+# doing I/O are posted back for ProcessTree's per-group totals.
+
+IO_COLUMNS = ('read_bytes', 'write_bytes', 'syscr', 'syscw')
+
+
+def read_proc_io(pid):
+    # rchar, wchar, syscr, syscw, read_bytes, write_bytes, cancelled_write_bytes
+    fd = os.open(f'/proc/{pid}/io', os.O_RDONLY)
+    try:
+        tokens = os.read(fd, 512).split()
+    finally:
+        os.close(fd)
+    return int(tokens[9]), int(tokens[11]), int(tokens[5]), int(tokens[7])
+
+
+def read_proc_start(pid):
+    # Start time in clock ticks after boot; tells a reused PID from the process it replaced
+    fd = os.open(f'/proc/{pid}/stat', os.O_RDONLY)
+    try:
+        data = os.read(fd, 1024)
+    finally:
+        os.close(fd)
+    return int(data.rpartition(b')')[2].split()[19])
+
+
+class ProcessIOTracker:
+    def __init__(self, budget=0.02, top_k=5, capacity=1024):
+        self.budget = budget
+        self.top_k = top_k
+        self.slots = {}  # pid -> slot
+        self.pids = np.full(capacity, -1, dtype=np.int64)
+        self.free = list(range(capacity - 1, -1, -1))
+        self.counters = np.zeros((capacity, len(IO_COLUMNS)), dtype=np.float64)
+        self.prev = np.zeros_like(self.counters)
+        self.sample_time = np.zeros(capacity, dtype=np.float64)
+        self.prev_time = np.zeros(capacity, dtype=np.float64)
+        self.rates = np.zeros_like(self.counters)
+        self.order = []  # PIDs with a slot, ascending
+        self.last = -1   # PID read last; the next tick resumes after it
+        self.starts = {}  # pid -> start time of the process the slot's baseline belongs to
+        self.names = {}
+        self.denied = set()
+        self.table = None  # process table of this tick, if one was posted
+
+    def grow(self):
+        capacity = len(self.pids)
+        self.pids = np.concatenate([self.pids, np.full(capacity, -1, dtype=np.int64)])
+        for name in ('counters', 'prev', 'rates'):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros((capacity, len(IO_COLUMNS)))]))
+        self.sample_time = np.concatenate([self.sample_time, np.zeros(capacity)])
+        self.prev_time = np.concatenate([self.prev_time, np.zeros(capacity)])
+        self.free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def release(self, pid):
+        slot = self.slots.pop(pid)
+        self.pids[slot] = -1
+        self.rates[slot] = 0
+        self.sample_time[slot] = self.prev_time[slot] = 0
+        self.free.append(slot)
+        self.names.pop(pid, None)
+        self.starts.pop(pid, None)
+
+    def sync_pids(self):
+        self.table = process_table()
+        if self.table is not None:
+            pids = self.table.keys()
+        else:
+            pids = {int(name) for name in os.listdir('/proc') if name.isdigit()}
+        for pid in list(self.slots):
+            if pid not in pids:
+                self.release(pid)
+        self.denied.intersection_update(pids)
+        for pid in pids:
+            if pid not in self.slots and pid not in self.denied:
+                if not self.free:
+                    self.grow()
+                slot = self.free.pop()
+                self.slots[pid] = slot
+                self.pids[slot] = pid
+        self.order = sorted(self.slots)
+
+    def sample(self):
+        self.sync_pids()
+        deadline = time.perf_counter() + self.budget
+        sampled = []
+        count = len(self.order)
+        first = bisect.bisect_right(self.order, self.last)
+        for i in range(count):
+            if time.perf_counter() > deadline:
+                break
+            pid = self.order[(first + i) % count]
+            self.last = pid
+            slot = self.slots[pid]
+            try:
+                start = self.table[pid][0] if self.table is not None else read_proc_start(pid)
+                values = read_proc_io(pid)
+            except (OSError, IndexError, ValueError):
+                # Gone, or another user's process we may not inspect
+                self.denied.add(pid)
+                self.release(pid)
+                continue
+            if start != self.starts.get(pid):
+                # First read, or the PID now belongs to another process:
+                # the old counters are no baseline for this one
+                self.starts[pid] = start
+                self.prev_time[slot] = 0
+                self.names.pop(pid, None)
+            self.counters[slot] = values
+            self.sample_time[slot] = time.time()
+            sampled.append(slot)
+
+        if sampled:
+            rows = np.array(sampled, dtype=np.int64)
+            elapsed = self.sample_time[rows] - self.prev_time[rows]
+            seen = self.prev_time[rows] > 0
+            delta = self.counters[rows] - self.prev[rows]
+            rates = np.where(seen[:, None], delta / np.maximum(elapsed, 1e-3)[:, None], 0.0)
+            self.rates[rows] = np.maximum(rates, 0.0)
+            self.prev[rows] = self.counters[rows]
+            self.prev_time[rows] = self.sample_time[rows]
+
+        active = [slot for slot in np.flatnonzero(self.rates[:, 0] + self.rates[:, 1]) if self.pids[slot] >= 0]
+        post_io({int(self.pids[slot]): (self.starts.get(int(self.pids[slot])),
+                                        float(self.rates[slot, 0]), float(self.rates[slot, 1]))
+                 for slot in active})
+
+        return {
+            'readers': self.top(0),
+            'writers': self.top(1),
+            'sampled': len(sampled),
+            'processes': len(self.slots),
+        }
+
+    def top(self, column):
+        rates = self.rates[:, column]
+        k = min(self.top_k, len(rates))
+        candidates = np.argpartition(rates, -k)[-k:]
+        candidates = candidates[np.argsort(rates[candidates])[::-1]]
+        result = []
+        for slot in candidates:
+            if rates[slot] <= 0 or self.pids[slot] < 0:
+                continue
+            pid = int(self.pids[slot])
+            result.append({
+                'pid': pid,
+                'name': self.name(pid),
+                'read': float(self.rates[slot, 0]),
+                'write': float(self.rates[slot, 1]),
+                'syscr': float(self.rates[slot, 2]),
+                'syscw': float(self.rates[slot, 3]),
+            })
+        return result
+
+    def name(self, pid):
+        name = self.names.get(pid)
+        if name is None:
+            try:
+                with open(f'/proc/{pid}/comm') as f:
+                    name = f.read().strip()
+            except OSError:
+                name = "?"
+            self.names[pid] = name
+        return name
@@ -0,0 +1,231 @@
+import os
+import time
+
+import psutil
+
+from monitor_core.process_tree import USE_PROC, read_proc_stat
+from monitor_core.process_table import post_memory, process_table
+
+# Per-process memory without double counting shared pages. RSS charges every
+# shared page (libraries, copy-on-write pages of a forked worker pool) in full
+# to each process mapping it, so forty workers forked from one parent can add
+# up to more than the machine has. From /proc/<pid>/smaps_rollup (Linux 4.14+)
+# this collector reads:
+#
+#   PSS   proportional set size: each shared page split between its sharers,
+#         so the PSS of all processes adds up to the memory really in use
+#   USS   unique set size: private pages only, what exiting would free
+#   swap  bytes of the process swapped out
+#
+# smaps_rollup walks every mapping of the process in the kernel, which costs
+# far more than /proc/<pid>/stat for large processes. Each update() takes
+# the processes with their RSS from the table ProcessTree posts after its
+# walk (see monitor_core.process_table; without one, it lists /proc and
+# reads each process's stat itself) and then reads rollups only until
+# TIME_BUDGET is spent, largest and fastest-growing processes first. A
+# process whose RSS has not moved since its last rollup keeps the cached
+# values for up to MAX_AGE seconds, so on a steady system most ticks only
+# re-read the few processes that changed. Processes not read yet, or whose
+# rollup is not readable (other users' processes without root), are shown
+# with their RSS and marked as estimates.
+#
+# Elsewhere psutil's memory_full_info() is used, under the same budget.
+#
+# The PSS of every process read is posted to the shared process table, where
+# ProcessTree uses it for group memory and the overlay's process check.
+
+TIME_BUDGET = 0.05      # seconds of rollup reads per update
+MAX_AGE = 60.0          # seconds before an unchanged process is read again
+RSS_TOLERANCE = 0.02    # RSS change, as a share of the last read, that counts as changed
+GROWTH_WEIGHT = 4       # growth since the last read counts this many times its size in the order
+TOP_N = 5
+ROLLUP_FIELDS = {b'Pss:': 'pss', b'Private_Clean:': 'uss', b'Private_Dirty:': 'uss',
+                 b'Private_Hugetlb:': 'uss', b'Swap:': 'swap'}
+
+
+class MemoryEntry:
+    __slots__ = ('pid', 'start', 'name', 'rss', 'read_rss', 'read_at', 'pss', 'uss', 'swap', 'denied')
+
+    def __init__(self, pid, start, name):
+        self.pid = pid
+        self.start = start
+        self.name = name
+        self.rss = 0
+        self.read_rss = None    # RSS when the rollup was last read
+        self.read_at = None
+        self.pss = None         # bytes; None until the rollup was read
+        self.uss = None
+        self.swap = None
+        self.denied = False     # rollup not readable; not retried
+
+
+def read_smaps_rollup(pid):
+    # (pss, uss, swap) in bytes
+    values = {'pss': 0, 'uss': 0, 'swap': 0}
+    with open(f'/proc/{pid}/smaps_rollup', 'rb') as f:
+        for line in f:
+            field = ROLLUP_FIELDS.get(line[:line.find(b':') + 1])
+            if field is not None:
+                values[field] += int(line.split()[1]) * 1024
+    return values['pss'], values['uss'], values['swap']
+
+
+def read_psutil_memory(pid):
+    info = psutil.Process(pid).memory_full_info()
+    return getattr(info, 'pss', info.uss), info.uss, getattr(info, 'swap', 0)
+
+
+def read_proc_identity(pid):
+    # (start, name, rss) from the cheap /proc/<pid>/stat
+    ppid, name, start, cpu_time, child_time, rss, threads = read_proc_stat(pid)
+    return start, name, rss
+
+
+def read_psutil_identity(pid):
+    proc = psutil.Process(pid)
+    with proc.oneshot():
+        return proc.create_time(), proc.name(), proc.memory_info().rss
+
+
+class ProcessMemory:
+    def __init__(self, time_budget=TIME_BUDGET, top_n=TOP_N):
+        self.time_budget = time_budget
+        self.top_n = top_n
+        self.entries = {}
+        self.total_memory = psutil.virtual_memory().total
+        self.use_rollup = USE_PROC and os.path.exists('/proc/self/smaps_rollup')
+        self.read_identity = read_proc_identity if USE_PROC else read_psutil_identity
+        self.read_memory = read_smaps_rollup if self.use_rollup else read_psutil_memory
+
+    def list_pids(self):
+        if USE_PROC:
+            return [int(name) for name in os.listdir('/proc') if name.isdigit()]
+        return psutil.pids()
+
+    def processes(self):
+        # (pid, start, name, rss) of every process
+        table = process_table()
+        if table is not None:
+            for pid, (start, name, rss) in table.items():
+                yield pid, start, name, rss
+            return
+        for pid in self.list_pids():
+            try:
+                start, name, rss = self.read_identity(pid)
+            except (OSError, IndexError, ValueError, psutil.Error):
+                continue
+            yield pid, start, name, rss
+
+    def stale(self, entry, now):
+        if entry.denied:
+            return False
+        if entry.pss is None:
+            return True
+        if now - entry.read_at > MAX_AGE:
+            return True
+        return abs(entry.rss - entry.read_rss) > max(entry.read_rss * RSS_TOLERANCE, 4096)
+
+    def priority(self, entry):
+        growth = entry.rss - (entry.read_rss or 0)
+        return entry.rss + GROWTH_WEIGHT * max(growth, 0)
+
+    def update(self):
+        started = time.perf_counter()
+        now = time.monotonic()
+        seen = set()
+        for pid, start, name, rss in self.processes():
+            entry = self.entries.get(pid)
+            if entry is None or entry.start != start:
+                entry = self.entries[pid] = MemoryEntry(pid, start, name)
+            entry.name = name
+            entry.rss = rss
+            seen.add(pid)
+        for pid in [pid for pid in self.entries if pid not in seen]:
+            del self.entries[pid]
+
+        pending = sorted((entry for entry in self.entries.values() if self.stale(entry, now)),
+                         key=self.priority, reverse=True)
+        read = tried = 0
+        reading = time.perf_counter()
+        for entry in pending:
+            if tried and time.perf_counter() - reading > self.time_budget:
+                break
+            tried += 1
+            try:
+                entry.pss, entry.uss, entry.swap = self.read_memory(entry.pid)
+            except ProcessLookupError:
+                entry.pss = entry.uss = entry.swap = 0  # kernel thread: no user memory
+            except (PermissionError, psutil.AccessDenied):
+                entry.denied = True
+                continue
+            except (OSError, ValueError, psutil.Error):
+                continue  # exited while being read
+            entry.read_rss = entry.rss
+            entry.read_at = now
+            read += 1
+        post_memory({entry.pid: (entry.start, entry.pss) for entry in self.entries.values() if entry.pss is not None})
+        return self.summary(read, len(pending) - tried, time.perf_counter() - started)
+
+    def memory(self, entry):
+        # Best known PSS of one process: the rollup if read, else RSS
+        return entry.pss if entry.pss is not None else entry.rss
+
+    def summary(self, read, pending, elapsed):
+        exact = [entry for entry in self.entries.values() if entry.pss is not None]
+        top = sorted(self.entries.values(), key=self.memory, reverse=True)[:self.top_n]
+        return {
+            'processes': len(self.entries),
+            'exact': len(exact),
+            'denied': sum(1 for entry in self.entries.values() if entry.denied),
+            'read': read,
+            'pending': pending,
+            'elapsed': elapsed,
+            'pss': sum(entry.pss for entry in exact),
+            'uss': sum(entry.uss for entry in exact),
+            'swap': sum(entry.swap for entry in exact),
+            'rss': sum(entry.rss for entry in exact),
+            'top': [{
+                'pid': entry.pid, 'name': entry.name, 'rss': entry.rss,
+                'pss': entry.pss, 'uss': entry.uss, 'swap': entry.swap, 'exact': entry.pss is not None,
+            } for entry in top],
+        }
+
+
+def format_process_memory(rows):
+    # "python (PID 812) PSS 1230 MB, USS 975 MB, swap 12 MB; ..." for the details panels
+    parts = []
+    for row in rows:
+        if row['exact']:
+            parts.append(f"{row['name']} (PID {row['pid']}) PSS {row['pss'] / 1024 ** 2:.0f} MB, "
+                         f"USS {row['uss'] / 1024 ** 2:.0f} MB, swap {row['swap'] / 1024 ** 2:.0f} MB")
+        else:
+            parts.append(f"{row['name']} (PID {row['pid']}) RSS {row['rss'] / 1024 ** 2:.0f} MB (estimate)")
+    return "; ".join(parts)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Per-process PSS/USS/swap under a time budget")
+    parser.add_argument("--budget", type=float, default=TIME_BUDGET, help="seconds of rollup reads per update")
+    parser.add_argument("--updates", type=int, default=5)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    collector = ProcessMemory(args.budget, args.top)
+    for i in range(args.updates):
+        if i:
+            time.sleep(args.interval)
+        result = collector.update()
+        print(f"{result['processes']} processes, {result['exact']} exact, {result['denied']} not readable; "
+              f"read {result['read']} in {result['elapsed'] * 1000:.1f} ms, {result['pending']} pending; "
+              f"PSS {result['pss'] / 1024 ** 2:.0f} MB vs RSS {result['rss'] / 1024 ** 2:.0f} MB, "
+              f"swap {result['swap'] / 1024 ** 2:.0f} MB")
+    for row in result['top']:
+        if row['exact']:
+            print(f"  {row['pid']:>7} {row['name']:<20} PSS {row['pss'] / 1024 ** 2:8.1f} MB  "
+                  f"USS {row['uss'] / 1024 ** 2:8.1f} MB  RSS {row['rss'] / 1024 ** 2:8.1f} MB  "
+                  f"swap {row['swap'] / 1024 ** 2:6.1f} MB")
+        else:
+            print(f"  {row['pid']:>7} {row['name']:<20} RSS {row['rss'] / 1024 ** 2:8.1f} MB (estimate)")
@@ -0,0 +1,39 @@
+# Latest per-process results shared between the per-process collectors,
+# which run on different worker threads. ProcessTree (CPU worker) walks
+# /proc once per tick and posts the process table; ProcessMemory (Memory
+# worker) and ProcessIOTracker (Disk tab) post back PSS and I/O rates, which
+# the tree adds up per group. Every post replaces a whole dict that is never
+# modified afterwards, so readers on other threads need no lock. Entries
+# carry the process start time, so the values of an exited process are
+# never credited to a new one that got its PID.
+
+_table = None   # {pid: (start, name, rss bytes)}
+_memory = None  # {pid: (start, pss bytes)} for processes whose rollup was read
+_io = None      # {pid: (start, read bytes/s, write bytes/s)} for processes doing I/O
+
+
+def post_table(table):
+    global _table
+    _table = table
+
+
+def process_table():
+    return _table
+
+
+def post_memory(memory):
+    global _memory
+    _memory = memory
+
+
+def process_memory():
+    return _memory
+
+
+def post_io(io):
+    global _io
+    _io = io
+
+
+def process_io():
+    return _io
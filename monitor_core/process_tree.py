@@ -0,0 +1,345 @@
+import os
+import time
+
+import psutil
+
+from monitor_core.procfs import CLOCK_TICKS
+from monitor_core.process_table import post_table, process_memory, process_io
+
+# Per-process CPU, memory and disk I/O aggregated by process tree, by
+# executable name and by user, so a browser with dozens of renderers or a
+# build fanning out to hundreds of compilers shows up as one consumer even
+# though no single PID stands out.
+#
+# The parent/child index is kept between ticks: each update lists the PIDs,
+# adds the ones that appeared, drops the ones that exited and re-links a
+# process whose parent changed (reparenting after its parent exited). Only
+# the per-tick counters are re-read for the processes already known. On
+# Linux they come from /proc/<pid>/stat; elsewhere from psutil. The walk is
+# posted as the shared process table (monitor_core.process_table), and PSS
+# and disk I/O are taken from what ProcessMemory and ProcessIOTracker post
+# back, so no other collector lists /proc or reads a process twice.
+#
+# Children that start and exit between two ticks are never listed, but the
+# kernel adds their CPU time to the parent's cutime/cstime when it reaps
+# them. That CPU is counted for the parent (less whatever was already
+# counted for tracked children that exited), so a build of many short
+# compiler runs still adds up under make.
+#
+# Per-process CPU is in percent of one CPU, like psutil and top. Group CPU
+# is in percent of all CPUs, like the CPU tab. Memory is PSS where
+# ProcessMemory has read it and RSS otherwise. RSS counts pages shared by a
+# forked pool once per process, so eight forks of a 600 MB process add up
+# to 4.8 GB; group memory alerts therefore go by the PSS part alone.
+
+TOP_N = 5
+GROUP_CPU_ALERT = 75.0      # percent of all CPUs
+GROUP_MEMORY_ALERT = 75.0   # percent of RAM
+PROCESS_ALERT = 75.0        # percent of one CPU / of RAM for a single process
+CLEAR_AFTER = 3             # updates below the limits before a group alert re-arms
+DOMINANT = 0.9              # a parent is just a wrapper when one child subtree holds this share
+COVERED = 0.5               # ...or when groups already listed below it hold this share
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+USE_PROC = os.path.isdir('/proc/self/task')
+
+
+class ProcessNode:
+    __slots__ = (
+        'pid', 'ppid', 'name', 'user', 'start', 'children',
+        'cpu_time', 'child_time', 'rss', 'pss', 'threads',
+        'cpu', 'reaped', 'read', 'write',
+    )
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.ppid = None
+        self.name = None
+        self.user = None
+        self.start = None
+        self.children = set()
+        self.cpu_time = None    # own user + system seconds
+        self.child_time = None  # reaped children's user + system seconds
+        self.rss = 0
+        self.pss = None         # bytes, once ProcessMemory has read the process
+        self.threads = 0
+        self.cpu = 0.0          # percent of one CPU over the last tick
+        self.reaped = 0.0       # same, for children reaped during the tick
+        self.read = 0.0         # bytes per second, from ProcessIOTracker
+        self.write = 0.0
+
+
+def read_proc_stat(pid):
+    # (ppid, name, start, cpu seconds, reaped children's cpu seconds, rss bytes, threads)
+    fd = os.open(f'/proc/{pid}/stat', os.O_RDONLY)
+    try:
+        data = os.read(fd, 1024)
+    finally:
+        os.close(fd)
+    head, _, tail = data.rpartition(b')')
+    fields = tail.split()
+    return (
+        int(fields[1]),
+        head[head.index(b'(') + 1:].decode(errors='replace'),
+        int(fields[19]),
+        (int(fields[11]) + int(fields[12])) / CLOCK_TICKS,
+        (int(fields[13]) + int(fields[14])) / CLOCK_TICKS,
+        int(fields[21]) * PAGE_SIZE,
+        int(fields[17]),
+    )
+
+
+def read_psutil_stat(pid):
+    proc = psutil.Process(pid)
+    with proc.oneshot():
+        times = proc.cpu_times()
+        return (
+            proc.ppid(),
+            proc.name(),
+            proc.create_time(),
+            times.user + times.system,
+            getattr(times, 'children_user', 0.0) + getattr(times, 'children_system', 0.0),
+            proc.memory_info().rss,
+            proc.num_threads(),
+        )
+
+
+def user_name(pid, cache):
+    if not USE_PROC:
+        try:
+            return psutil.Process(pid).username()
+        except (psutil.Error, KeyError):
+            return "?"
+    try:
+        uid = os.stat(f'/proc/{pid}').st_uid
+    except OSError:
+        return "?"
+    name = cache.get(uid)
+    if name is None:
+        try:
+            import pwd
+            name = pwd.getpwuid(uid).pw_name
+        except (ImportError, KeyError):
+            name = str(uid)
+        cache[uid] = name
+    return name
+
+
+class ProcessTree:
+    def __init__(self, top_n=TOP_N):
+        self.top_n = top_n
+        self.nodes = {}
+        self.credit = {}    # ppid -> cpu seconds of tracked children that exited
+        self.users = {}     # uid -> user name
+        self.prev_time = None
+        self.cpus = psutil.cpu_count(logical=True) or 1
+        self.total_memory = psutil.virtual_memory().total
+        self.read_stat = read_proc_stat if USE_PROC else read_psutil_stat
+        self.groups = {'trees': [], 'names': [], 'users': []}
+        self.active = {}    # alert key -> updates since it was last over a limit
+        self.spawned = self.exited = 0
+
+    def list_pids(self):
+        if USE_PROC:
+            return {int(name) for name in os.listdir('/proc') if name.isdigit()}
+        return set(psutil.pids())
+
+    def link(self, node, ppid):
+        parent = self.nodes.get(node.ppid)
+        if parent is not None:
+            parent.children.discard(node.pid)
+        node.ppid = ppid
+        parent = self.nodes.get(ppid)
+        if parent is not None:
+            parent.children.add(node.pid)
+
+    def remove(self, pid):
+        node = self.nodes.pop(pid)
+        parent = self.nodes.get(node.ppid)
+        if parent is not None:
+            parent.children.discard(pid)
+            if node.cpu_time is not None:
+                # Already counted; the parent's cutime will include it again
+                self.credit[node.ppid] = self.credit.get(node.ppid, 0.0) + node.cpu_time + node.child_time
+        self.credit.pop(pid, None)
+        self.exited += 1
+
+    def update(self):
+        now = time.monotonic()
+        interval = now - self.prev_time if self.prev_time else None
+        self.prev_time = now
+        self.spawned = self.exited = 0
+
+        pids = self.list_pids()
+        for pid in [pid for pid in self.nodes if pid not in pids]:
+            self.remove(pid)
+        for pid in pids:
+            if pid not in self.nodes:
+                self.nodes[pid] = ProcessNode(pid)
+                self.spawned += 1
+
+        threads = 0
+        memory = process_memory() or {}
+        io = process_io() or {}
+        for pid, node in list(self.nodes.items()):
+            try:
+                ppid, name, start, cpu_time, child_time, rss, node_threads = self.read_stat(pid)
+            except (OSError, IndexError, ValueError, psutil.Error):
+                if pid in self.nodes:
+                    self.remove(pid)
+                continue
+            if node.start is not None and start != node.start:
+                # The PID was reused by a new process since the last tick
+                self.remove(pid)
+                node = self.nodes[pid] = ProcessNode(pid)
+                self.spawned += 1
+            if node.start is None:
+                node.start = start
+                node.name = name
+                node.user = user_name(pid, self.users)
+                node.ppid = None
+            node.name = name  # follows exec
+            if ppid != node.ppid:
+                self.link(node, ppid)
+            if interval is None or node.cpu_time is None:
+                node.cpu = node.reaped = 0.0
+            else:
+                node.cpu = max(cpu_time - node.cpu_time, 0.0) / interval * 100
+                reaped = child_time - node.child_time - self.credit.pop(pid, 0.0)
+                node.reaped = max(reaped, 0.0) / interval * 100
+            node.cpu_time = cpu_time
+            node.child_time = child_time
+            node.rss = rss
+            node.threads = node_threads
+            threads += node_threads
+
+            entry = memory.get(pid)
+            node.pss = entry[1] if entry and entry[0] == start else None
+            entry = io.get(pid)
+            node.read, node.write = entry[1:] if entry and entry[0] == start else (0.0, 0.0)
+        post_table({pid: (node.start, node.name, node.rss) for pid, node in self.nodes.items()})
+        self.aggregate()
+        return {
+            'processes': len(self.nodes),
+            'threads': threads,
+            'spawned': self.spawned,
+            'exited': self.exited,
+            'trees': self.groups['trees'][:self.top_n],
+            'names': self.groups['names'][:self.top_n],
+            'users': self.groups['users'][:self.top_n],
+        }
+
+    def row(self, key, pid, totals):
+        # memory: PSS, or RSS for processes not read yet; pss_percent: the
+        # part known from PSS, which alone can be trusted not to overcount
+        cpu, memory, pss, read, write, count = totals
+        return {
+            'key': key, 'pid': pid, 'count': count,
+            'cpu': min(cpu / self.cpus, 100.0), 'memory': memory,
+            'memory_percent': min(memory / self.total_memory * 100, 100.0),
+            'pss_percent': min(pss / self.total_memory * 100, 100.0),
+            'read': read, 'write': write,
+        }
+
+    def memory(self, node):
+        return node.pss if node.pss is not None else node.rss
+
+    def memory_percent(self, node):
+        return min(self.memory(node) / self.total_memory * 100, 100.0)
+
+    def weight(self, totals):
+        return totals[0] / self.cpus + totals[1] / self.total_memory * 100
+
+    def aggregate(self):
+        by_name = {}
+        by_user = {}
+        for node in self.nodes.values():
+            values = (node.cpu + node.reaped, self.memory(node), node.pss or 0, node.read, node.write, 1)
+            for table, key in ((by_name, node.name), (by_user, node.user)):
+                totals = table.get(key)
+                table[key] = values if totals is None else tuple(a + b for a, b in zip(totals, values))
+
+        # Inclusive subtree totals, children before parents
+        order = []
+        stack = [pid for pid, node in self.nodes.items() if node.ppid not in self.nodes]
+        while stack:
+            pid = stack.pop()
+            order.append(pid)
+            stack.extend(self.nodes[pid].children)
+        subtree = {}
+        covered = {}
+        trees = []
+        for pid in reversed(order):
+            node = self.nodes[pid]
+            totals = [node.cpu + node.reaped, self.memory(node), node.pss or 0, node.read, node.write, 1]
+            below = 0.0
+            heaviest = 0.0
+            for child in node.children:
+                child_totals = subtree[child]
+                for i in range(6):
+                    totals[i] += child_totals[i]
+                heaviest = max(heaviest, self.weight(child_totals))
+                below += covered[child]
+            subtree[pid] = totals
+            weight = self.weight(totals)
+            # A tree is reported at the lowest process whose descendants
+            # share the load, not at every ancestor above it
+            if pid > 2 and node.children and heaviest < weight * DOMINANT and below < weight * COVERED:
+                trees.append(self.row(node.name, pid, totals))
+                covered[pid] = weight
+            else:
+                covered[pid] = below
+
+        def by_cpu(row):
+            return row['cpu'], row['memory']
+
+        self.groups = {
+            'trees': sorted(trees, key=by_cpu, reverse=True),
+            'names': sorted((self.row(key, None, totals) for key, totals in by_name.items()), key=by_cpu, reverse=True),
+            'users': sorted((self.row(key, None, totals) for key, totals in by_user.items()), key=by_cpu, reverse=True),
+        }
+
+    def check_alerts(self):
+        # [(metric, message, process, pid)] for groups that just went over
+        # GROUP_CPU_ALERT or GROUP_MEMORY_ALERT; single processes are left to
+        # the per-process check
+        raised = []
+        over = set()
+        for kind, label in (('trees', "Process tree"), ('names', "Application"), ('users', "User")):
+            for row in self.groups[kind]:
+                if kind != 'users' and row['count'] < 2:
+                    continue
+                if row['cpu'] < GROUP_CPU_ALERT and row['pss_percent'] < GROUP_MEMORY_ALERT:
+                    continue
+                key = (kind, row['key'], row['pid'])
+                over.add(key)
+                if key not in self.active:
+                    metric = 'cpu.utilization' if row['cpu'] >= GROUP_CPU_ALERT else 'memory.percent'
+                    where = f" (PID {row['pid']})" if row['pid'] else ""
+                    message = (f"{label} {row['key']}{where}: {row['count']} processes using "
+                               f"{row['cpu']:.1f}% CPU / {row['memory_percent']:.1f}% Memory")
+                    raised.append((metric, message, row['key'] if kind != 'users' else None, row['pid']))
+                self.active[key] = 0
+        for key in list(self.active):
+            if key not in over:
+                self.active[key] += 1
+                if self.active[key] >= CLEAR_AFTER:
+                    del self.active[key]
+        return raised
+
+    def busiest(self, cpu_limit, memory_limit):
+        # Single processes over either limit (CPU in percent of one CPU).
+        # RSS never undercounts PSS, so these are the candidates; callers
+        # decide on memory_percent()
+        return [node for node in self.nodes.values()
+                if node.cpu > cpu_limit or node.rss / self.total_memory * 100 > memory_limit]
+
+
+def format_groups(rows, limit=3):
+    # "firefox (PID 812, 61 processes) 35.2% CPU, 2.1 GB; ..." for the details panels
+    parts = []
+    for row in rows[:limit]:
+        where = f"PID {row['pid']}, " if row['pid'] else ""
+        count = f"{row['count']} process{'es' if row['count'] != 1 else ''}"
+        parts.append(f"{row['key']} ({where}{count}) {row['cpu']:.1f}% CPU, "
+                     f"{row['memory'] / 1024 ** 3:.2f} GB")
+    return "; ".join(parts)
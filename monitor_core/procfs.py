@@ -0,0 +1,494 @@
+import os
+import threading
+from array import array
+
+# Shared low-overhead reader for the Linux /proc files every collector polls.
+# Files are opened once and re-read with preadv() into a preallocated buffer;
+# the positions of the values we care about are worked out on the first read
+# and re-checked cheaply afterwards, so a tick costs one syscall per file and
+# results land in reused arrays instead of fresh namedtuples.
+
+CPU_FIELDS = ('user', 'nice', 'system', 'idle', 'iowait', 'irq', 'softirq', 'steal')
+STAT_FIELDS = ('ctxt', 'btime', 'processes', 'procs_running', 'procs_blocked')
+MEMINFO_FIELDS = (
+    'MemTotal', 'MemFree', 'MemAvailable', 'Buffers', 'Cached', 'SwapCached',
+    'Dirty', 'Writeback', 'Shmem', 'Slab', 'SReclaimable', 'SUnreclaim',
+    'SwapTotal', 'SwapFree',
+)
+VMSTAT_FIELDS = ('pswpin', 'pswpout', 'pgmajfault', 'pgfault')
+PSI_FIELDS = ('some_avg10', 'some_avg60', 'some_total', 'full_avg10', 'full_avg60', 'full_total')
+DISK_FIELDS = ('reads', 'read_bytes', 'read_time', 'writes', 'write_bytes', 'write_time', 'busy_time')
+NET_FIELDS = ('bytes_recv', 'packets_recv', 'errin', 'dropin', 'bytes_sent', 'packets_sent', 'errout', 'dropout')
+SNMP_FIELDS = (
+    'Tcp.ActiveOpens', 'Tcp.PassiveOpens', 'Tcp.AttemptFails', 'Tcp.EstabResets', 'Tcp.CurrEstab',
+    'Tcp.InSegs', 'Tcp.OutSegs', 'Tcp.RetransSegs', 'Tcp.InErrs', 'Tcp.OutRsts',
+    'Udp.InDatagrams', 'Udp.NoPorts', 'Udp.InErrors', 'Udp.OutDatagrams', 'Udp.RcvbufErrors', 'Udp.SndbufErrors',
+)
+NETSTAT_FIELDS = (
+    'TcpExt.ListenOverflows', 'TcpExt.ListenDrops', 'TcpExt.TCPTimeouts', 'TcpExt.TCPSynRetrans', 'TcpExt.TCPBacklogDrop',
+)
+SOCKSTAT_FIELDS = ('sockets.used', 'TCP.inuse', 'TCP.orphan', 'TCP.tw', 'TCP.alloc', 'UDP.inuse')
+
+SECTOR_SIZE = 512  # /proc/diskstats always counts 512-byte sectors
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+class ProcFile:
+    def __init__(self, path, size=8192):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY)
+        self.buf = bytearray(size)
+        self.view = memoryview(self.buf)
+        self.lock = threading.Lock()
+
+    def read(self):
+        # /proc regenerates the file on every read from offset 0. seq_file
+        # backed files (/proc/net/*, /proc/diskstats, /proc/interrupts) hand
+        # out about a page per read, so a short read is not the end: keep
+        # reading at the next offset until one returns 0. The buffer size is
+        # only a starting hint and doubles whenever it fills up.
+        n = 0
+        while True:
+            if n == len(self.buf):
+                buf = bytearray(len(self.buf) * 2)
+                buf[:n] = self.buf
+                self.buf = buf
+                self.view = memoryview(self.buf)
+            count = os.preadv(self.fd, [self.view[n:]], n)
+            if count == 0:
+                return n
+            n += count
+
+    def tokens(self):
+        n = self.read()
+        return self.view[:n].tobytes().split()
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class KeyedProcFile(ProcFile):
+    # Files made of "name value ..." records (/proc/meminfo, /proc/vmstat,
+    # /proc/stat). The token index of each wanted value is cached and only
+    # recomputed when the name in front of it no longer matches.
+    def __init__(self, path, fields, suffix=b''):
+        super().__init__(path)
+        self.fields = fields
+        self.names = [f.encode() + suffix for f in fields]
+        self.values = array('d', [0.0] * len(fields))
+        self.layout = None
+
+    def compute_layout(self, tokens):
+        positions = {}
+        for i, tok in enumerate(tokens):
+            if tok not in positions:
+                positions[tok] = i + 1
+        self.layout = [positions.get(name, -1) for name in self.names]
+
+    def layout_valid(self, tokens):
+        for name, pos in zip(self.names, self.layout):
+            if pos > 0 and (pos >= len(tokens) or tokens[pos - 1] != name):
+                return False
+        return True
+
+    def update(self):
+        with self.lock:
+            tokens = self.tokens()
+            if self.layout is None or not self.layout_valid(tokens):
+                self.compute_layout(tokens)
+            values = self.values
+            for i, pos in enumerate(self.layout):
+                values[i] = float(tokens[pos]) if pos > 0 else 0.0
+            return values
+
+
+class StatFile(KeyedProcFile):
+    def __init__(self):
+        super().__init__('/proc/stat', STAT_FIELDS)
+        self.cpu = array('d', [0.0] * len(CPU_FIELDS))
+
+    def update(self):
+        with self.lock:
+            tokens = self.tokens()
+            if tokens[0] != b'cpu':
+                raise OSError("unexpected /proc/stat layout")
+            cpu = self.cpu
+            # Older kernels report fewer columns; missing ones stay at zero.
+            for i in range(len(CPU_FIELDS)):
+                tok = tokens[i + 1]
+                if not tok[:1].isdigit():
+                    break
+                cpu[i] = float(tok) / CLOCK_TICKS
+            if self.layout is None or not self.layout_valid(tokens):
+                self.compute_layout(tokens)
+            values = self.values
+            for i, pos in enumerate(self.layout):
+                values[i] = float(tokens[pos]) if pos > 0 else 0.0
+            return cpu, values
+
+
+class PressureFile(ProcFile):
+    # "some avg10=0.00 avg60=0.00 avg300=0.00 total=0" (+ an optional "full" line)
+    def __init__(self, resource):
+        super().__init__(f'/proc/pressure/{resource}', size=512)
+        self.values = array('d', [0.0] * len(PSI_FIELDS))
+
+    def update(self):
+        with self.lock:
+            tokens = self.tokens()
+            values = self.values
+            for offset in range(0, len(tokens), 5):
+                base = 0 if tokens[offset] == b'some' else 3
+                values[base] = float(tokens[offset + 1][6:])
+                values[base + 1] = float(tokens[offset + 2][6:])
+                values[base + 2] = float(tokens[offset + 4][6:])
+            return values
+
+
+class ProtocolStatsFile(ProcFile):
+    # /proc/net/snmp and /proc/net/netstat: each protocol is a line of names
+    # followed by a line of values, both starting with "Proto:". Fields are
+    # given as "Proto.Name"; the token index of each value is cached and
+    # re-checked against its name token on every read.
+    def __init__(self, path, fields):
+        super().__init__(path)
+        self.fields = fields
+        self.wanted = []
+        for field in fields:
+            proto, name = field.split('.')
+            self.wanted.append((proto.encode() + b':', name.encode()))
+        self.values = array('d', [0.0] * len(fields))
+        self.layout = None
+
+    def compute_layout(self, tokens):
+        # [(name index, value index)] per field; -1 where the kernel lacks it
+        positions = {}
+        i = 0
+        while i < len(tokens):
+            prefix = tokens[i]
+            j = i + 1
+            while j < len(tokens) and tokens[j] != prefix:
+                j += 1
+            count = j - i - 1
+            for k in range(1, count + 1):
+                positions[(prefix, tokens[i + k])] = (i + k, j + k)
+            i = j + count + 1
+        self.layout = [positions.get(key, (-1, -1)) for key in self.wanted]
+
+    def layout_valid(self, tokens):
+        for (prefix, name), (name_pos, value_pos) in zip(self.wanted, self.layout):
+            if name_pos > 0 and (value_pos >= len(tokens) or tokens[name_pos] != name):
+                return False
+        return True
+
+    def update(self):
+        with self.lock:
+            tokens = self.tokens()
+            if self.layout is None or not self.layout_valid(tokens):
+                self.compute_layout(tokens)
+            values = self.values
+            for i, (name_pos, value_pos) in enumerate(self.layout):
+                values[i] = float(tokens[value_pos]) if value_pos > 0 else 0.0
+            return values
+
+
+class SockstatFile(ProtocolStatsFile):
+    # "TCP: inuse 4 orphan 0 tw 4 alloc 4 mem 0": name/value pairs per line
+    def __init__(self):
+        super().__init__('/proc/net/sockstat', SOCKSTAT_FIELDS)
+
+    def compute_layout(self, tokens):
+        positions = {}
+        prefix = None
+        i = 0
+        while i < len(tokens):
+            if tokens[i].endswith(b':'):
+                prefix = tokens[i]
+                i += 1
+                continue
+            positions[(prefix, tokens[i])] = (i, i + 1)
+            i += 2
+        self.layout = [positions.get(key, (-1, -1)) for key in self.wanted]
+
+
+class TableProcFile(ProcFile):
+    # Row-per-device files. Rows are selected once by name; the layout records
+    # the token index of each selected row and is rebuilt when devices appear
+    # or disappear (detected from the token count and the row names).
+    def __init__(self, path, fields, row_width, name_offset, value_offsets, scale=None, header_lines=0, strip_colon=False):
+        super().__init__(path, size=16384)
+        self.fields = fields
+        self.row_width = row_width
+        self.name_offset = name_offset
+        self.value_offsets = value_offsets
+        self.scale = scale or (1,) * len(value_offsets)
+        self.header_lines = header_lines
+        self.strip_colon = strip_colon
+        self.layout = None
+        self.token_count = -1
+        self.names = []
+        self.row_values = []
+        self.rows = {}
+        self.totals = array('d', [0.0] * len(fields))
+
+    def include(self, name):
+        return True
+
+    def split(self):
+        n = self.read()
+        start = 0
+        for _ in range(self.header_lines):
+            start = self.buf.index(b'\n', start) + 1
+        data = self.view[start:n].tobytes()
+        if self.strip_colon:
+            # "eth0:4718453" has no space once the counter gets wide enough
+            data = data.replace(b':', b' ')
+        return data.split()
+
+    def compute_layout(self, tokens):
+        self.layout = []
+        self.names = []
+        for pos in range(0, len(tokens) - self.row_width + 1, self.row_width):
+            name = tokens[pos + self.name_offset]
+            if self.include(name.decode()):
+                self.layout.append(pos)
+                self.names.append(name)
+        self.token_count = len(tokens)
+        self.row_values = [array('d', [0.0] * len(self.fields)) for _ in self.names]
+        self.rows = {name.decode(): row for name, row in zip(self.names, self.row_values)}
+
+    def layout_valid(self, tokens):
+        if len(tokens) != self.token_count:
+            return False
+        for pos, name in zip(self.layout, self.names):
+            if tokens[pos + self.name_offset] != name:
+                return False
+        return True
+
+    def update(self):
+        with self.lock:
+            tokens = self.split()
+            if self.layout is None or not self.layout_valid(tokens):
+                self.compute_layout(tokens)
+            totals = self.totals
+            for i in range(len(totals)):
+                totals[i] = 0.0
+            for pos, row in zip(self.layout, self.row_values):
+                for i, (offset, scale) in enumerate(zip(self.value_offsets, self.scale)):
+                    row[i] = float(tokens[pos + offset]) * scale
+                    totals[i] += row[i]
+            return totals
+
+
+class CounterTableFile(ProcFile):
+    # Per-CPU counter tables (/proc/interrupts, /proc/softirqs): a header of
+    # CPU names, then one row per source with a count for each CPU and, in
+    # /proc/interrupts, a free-text description. The token index of every row
+    # is cached like the other tables. On top of that a row whose counts are
+    # byte-for-byte the same as last time is not converted again; on a
+    # many-core host most IRQ lines are idle, so most of the table is skipped.
+    def __init__(self, path):
+        super().__init__(path, size=65536)
+        self.layout = None
+        self.token_count = -1
+        self.cpus = 0
+        self.rows = []          # [(name, name token, index of the first count, number of counts)]
+        self.labels = {}        # name -> description ("LOC" -> "Local timer interrupts")
+        self.raw = []           # count tokens of each row at the last read
+        self.counts = []        # the same as ints
+        self.totals = {}        # name -> sum over all CPUs
+        self.per_cpu = array('d')
+
+    def compute_layout(self, data, tokens):
+        lines = data.split(b'\n')
+        self.cpus = len(lines[0].split())
+        self.rows = []
+        self.labels = {}
+        index = len(lines[0].split())
+        for line in lines[1:]:
+            fields = line.split()
+            if not fields:
+                continue
+            count = 0
+            while count < self.cpus and count + 1 < len(fields) and fields[count + 1].isdigit():
+                count += 1
+            name = fields[0].rstrip(b':').decode()
+            description = fields[count + 1:]
+            if name.isdigit() and description:
+                description = description[-1:]  # the device, after the chip and hwirq columns
+            self.rows.append((name, fields[0], index + 1, count))
+            self.labels[name] = b' '.join(description).decode(errors='replace')
+            index += len(fields)
+        self.token_count = len(tokens)
+        self.raw = [None] * len(self.rows)
+        self.counts = [[0] * count for name, token, pos, count in self.rows]
+        self.totals = {name: 0 for name, token, pos, count in self.rows}
+        self.per_cpu = array('d', [0.0] * self.cpus)
+        self.layout = True
+
+    def layout_valid(self, tokens):
+        if len(tokens) != self.token_count:
+            return False
+        for name, token, pos, count in self.rows:
+            if tokens[pos - 1] != token:
+                return False
+        return True
+
+    def update(self):
+        # (per-CPU totals, {row name: total over CPUs}); both cumulative and
+        # reused between calls. Rows without a count per CPU (ERR, MIS) are
+        # only in the row totals.
+        with self.lock:
+            n = self.read()
+            data = self.view[:n].tobytes()
+            tokens = data.split()
+            if self.layout is None or not self.layout_valid(tokens):
+                self.compute_layout(data, tokens)
+            per_cpu = self.per_cpu
+            for index, (name, token, pos, count) in enumerate(self.rows):
+                raw = tokens[pos:pos + count]
+                if raw == self.raw[index]:
+                    continue
+                self.raw[index] = raw
+                values = [int(tok) for tok in raw]
+                if count == self.cpus:
+                    for cpu, before in enumerate(self.counts[index]):
+                        per_cpu[cpu] += values[cpu] - before
+                self.counts[index] = values
+                self.totals[name] = sum(values)
+            return per_cpu, self.totals
+
+
+class LoadAvgFile(ProcFile):
+    # "0.52 0.58 0.59 3/812 12345": 1, 5 and 15 minute load averages, then
+    # runnable / total tasks
+    def __init__(self):
+        super().__init__('/proc/loadavg', size=256)
+        self.values = array('d', [0.0] * 5)
+
+    def update(self):
+        with self.lock:
+            tokens = self.tokens()
+            running, total = tokens[3].split(b'/')
+            values = self.values
+            values[0] = float(tokens[0])
+            values[1] = float(tokens[1])
+            values[2] = float(tokens[2])
+            values[3] = float(running)
+            values[4] = float(total)
+            return values
+
+
+class DiskStatsFile(TableProcFile):
+    # major minor name reads merged sectors ms writes merged sectors ms inflight io_ms weighted_ms ...
+    def __init__(self):
+        super().__init__(
+            '/proc/diskstats', DISK_FIELDS, self.detect_row_width(), 2,
+            (3, 5, 6, 7, 9, 10, 12),
+            scale=(1, SECTOR_SIZE, 1, 1, SECTOR_SIZE, 1, 1),
+        )
+
+    @staticmethod
+    def detect_row_width():
+        # 14 columns before 4.18, 18 with discard stats, 20 with flush stats
+        with open('/proc/diskstats', 'rb') as f:
+            line = f.readline()
+        return len(line.split()) or 14
+
+    def include(self, name):
+        # Whole physical disks only, like psutil: partitions have no
+        # /sys/block entry and loop/ram devices are not real storage.
+        if name.startswith(('loop', 'ram', 'zram')):
+            return False
+        return os.path.exists(f'/sys/block/{name}')
+
+
+class NetDevFile(TableProcFile):
+    def __init__(self):
+        super().__init__(
+            '/proc/net/dev', NET_FIELDS, 17, 0,
+            (1, 2, 3, 4, 9, 10, 11, 12),
+            header_lines=2, strip_colon=True,
+        )
+
+
+class ProcReader:
+    def __init__(self):
+        self.stat = StatFile()
+        self.meminfo = KeyedProcFile('/proc/meminfo', MEMINFO_FIELDS, suffix=b':')
+        self.vmstat = KeyedProcFile('/proc/vmstat', VMSTAT_FIELDS)
+        self.diskstats = DiskStatsFile()
+        self.netdev = NetDevFile()
+        try:
+            self.snmp = ProtocolStatsFile('/proc/net/snmp', SNMP_FIELDS)
+            self.netstat = ProtocolStatsFile('/proc/net/netstat', NETSTAT_FIELDS)
+            self.sockstat = SockstatFile()
+        except OSError:
+            self.snmp = self.netstat = self.sockstat = None
+        try:
+            self.interrupts = CounterTableFile('/proc/interrupts')
+            self.softirqs = CounterTableFile('/proc/softirqs')
+            self.loadavg = LoadAvgFile()
+        except OSError:
+            self.interrupts = self.softirqs = self.loadavg = None
+        self.pressure = {}
+        for resource in ('memory', 'cpu', 'io'):
+            try:
+                self.pressure[resource] = PressureFile(resource)
+            except OSError:
+                pass
+        self.prev_cpu = array('d', [0.0] * len(CPU_FIELDS))
+        self.cpu_lock = threading.Lock()
+
+    def cpu_percent(self):
+        # Same definition as psutil.cpu_percent(interval=None): busy share of
+        # the time elapsed since the previous call.
+        with self.cpu_lock:
+            cpu, _ = self.stat.update()
+            prev = self.prev_cpu
+            total = busy = 0.0
+            for i in range(len(CPU_FIELDS)):
+                delta = cpu[i] - prev[i]
+                total += delta
+                if i not in (3, 4):  # idle, iowait
+                    busy += delta
+                prev[i] = cpu[i]
+            if total <= 0:
+                return 0.0
+            return round(min(max(busy / total * 100, 0.0), 100.0), 1)
+
+    def boot_time(self):
+        _, values = self.stat.update()
+        return values[STAT_FIELDS.index('btime')]
+
+    def virtual_memory(self):
+        # Returns (total, available, used, free, percent) in bytes, with the
+        # same definitions psutil uses on Linux.
+        m = self.meminfo.update()
+        total = m[0] * 1024
+        free = m[1] * 1024
+        available = m[2] * 1024
+        used = total - available
+        percent = round(used / total * 100, 1) if total else 0.0
+        return total, available, used, free, percent
+
+
+_reader = None
+_reader_lock = threading.Lock()
+
+
+def get_reader():
+    # Returns the process-wide ProcReader, or None where /proc is unavailable
+    # (e.g. Windows), in which case collectors fall back to psutil.
+    global _reader
+    with _reader_lock:
+        if _reader is None:
+            if not hasattr(os, 'preadv') or not os.path.exists('/proc/stat'):
+                return None
+            try:
+                _reader = ProcReader()
+            except OSError:
+                return None
+        return _reader
@@ -0,0 +1,122 @@
+import collections
+import threading
+
+# Typed sample records passed from the collector workers to their widgets.
+# Each worker owns a SampleRing of preallocated, slotted records: it fills
+# a free record in place, and only signals the widget when the widget has
+# drained everything it was sent before. The widget then takes the whole
+# batch by reference in one slot call, so a busy GUI thread gets one queued
+# call for several ticks instead of one dict and one call per tick.
+
+
+class Sample:
+    __slots__ = ('ts',)
+
+    def __init__(self):
+        for name in self.fields():
+            setattr(self, name, None)
+
+    @classmethod
+    def fields(cls):
+        names = []
+        for klass in reversed(cls.__mro__):
+            names.extend(getattr(klass, '__slots__', ()))
+        return names
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.fields()}
+
+
+class CPUSample(Sample):
+    # trees/apps/users: top process groups, as rows from ProcessTree.update();
+    # interrupt, softirq, context switch and fork counts are per second,
+    # cpu_interrupts/cpu_softirqs per logical CPU and top_* [(label, rate)]
+    __slots__ = ('utilization', 'freq', 'physical_cores', 'logical_cores', 'processes', 'threads', 'uptime', 'name',
+                 'trees', 'apps', 'users',
+                 'interrupts', 'softirqs', 'ctx_switches', 'forks', 'run_queue', 'blocked', 'load_avg',
+                 'cpu_interrupts', 'cpu_softirqs', 'top_interrupts', 'top_softirqs')
+
+
+class MemorySample(Sample):
+    # Sizes in GB, PSI in percent of wall time, paging in events per second;
+    # process_memory: the latest ProcessMemory.update() summary (bytes)
+    __slots__ = (
+        'total', 'available', 'used', 'free', 'percent',
+        'psi_some', 'psi_full', 'psi_some_avg10', 'psi_full_avg10', 'psi_cpu_avg10', 'psi_io_avg10', 'psi_io_full',
+        'swap_in', 'swap_out', 'major_faults',
+        'cached', 'dirty', 'writeback', 'slab', 'slab_reclaimable', 'shared', 'swap_total', 'swap_free',
+        'process_memory',
+    )
+
+
+class DiskSample(Sample):
+    # Rates in MB/s
+    __slots__ = ('active_time', 'read', 'write', 'transfer')
+
+
+class NetworkSample(Sample):
+    # Throughput in Kbps; TCP/UDP health rates per second (None without /proc)
+    __slots__ = (
+        'upload', 'download', 'adapter', 'connection_type', 'ssid', 'bssid',
+        'tcp_out_segments', 'tcp_retrans', 'tcp_retrans_pct', 'tcp_resets', 'tcp_estab_resets',
+        'tcp_attempt_fails', 'tcp_in_errors', 'tcp_timeouts', 'listen_overflows', 'listen_drops',
+        'udp_rcvbuf_errors', 'udp_drops', 'udp_noports',
+        'tcp_estab', 'tcp_inuse', 'tcp_tw', 'tcp_orphan', 'udp_inuse',
+    )
+
+
+class GPUSample(Sample):
+    # Memory in GB
+    __slots__ = ('load', 'memory_percent', 'temp', 'mem_used', 'mem_total', 'name', 'driver')
+
+
+class SampleRing:
+    # Every record is in one place at a time: free, being filled by the
+    # worker, committed and pending, or lent to the consumer by the last
+    # drain(). The worker only ever fills a free record, so it never writes
+    # into one the consumer may still be reading.
+    def __init__(self, record_type, size=8):
+        self.record_type = record_type
+        self.lock = threading.Lock()
+        self.free = [record_type() for _ in range(size)]
+        self.filling = None
+        self.pending = collections.deque()  # committed, not yet drained, oldest first
+        self.lent = []                      # the consumer's current batch
+        self.notified = False
+
+    def acquire(self):
+        # The record to fill for this tick. If the consumer has fallen so far
+        # behind that no record is free, the oldest undrained one is dropped
+        # and reused; a new record is made only while the consumer holds
+        # every other one.
+        with self.lock:
+            if self.filling is not None:
+                self.free.append(self.filling)  # acquired last tick but never committed
+            if self.free:
+                self.filling = self.free.pop()
+            elif self.pending:
+                self.filling = self.pending.popleft()
+            else:
+                self.filling = self.record_type()
+            return self.filling
+
+    def commit(self):
+        # Returns True when the consumer should be signalled
+        with self.lock:
+            self.pending.append(self.filling)
+            self.filling = None
+            if self.notified:
+                return False
+            self.notified = True
+            return True
+
+    def drain(self):
+        # Records committed since the last drain, oldest first. They stay the
+        # consumer's until its next drain(), which hands the previous batch
+        # back for reuse.
+        with self.lock:
+            self.free.extend(self.lent)
+            self.lent = list(self.pending)
+            self.pending.clear()
+            self.notified = False
+            return self.lent
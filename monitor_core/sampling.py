@@ -0,0 +1,78 @@
+import time
+
+import psutil
+
+# Qt-free sampling shared by the GUI workers and the terminal dashboard.
+# Each function reads through the /proc reader when one is available and
+# falls back to psutil elsewhere; `reader` is monitor_core.procfs.get_reader().
+
+
+def cpu_usage(reader):
+    if reader:
+        return reader.cpu_percent()
+    return psutil.cpu_percent(interval=None)
+
+
+def boot_time(reader):
+    if reader:
+        return reader.boot_time()
+    return psutil.boot_time()
+
+
+def process_counts():
+    # (processes, threads)
+    process_count = 0
+    thread_count = 0
+    for p in psutil.process_iter(['pid']):
+        process_count += 1
+        try:
+            if p.is_running():
+                thread_count += p.num_threads()
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            continue
+    return process_count, thread_count
+
+
+def virtual_memory(reader):
+    # (total, available, used, free, percent), bytes
+    if reader:
+        return reader.virtual_memory()
+    mem = psutil.virtual_memory()
+    return mem.total, mem.available, mem.used, mem.free, mem.percent
+
+
+def disk_io_counters(reader):
+    # (read_bytes, write_bytes) summed over all physical disks
+    if reader:
+        totals = reader.diskstats.update()
+        return totals[1], totals[4]
+    counters = psutil.disk_io_counters()
+    return counters.read_bytes, counters.write_bytes
+
+
+def net_io_counters(reader):
+    # (bytes_sent, bytes_recv) summed over all interfaces
+    if reader:
+        totals = reader.netdev.update()
+        return totals[4], totals[0]
+    counters = psutil.net_io_counters()
+    return counters.bytes_sent, counters.bytes_recv
+
+
+class RateMeter:
+    # Per-second rates of a tuple of cumulative counters
+    def __init__(self, read):
+        self.read = read
+        self.prev = read()
+        self.prev_time = time.time()
+
+    def rates(self):
+        curr = self.read()
+        now = time.time()
+        interval = now - self.prev_time
+        if interval <= 0:
+            interval = 1
+        rates = tuple((c - p) / interval for c, p in zip(curr, self.prev))
+        self.prev = curr
+        self.prev_time = now
+        return rates
@@ -0,0 +1,198 @@
+import glob
+import os
+import re
+import time
+
+from monitor_core.procfs import ProcFile
+
+# Temperatures and fans from hwmon, package/DRAM power from RAPL (Linux).
+# Sensors are discovered once: the attribute files are opened and kept open,
+# then re-read with one pread per sensor per tick. A read that fails (a
+# hot-unplugged NVMe drive, a reloaded driver) triggers rediscovery.
+#
+# RAPL exposes cumulative energy in microjoules that wraps at
+# max_energy_range_uj; power is the energy delta over the tick, with the
+# range added back when the counter went backwards.
+
+HWMON_ROOT = "/sys/class/hwmon"
+POWERCAP_ROOT = "/sys/class/powercap"
+
+# hwmon chip name -> group shown in the Sensors tab
+CHIP_GROUPS = {
+    'coretemp': 'CPU', 'k10temp': 'CPU', 'zenpower': 'CPU', 'cpu_thermal': 'CPU',
+    'nvme': 'NVMe', 'drivetemp': 'Disk',
+    'amdgpu': 'GPU', 'nouveau': 'GPU', 'radeon': 'GPU',
+}
+
+# Alert thresholds (deg C) when the chip does not report temp*_max / temp*_crit
+DEFAULT_HIGH = {'CPU': 90.0, 'NVMe': 70.0, 'Disk': 55.0, 'GPU': 90.0}
+FALLBACK_HIGH = 85.0
+
+
+def read_value(file):
+    return int(file.tokens()[0])
+
+
+def read_text(path, default=""):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return default
+
+
+def read_number(path):
+    text = read_text(path)
+    return int(text) if text.lstrip('-').isdigit() else None
+
+
+def slug(text):
+    return re.sub(r'\W+', '_', text).strip('_').lower()
+
+
+class Sensor:
+    def __init__(self, key, label, group, path, high=None, crit=None):
+        self.key = key
+        self.label = label
+        self.group = group
+        self.file = ProcFile(path, 64)
+        self.high = high
+        self.crit = crit
+
+    def close(self):
+        self.file.close()
+
+
+class EnergyCounter:
+    def __init__(self, key, label, path, max_range):
+        self.key = key
+        self.label = label
+        self.file = ProcFile(path, 64)
+        self.max_range = max_range
+        self.prev = None
+        self.prev_time = None
+
+    def watts(self):
+        energy = read_value(self.file)
+        now = time.monotonic()
+        watts = None
+        if self.prev is not None and now > self.prev_time:
+            delta = energy - self.prev
+            if delta < 0:
+                delta += self.max_range  # counter wrapped
+            watts = delta / (now - self.prev_time) / 1e6
+        self.prev = energy
+        self.prev_time = now
+        return watts
+
+    def close(self):
+        self.file.close()
+
+
+def unique_key(key, seen):
+    # hwmonN numbering changes between boots, so keys are built from the chip
+    # name and label; repeated chips (two NVMe drives) get a counter suffix
+    candidate = key
+    index = 2
+    while candidate in seen:
+        candidate = f"{key}_{index}"
+        index += 1
+    seen.add(candidate)
+    return candidate
+
+
+def discover_hwmon(root=HWMON_ROOT):
+    temps = []
+    fans = []
+    seen = set()
+    for chip in sorted(glob.glob(os.path.join(root, "hwmon*"))):
+        name = read_text(os.path.join(chip, "name"), os.path.basename(chip))
+        group = CHIP_GROUPS.get(name, name)
+        for path in sorted(glob.glob(os.path.join(chip, "temp*_input"))):
+            prefix = path[:-len("_input")]
+            label = read_text(prefix + "_label") or os.path.basename(prefix)
+            high = read_number(prefix + "_max")
+            crit = read_number(prefix + "_crit")
+            try:
+                temps.append(Sensor(
+                    unique_key(f"temp.{slug(name)}_{slug(label)}", seen), f"{group} {label}", group, path,
+                    high / 1000 if high else DEFAULT_HIGH.get(group, FALLBACK_HIGH),
+                    crit / 1000 if crit else None,
+                ))
+            except OSError:
+                continue
+        for path in sorted(glob.glob(os.path.join(chip, "fan*_input"))):
+            prefix = path[:-len("_input")]
+            label = read_text(prefix + "_label") or os.path.basename(prefix)
+            try:
+                fans.append(Sensor(unique_key(f"fan.{slug(name)}_{slug(label)}", seen), f"{name} {label}", group, path))
+            except OSError:
+                continue
+    return temps, fans
+
+
+def discover_rapl(root=POWERCAP_ROOT):
+    # Top-level zones (package-N, psys) and their subzones (core, uncore, dram)
+    counters = []
+    unreadable = False
+    for zone in sorted(glob.glob(os.path.join(root, "intel-rapl:*"))):
+        name = read_text(os.path.join(zone, "name"), os.path.basename(zone))
+        parent = os.path.basename(os.path.dirname(os.path.realpath(zone)))
+        if parent.startswith("intel-rapl:"):
+            name = f"{read_text(os.path.join(root, parent, 'name'), parent)} {name}"
+        max_range = read_number(os.path.join(zone, "max_energy_range_uj")) or 2 ** 32
+        try:
+            counters.append(EnergyCounter(f"power.{slug(name)}", name, os.path.join(zone, "energy_uj"), max_range))
+        except PermissionError:
+            unreadable = True  # energy_uj is root-only on many kernels
+        except OSError:
+            continue
+    return counters, unreadable
+
+
+class SensorCollector:
+    def __init__(self, hwmon_root=HWMON_ROOT, powercap_root=POWERCAP_ROOT):
+        self.hwmon_root = hwmon_root
+        self.powercap_root = powercap_root
+        self.temps = []
+        self.fans = []
+        self.power = []
+        self.power_unreadable = False
+        self.discover()
+
+    def discover(self):
+        self.close()
+        self.temps, self.fans = discover_hwmon(self.hwmon_root)
+        self.power, self.power_unreadable = discover_rapl(self.powercap_root)
+
+    @property
+    def available(self):
+        return bool(self.temps or self.fans or self.power)
+
+    def sample(self):
+        # {'temperatures': [...], 'fans': [...], 'power': [...]}; one entry
+        # per sensor with its key, label and current value
+        try:
+            return self.read_all()
+        except (OSError, ValueError, IndexError):
+            self.discover()
+            return self.read_all()
+
+    def read_all(self):
+        temperatures = [
+            {'key': s.key, 'label': s.label, 'group': s.group, 'value': read_value(s.file) / 1000,
+             'high': s.high, 'crit': s.crit}
+            for s in self.temps
+        ]
+        fans = [{'key': s.key, 'label': s.label, 'value': read_value(s.file)} for s in self.fans]
+        power = []
+        for counter in self.power:
+            watts = counter.watts()
+            if watts is not None:
+                power.append({'key': counter.key, 'label': counter.label, 'value': watts})
+        return {'temperatures': temperatures, 'fans': fans, 'power': power}
+
+    def close(self):
+        for sensor in self.temps + self.fans + self.power:
+            sensor.close()
+        self.temps, self.fans, self.power = [], [], []
@@ -0,0 +1,204 @@
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Latest-sample board in shared memory. One sampler process writes the most
+# recent value of every metric into a fixed-layout, mmap-backed segment;
+# any number of local readers (a CLI, extra windows, the overlay) map the
+# same file and read it without syscalls or re-sampling. Consistency uses a
+# seqlock: the writer makes the sequence odd while it updates and even when
+# done, and readers retry if the sequence was odd or moved during the copy.
+#
+# Layout: 64-byte header, then `slots` fixed 64-byte records.
+#   header: magic[8] version:u32 slots:u32 seq:u64 updated:f64 pid:u32
+#   slot:   name[48] (utf-8, NUL padded) value:f64 ts:f64
+#
+# Names are never truncated: a cut could merge two names sharing a prefix
+# or split a UTF-8 character. A name over 48 bytes, or a new name once all
+# slots are taken, is not published and reported once.
+
+MAGIC = b'OSMONSHM'
+VERSION = 1
+HEADER = struct.Struct('=8sIIQdI')
+HEADER_SIZE = 64
+SEQ_OFFSET = 16
+NAME_SIZE = 48
+SLOT = struct.Struct(f'={NAME_SIZE}sdd')
+SLOT_SIZE = 64
+DEFAULT_SLOTS = 256
+
+
+def default_path():
+    name = f"os_monitor-{os.getuid()}" if hasattr(os, 'getuid') else "os_monitor"
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, name)
+
+
+class SnapshotWriter:
+    def __init__(self, path=None, slots=DEFAULT_SLOTS):
+        self.path = path or default_path()
+        self.slots = slots
+        self.size = HEADER_SIZE + slots * SLOT_SIZE
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl:
+            # One writer per segment; a second sampler gets BlockingIOError
+            try:
+                fcntl.flock(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(self.fd)
+                raise
+        os.ftruncate(self.fd, self.size)
+        self.map = mmap.mmap(self.fd, self.size)
+        self.map[:self.size] = bytes(self.size)
+        self.seq = 0
+        self.index = {}  # metric name -> slot number
+        self.rejected = set()  # names already reported as not publishable
+        self.full = False
+        # Every collector thread publishes; the seqlock only works with one
+        # writer at a time, so writes are serialized here
+        self.lock = threading.Lock()
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, slots, self.seq, time.time(), os.getpid())
+
+    def publish(self, values, ts=None):
+        # values: {metric name: number}; unknown names claim the next free slot
+        ts = ts or time.time()
+        with self.lock:
+            self.seq += 1
+            struct.pack_into('=Q', self.map, SEQ_OFFSET, self.seq)
+            for name, value in values.items():
+                slot = self.index.get(name)
+                if slot is None:
+                    slot = self.claim(name)
+                    if slot is None:
+                        continue
+                SLOT.pack_into(self.map, HEADER_SIZE + slot * SLOT_SIZE, name.encode(), float(value), ts)
+            struct.pack_into('=d', self.map, SEQ_OFFSET + 8, ts)
+            self.seq += 1
+            struct.pack_into('=Q', self.map, SEQ_OFFSET, self.seq)
+
+    def claim(self, name):
+        # Slot for a new name, or None if it cannot be published; called with the lock held
+        if name in self.rejected:
+            return None
+        if len(name.encode()) > NAME_SIZE:
+            self.rejected.add(name)
+            print(f"[ERROR] Metric name longer than {NAME_SIZE} bytes, not in the shared-memory snapshot: {name}")
+            return None
+        if len(self.index) >= self.slots:
+            self.rejected.add(name)
+            if not self.full:
+                self.full = True
+                print(f"[ERROR] Shared-memory snapshot full ({self.slots} slots); {name} and later metrics not published")
+            return None
+        slot = self.index[name] = len(self.index)
+        return slot
+
+    def close(self):
+        self.map.close()
+        os.close(self.fd)
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class SnapshotReader:
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        with open(self.path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.slots, _, _, self.pid = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not an OS Monitor snapshot segment")
+
+    def sequence(self):
+        return struct.unpack_from('=Q', self.map, SEQ_OFFSET)[0]
+
+    def read(self, retries=100):
+        # {metric name: (value, ts)}, consistent across all metrics
+        for _ in range(retries):
+            before = self.sequence()
+            if before & 1:
+                time.sleep(0)  # writer mid-update; let it finish
+                continue
+            data = self.map[:HEADER_SIZE + self.slots * SLOT_SIZE]
+            if self.sequence() != before:
+                time.sleep(0)
+                continue
+            snapshot = {}
+            for slot in range(self.slots):
+                name, value, ts = SLOT.unpack_from(data, HEADER_SIZE + slot * SLOT_SIZE)
+                if not name[:1].strip(b'\0'):
+                    break
+                snapshot[name.rstrip(b'\0').decode(errors='replace')] = (value, ts)
+            return snapshot
+        raise TimeoutError("snapshot kept changing while being read")
+
+    def updated(self):
+        return struct.unpack_from('=d', self.map, SEQ_OFFSET + 8)[0]
+
+    def writer_alive(self):
+        try:
+            os.kill(self.pid, 0)
+        except PermissionError:
+            return True
+        except OSError:
+            return False
+        return True
+
+    def close(self):
+        self.map.close()
+
+
+_writer = None
+
+
+def enable_publisher(path=None):
+    # Returns the writer, or None when another sampler already owns the segment
+    global _writer
+    if _writer is None:
+        try:
+            _writer = SnapshotWriter(path)
+        except OSError:
+            return None
+    return _writer
+
+
+def get_publisher():
+    return _writer
+
+
+def close_publisher():
+    global _writer
+    if _writer is not None:
+        _writer.close()
+        _writer = None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print the latest OS Monitor samples from shared memory")
+    parser.add_argument("--path", default=None)
+    parser.add_argument("--watch", type=float, default=0, metavar="SECONDS", help="refresh every SECONDS")
+    args = parser.parse_args()
+
+    reader = SnapshotReader(args.path)
+    while True:
+        snapshot = reader.read()
+        now = time.time()
+        for name in sorted(snapshot):
+            value, ts = snapshot[name]
+            print(f"{name:<32} {value:>14.2f}   ({now - ts:.1f}s ago)")
+        if not args.watch:
+            break
+        time.sleep(args.watch)
+        print()
@@ -0,0 +1,154 @@
+import math
+import threading
+import time
+
+# Streaming quantiles in constant memory. DDSketch buckets values on a
+# logarithmic scale so every quantile it returns is within `relative_accuracy`
+# of the true value; sketches of the same accuracy merge by adding bucket
+# counts. WindowedSketch keeps a ring of sub-sketches, one per time slice,
+# and merges the slices covering the requested window at query time.
+
+WINDOWS = {
+    '1m': (60, 6),        # window seconds, number of slices
+    '1h': (3600, 12),
+    '24h': (86400, 24),
+}
+
+
+class DDSketch:
+    def __init__(self, relative_accuracy=0.01, max_bins=512):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.max_bins = max_bins
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sum = 0.0
+
+    def add(self, value):
+        # Metrics here are non-negative; anything at or below the smallest
+        # representable value is counted as zero.
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= 1e-9:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self.log_gamma)
+        self.bins[key] = self.bins.get(key, 0) + 1
+        if len(self.bins) > self.max_bins:
+            self.collapse()
+
+    def collapse(self):
+        # Fold the lowest buckets together; high quantiles stay accurate
+        keys = sorted(self.bins)
+        excess = len(keys) - self.max_bins + 1
+        target = keys[excess]
+        for key in keys[:excess]:
+            self.bins[target] += self.bins.pop(key)
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self.bins) > self.max_bins:
+            self.collapse()
+
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+
+class WindowedSketch:
+    def __init__(self, window, slices, relative_accuracy=0.01):
+        self.window = window
+        self.slice_length = window / slices
+        self.relative_accuracy = relative_accuracy
+        self.slices = [None] * slices  # (slice index, DDSketch)
+
+    def add(self, value, now):
+        index = int(now // self.slice_length)
+        position = index % len(self.slices)
+        current = self.slices[position]
+        if current is None or current[0] != index:
+            current = self.slices[position] = (index, DDSketch(self.relative_accuracy))
+        current[1].add(value)
+
+    def merged(self, now):
+        oldest = int(now // self.slice_length) - len(self.slices) + 1
+        merged = DDSketch(self.relative_accuracy)
+        for entry in self.slices:
+            if entry is not None and entry[0] >= oldest:
+                merged.merge(entry[1])
+        return merged
+
+
+class MetricStats:
+    def __init__(self, windows=WINDOWS):
+        self.windows = windows
+        self.sketches = {}
+        self.lock = threading.Lock()
+
+    def add(self, metric, value, now=None):
+        now = now or time.time()
+        with self.lock:
+            sketches = self.sketches.get(metric)
+            if sketches is None:
+                sketches = self.sketches[metric] = {
+                    name: WindowedSketch(window, slices) for name, (window, slices) in self.windows.items()
+                }
+            for sketch in sketches.values():
+                sketch.add(value, now)
+
+    def summary(self, metric, window, now=None):
+        # {'p50', 'p95', 'p99', 'max', 'count'} or None if nothing recorded
+        now = now or time.time()
+        with self.lock:
+            sketches = self.sketches.get(metric)
+            if sketches is None:
+                return None
+            merged = sketches[window].merged(now)
+        if merged.count == 0:
+            return None
+        return {
+            'p50': merged.quantile(0.50),
+            'p95': merged.quantile(0.95),
+            'p99': merged.quantile(0.99),
+            'max': merged.max,
+            'count': merged.count,
+        }
+
+    def export(self, now=None):
+        # {metric: {window: summary}} for every recorded metric
+        with self.lock:
+            metrics = list(self.sketches)
+        return {metric: {window: self.summary(metric, window, now) for window in self.windows} for metric in metrics}
+
+
+_stats = MetricStats()
+
+
+def get_stats():
+    return _stats
@@ -0,0 +1,273 @@
+import threading
+import time
+from collections import deque
+
+import psutil
+
+from monitor_core.journal import record_alert
+
+# Root-cause snapshots. Every published sample is checked against a small
+# set of triggers (a level crossing or a sharp jump between two samples);
+# when one fires, the top processes, open connections and per-disk I/O are
+# captured on a background thread so the offending process is recorded
+# while it still exists. Captures are rate limited and bounded by a time
+# budget: on a huge process table the process scan stops at the deadline
+# and the snapshot is marked truncated.
+
+MIN_INTERVAL = 30.0    # seconds between two captures, whatever fired
+CAPTURE_BUDGET = 0.5   # seconds one capture may spend
+SAMPLE_WINDOW = 0.25   # seconds between the two readings used for rates
+KEEP_SNAPSHOTS = 20
+TOP_N = 8
+REARM = 0.9            # a level trigger re-arms below this fraction of its threshold
+
+
+class Trigger:
+    def __init__(self, metric, label, unit="", threshold=None, jump=None):
+        self.metric = metric
+        self.source, self.name = metric.split('.', 1)
+        self.label = label
+        self.unit = unit
+        self.threshold = threshold
+        self.jump = jump
+        self.armed = True
+        self.prev = None
+
+    def check(self, value):
+        # Reason text when this sample should trigger a capture, else None
+        reason = None
+        if self.threshold is not None:
+            if self.armed and value >= self.threshold:
+                self.armed = False
+                reason = f"{self.label} {value:.1f}{self.unit} (threshold {self.threshold:g}{self.unit})"
+            elif not self.armed and value < self.threshold * REARM:
+                self.armed = True
+        if reason is None and self.jump is not None and self.prev is not None and value - self.prev >= self.jump:
+            reason = f"{self.label} jumped {self.prev:.1f} &rarr; {value:.1f}{self.unit}"
+        self.prev = value
+        return reason
+
+
+DEFAULT_TRIGGERS = [
+    Trigger('cpu.utilization', "CPU", "%", threshold=90, jump=50),
+    Trigger('memory.percent', "Memory", "%", threshold=90, jump=15),
+    Trigger('memory.psi_full', "Memory stall (full)", "%", threshold=10),
+    Trigger('disk.active_time', "Disk active time", "%", threshold=95),
+]
+
+
+def process_times(deadline):
+    # {pid: (name, user, cpu seconds, rss)}; stops early at the deadline
+    found = {}
+    truncated = False
+    for proc in psutil.process_iter(['pid', 'name', 'username', 'cpu_times', 'memory_info']):
+        if time.perf_counter() > deadline:
+            truncated = True
+            break
+        info = proc.info
+        if info['cpu_times'] is None:
+            continue
+        rss = info['memory_info'].rss if info['memory_info'] else 0
+        found[info['pid']] = (info['name'], info['username'], info['cpu_times'].user + info['cpu_times'].system, rss)
+    return found, truncated
+
+
+def disk_counters():
+    try:
+        return psutil.disk_io_counters(perdisk=True) or {}
+    except (OSError, RuntimeError):
+        return {}
+
+
+def top_connections(names, limit):
+    try:
+        connections = psutil.net_connections(kind='inet')
+    except (psutil.AccessDenied, OSError):
+        return [], {}
+    states = {}
+    rows = []
+    for conn in connections:
+        if conn.status != psutil.CONN_NONE:  # UDP sockets have no state
+            states[conn.status] = states.get(conn.status, 0) + 1
+        if conn.status == psutil.CONN_ESTABLISHED and conn.raddr and len(rows) < limit:
+            rows.append({
+                'pid': conn.pid,
+                'name': names.get(conn.pid, "-"),
+                'local': f"{conn.laddr.ip}:{conn.laddr.port}",
+                'remote': f"{conn.raddr.ip}:{conn.raddr.port}",
+            })
+    return rows, states
+
+
+def capture_snapshot(reason, budget=CAPTURE_BUDGET, window=SAMPLE_WINDOW, top_n=TOP_N):
+    # CPU% per process and disk rates come from two readings `window` apart
+    started = time.perf_counter()
+    deadline = started + budget
+    ts = time.time()
+    disks_before = disk_counters()
+    before, truncated = process_times(deadline - window)
+    time.sleep(window)
+    second_pass = time.perf_counter()
+    after, truncated_after = process_times(deadline)
+    disks_after = disk_counters()
+    # Each process is read about one pass plus the window apart
+    interval = second_pass - started
+    disk_interval = max(time.perf_counter() - started, 1e-3)
+
+    processes = []
+    for pid, (name, user, cpu, rss) in after.items():
+        prev = before.get(pid)
+        cpu_percent = (cpu - prev[2]) / interval * 100 if prev else 0.0
+        processes.append({'pid': pid, 'name': name, 'user': user, 'cpu': max(cpu_percent, 0.0), 'rss': rss})
+    by_cpu = sorted((p for p in processes if p['cpu'] > 0), key=lambda p: p['cpu'], reverse=True)[:top_n]
+    by_rss = sorted(processes, key=lambda p: p['rss'], reverse=True)[:top_n]
+
+    disks = []
+    for name, counters in disks_after.items():
+        prev = disks_before.get(name)
+        if prev is None:
+            continue
+        read = (counters.read_bytes - prev.read_bytes) / disk_interval
+        write = (counters.write_bytes - prev.write_bytes) / disk_interval
+        busy = getattr(counters, 'busy_time', None)
+        busy_prev = getattr(prev, 'busy_time', None)
+        active = min((busy - busy_prev) / (disk_interval * 1000) * 100, 100) if busy is not None and busy_prev is not None else None
+        disks.append({'name': name, 'read': read, 'write': write, 'active': active})
+    disks.sort(key=lambda d: d['read'] + d['write'], reverse=True)
+
+    names = {pid: info[0] for pid, info in after.items()}
+    connections, states = top_connections(names, top_n)
+
+    return {
+        'ts': ts,
+        'reason': reason,
+        'by_cpu': by_cpu,
+        'by_rss': by_rss,
+        'process_count': len(after),
+        'disks': disks[:top_n],
+        'connections': connections,
+        'connection_states': states,
+        'truncated': truncated or truncated_after,
+        'duration': time.perf_counter() - started,
+    }
+
+
+def format_snapshot(snapshot):
+    # HTML for the notification panel
+    def format_bytes(value):
+        if value < 1024 * 1024:
+            return f"{value / 1024:.0f} KB"
+        if value < 1024 ** 3:
+            return f"{value / 1024 ** 2:.1f} MB"
+        return f"{value / 1024 ** 3:.2f} GB"
+
+    lines = [
+        f"<b>{time.strftime('%H:%M:%S', time.localtime(snapshot['ts']))}</b> {snapshot['reason']}",
+        f"<b>Top CPU</b> ({snapshot['process_count']} processes"
+        f"{', scan truncated' if snapshot['truncated'] else ''}):",
+    ]
+    for proc in snapshot['by_cpu']:
+        lines.append(f"&nbsp;&nbsp;{proc['name']} (PID {proc['pid']}, {proc['user'] or '-'}): "
+                     f"{proc['cpu']:.1f}% CPU, {format_bytes(proc['rss'])}")
+    lines.append("<b>Top memory:</b>")
+    for proc in snapshot['by_rss']:
+        lines.append(f"&nbsp;&nbsp;{proc['name']} (PID {proc['pid']}): {format_bytes(proc['rss'])}")
+    if snapshot['disks']:
+        lines.append("<b>Disk I/O:</b>")
+        for disk in snapshot['disks']:
+            active = f", {disk['active']:.0f}% active" if disk['active'] is not None else ""
+            lines.append(f"&nbsp;&nbsp;{disk['name']}: read {format_bytes(disk['read'])}/s, "
+                         f"write {format_bytes(disk['write'])}/s{active}")
+    if snapshot['connection_states']:
+        states = ", ".join(f"{count} {state.lower()}" for state, count in
+                           sorted(snapshot['connection_states'].items(), key=lambda item: -item[1]))
+        lines.append(f"<b>Connections:</b> {states}")
+        for conn in snapshot['connections']:
+            lines.append(f"&nbsp;&nbsp;{conn['name']} (PID {conn['pid'] or '-'}) {conn['local']} &rarr; {conn['remote']}")
+    lines.append(f"<i>Captured in {snapshot['duration'] * 1000:.0f} ms</i>")
+    return "<br>".join(lines)
+
+
+class SnapshotRecorder:
+    def __init__(self, triggers=None, min_interval=MIN_INTERVAL, budget=CAPTURE_BUDGET, keep=KEEP_SNAPSHOTS):
+        self.triggers = {}
+        for trigger in (DEFAULT_TRIGGERS if triggers is None else triggers):
+            self.triggers.setdefault(trigger.source, []).append(trigger)
+        self.min_interval = min_interval
+        self.budget = budget
+        self.snapshots = deque(maxlen=keep)
+        self.listeners = []
+        self.lock = threading.Lock()
+        self.capturing = False
+        self.last_capture = 0.0
+        self.suppressed = 0
+
+    def add_listener(self, callback):
+        # callback(snapshot) runs on the capture thread
+        self.listeners.append(callback)
+
+    def observe(self, source, values):
+        # Called from metrics.publish on the collector threads; a source
+        # with no trigger costs one dict lookup
+        triggers = self.triggers.get(source)
+        if not triggers:
+            return
+        reasons = []
+        metric = None
+        for trigger in triggers:
+            value = values.get(trigger.name)
+            if value is not None:
+                reason = trigger.check(value)
+                if reason:
+                    reasons.append(reason)
+                    metric = metric or trigger.metric
+        if reasons:
+            self.request("; ".join(reasons), metric)
+
+    def request(self, reason, metric=None):
+        now = time.monotonic()
+        with self.lock:
+            if self.capturing or now - self.last_capture < self.min_interval:
+                self.suppressed += 1
+                return False
+            self.capturing = True
+            self.last_capture = now
+        threading.Thread(target=self.capture, args=(reason, metric), name="snapshot", daemon=True).start()
+        return True
+
+    def capture(self, reason, metric=None):
+        try:
+            snapshot = capture_snapshot(reason, self.budget)
+            snapshot['suppressed'] = self.suppressed
+            self.suppressed = 0
+            self.snapshots.append(snapshot)
+            # Journaled under the busiest process so the panel can filter by it
+            top = snapshot['by_cpu'][0] if snapshot['by_cpu'] else None
+            record_alert('anomaly', reason, metric=metric, ts=snapshot['ts'], details=snapshot,
+                         process=top['name'] if top else None, pid=top['pid'] if top else None)
+            for callback in self.listeners:
+                callback(snapshot)
+        except Exception as e:
+            print(f"[ERROR] Failed to capture snapshot: {e}")
+        finally:
+            with self.lock:
+                self.capturing = False
+
+
+_recorder = None
+
+
+def enable_snapshots(**options):
+    global _recorder
+    if _recorder is None:
+        _recorder = SnapshotRecorder(**options)
+    return _recorder
+
+
+def get_recorder():
+    return _recorder
+
+
+def close_snapshots():
+    global _recorder
+    _recorder = None
@@ -0,0 +1,200 @@
+import importlib
+import io
+import os
+import pickle
+import queue
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+# Runs fragile collectors (driver calls, WMI, external tools) in a child
+# process so a hang or crash there cannot block a Qt thread. The child calls
+# the target every `interval` seconds and writes the results to its stdout
+# pipe as length-prefixed pickles, `batch` samples per frame. The parent
+# reads frames on a helper thread; poll() drains them and acts as the
+# watchdog: a child that exits, or sends nothing within its deadline, is
+# killed and restarted with exponential backoff. `stale` tells the UI that
+# the data on screen is older than the deadline.
+#
+# Targets are "module:function" strings naming Qt-free callables, e.g.
+# "monitor_core.collectors:gpu_sample".
+
+FRAME = struct.Struct('!I')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAX_BACKOFF = 30
+
+
+def resolve(target):
+    module, function = target.split(':')
+    return getattr(importlib.import_module(module), function)
+
+
+def child_command(target, interval, batch):
+    return [sys.executable, '-m', 'monitor_core.supervisor', target, str(interval), str(batch)]
+
+
+def child_env():
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [ROOT, env.get('PYTHONPATH')]))
+    return env
+
+
+def spawn(target, interval, batch):
+    flags = subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
+    return subprocess.Popen(child_command(target, interval, batch), stdin=subprocess.DEVNULL,
+                            stdout=subprocess.PIPE, env=child_env(), creationflags=flags)
+
+
+def read_frames(stream):
+    while True:
+        header = stream.read(FRAME.size)
+        if len(header) < FRAME.size:
+            return
+        yield pickle.loads(stream.read(FRAME.unpack(header)[0]))
+
+
+class SupervisedCollector:
+    def __init__(self, target, interval=1.0, deadline=5.0, batch=1):
+        self.target = target
+        self.interval = interval
+        self.deadline = deadline
+        self.batch = batch
+        self.queue = queue.SimpleQueue()
+        self.process = None
+        self.generation = 0
+        self.restarts = 0
+        self.last_error = None
+        self.last_seen = 0  # any message from the child, including errors
+        self.last_sample = 0
+        self.next_start = 0
+        self.created = time.time()
+        self.start()
+
+    def start(self):
+        self.generation += 1
+        self.process = spawn(self.target, self.interval, self.batch)
+        self.last_seen = time.time()
+        threading.Thread(target=self.read_loop, args=(self.process, self.generation),
+                         name=f"collector-{self.target}", daemon=True).start()
+
+    def read_loop(self, process, generation):
+        try:
+            for frame in read_frames(process.stdout):
+                self.queue.put((generation, frame))
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+
+    def set_interval(self, interval):
+        # The child samples on its own clock, so a new interval needs a new
+        # child; a deliberate restart, not counted as a failure
+        if interval == self.interval:
+            return
+        self.interval = interval
+        if self.process is not None:
+            self.kill()
+            self.start()
+
+    def poll(self, timeout=0):
+        # Returns [(ts, value)] received since the last call, waiting up to
+        # `timeout` seconds for the first one; restarts the child if needed
+        samples = []
+        messages = []
+        try:
+            messages.append(self.queue.get(timeout=timeout) if timeout else self.queue.get_nowait())
+            while True:
+                messages.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        for generation, frame in messages:
+            if generation != self.generation:
+                continue  # from a child that has already been replaced
+            self.last_seen = time.time()
+            for kind, ts, value in frame:
+                if kind == 'sample':
+                    samples.append((ts, value))
+                    self.last_sample = ts
+                    self.restarts = 0
+                else:
+                    self.last_error = value
+        self.check()
+        return samples
+
+    def check(self):
+        now = time.time()
+        if self.process is None:
+            if now >= self.next_start:
+                self.start()
+            return
+        if self.process.poll() is not None:
+            self.last_error = f"collector exited with code {self.process.returncode}"
+        elif now - self.last_seen > self.deadline + self.interval * self.batch:
+            self.last_error = f"no response within {self.deadline:.0f}s"
+        else:
+            return
+        self.kill()
+        self.restarts += 1
+        self.next_start = now + min(2 ** (self.restarts - 1), MAX_BACKOFF)
+
+    @property
+    def stale(self):
+        return time.time() - (self.last_sample or self.created) > self.deadline + self.interval * self.batch
+
+    def kill(self):
+        if self.process is not None:
+            self.process.kill()
+            self.process.wait()
+            self.process.stdout.close()
+            self.process = None
+
+    def close(self):
+        self.kill()
+
+
+def call_isolated(target, deadline=5.0, default=None):
+    # One call of `target` in a child process; `default` if it fails or hangs
+    process = spawn(target, 0, 1)
+    try:
+        output, _ = process.communicate(timeout=deadline)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        return default
+    for frame in read_frames(io.BytesIO(output)):
+        for kind, _, value in frame:
+            if kind == 'sample':
+                return value
+    return default
+
+
+def run_child(target, interval, batch):
+    # Frames go to the original stdout; anything the collector (or native
+    # code under it) prints is redirected to stderr so it cannot corrupt
+    # the stream
+    out = os.fdopen(os.dup(sys.stdout.fileno()), 'wb')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+    function = resolve(target)
+    pending = []
+    while True:
+        started = time.time()
+        try:
+            pending.append(('sample', started, function()))
+        except Exception as e:
+            pending.append(('error', started, f"{type(e).__name__}: {e}"))
+        if len(pending) >= batch or not interval:
+            data = pickle.dumps(pending)
+            out.write(FRAME.pack(len(data)) + data)
+            out.flush()
+            pending = []
+        if not interval:
+            return
+        time.sleep(max(interval - (time.time() - started), 0))
+
+
+if __name__ == "__main__":
+    try:
+        run_child(sys.argv[1], float(sys.argv[2]), int(sys.argv[3]))
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
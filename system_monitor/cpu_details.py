@@ -1,62 +1,184 @@
+import os
 import psutil
 import time
-import wmi
 from datetime import timedelta
 from PyQt5.QtWidgets import QWidget, QLabel, QGridLayout, QHBoxLayout, QSizePolicy
-from PyQt5.QtCore import QThread, pyqtSignal, QObject, QTimer, Qt
+from PyQt5.QtCore import QThread, pyqtSignal, pyqtSlot, QObject, QTimer, QMetaObject, Qt
 from pyqtgraph import TextItem
 import pyqtgraph as pg
 
+from monitor_core.procfs import get_reader, STAT_FIELDS
+from monitor_core.metrics import publish, percentile_text
+from monitor_core.decimate import PlotHistory, DEFAULT_WINDOW, WINDOW_LABELS, window_seconds
+from monitor_core.archive import get_archive
+from monitor_core.supervisor import call_isolated
+from monitor_core.sampling import cpu_usage, boot_time
+from monitor_core.process_tree import ProcessTree, format_groups, PROCESS_ALERT
+from monitor_core.journal import record_alert
+from monitor_core.budget import sampling_scale, Pacer, RenderThrottle
+from monitor_core.samples import CPUSample, SampleRing
+from system_monitor.details_panel import DetailsPanel
+
+
+TOP_SOURCES = 3
+
+
+def top_rates(curr, prev, interval, labels=None):
+    # [(label, per second)] of the counters that moved most since prev
+    rates = sorted(((curr[name] - prev.get(name, curr[name])) / interval, name) for name in curr)
+    top = []
+    for rate, name in reversed(rates[-TOP_SOURCES:]):
+        if rate <= 0:
+            break
+        label = labels.get(name) if labels else None
+        top.append((f"{name} ({label})" if label else name, rate))
+    return top
+
+
+def format_rate(rate):
+    return f"{rate / 1000:.1f}k" if rate >= 1000 else f"{rate:.0f}"
+
+
+def format_uptime(seconds):
+    uptime_td = timedelta(seconds=seconds)
+    hours, remainder = divmod(uptime_td.seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"<b>Uptime:</b> {uptime_td.days}:{hours}:{minutes}:{seconds}"
+
 
 class CPUWorker(QObject):
-    data_updated = pyqtSignal(float, dict)
+    samples_ready = pyqtSignal()
+    # After each process walk: [(pid, name, user, cpu, memory percent)] of
+    # candidate single processes for PROCESS_ALERT, and the top process trees
+    processes_updated = pyqtSignal(list, list)
 
     def __init__(self, interval=1000):
         super().__init__()
         self.interval = interval
         self.timer = None
-        try:
-            self.cpu_name = wmi.WMI().Win32_Processor()[0].Name
-        except:
-            self.cpu_name = "Unknown CPU"
+        self.reader = get_reader()
+        self.cpu_name = "Detecting..."
+        self.physical_cores = psutil.cpu_count(logical=False)
+        self.logical_cores = psutil.cpu_count(logical=True)
+        self.samples = SampleRing(CPUSample)
+        # Process counts and per-tree/application/user totals in one /proc
+        # walk; an expensive scan, so it slows down first when over budget
+        self.tree = ProcessTree()
+        self.tree_pacer = Pacer(interval / 1000)
+        self.groups = {'processes': None, 'threads': None, 'trees': [], 'names': [], 'users': []}
+        # Cumulative interrupt/softirq/scheduler counters of the last tick
+        self.prev_activity = None
+        self.prev_activity_time = None
 
     def start_timer(self):
+        # WMI can hang; query it in a child process with a deadline
+        self.cpu_name = call_isolated("monitor_core.collectors:cpu_name", deadline=5, default="Unknown CPU")
         self.timer = QTimer(self)
         self.timer.setInterval(self.interval)
         self.timer.timeout.connect(self.collect_data)
         self.timer.start()
 
     def collect_data(self):
-        usage = psutil.cpu_percent(interval=None)
+        sample = self.samples.acquire()
+        sample.ts = time.time()
+        sample.name = self.cpu_name
+        sample.utilization = cpu_usage(self.reader)
         cpu_freq = psutil.cpu_freq()
-        uptime_seconds = time.time() - psutil.boot_time()
-        uptime_td = timedelta(seconds=int(uptime_seconds))
-        days = uptime_td.days
-        hours, remainder = divmod(uptime_td.seconds, 3600)
-        minutes, seconds = divmod(remainder, 60)
-        uptime_str = f"{days}:{hours}:{minutes}:{seconds}"
-
-        process_count = len(list(psutil.process_iter(['pid'])))
-        thread_count = 0
-        for p in psutil.process_iter(['pid']):
-            try:
-                if p.is_running():
-                    thread_count += p.num_threads()
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                continue
-
-        cpu_info = {
-            "name": self.cpu_name,
-            "utilization": usage,
-            "freq": cpu_freq,
-            "physical_cores": psutil.cpu_count(logical=False),
-            "logical_cores": psutil.cpu_count(logical=True),
-            "processes": process_count,
-            "threads": thread_count,
-            "uptime": uptime_str,
+        sample.freq = cpu_freq.current if cpu_freq else None
+        sample.physical_cores = self.physical_cores
+        sample.logical_cores = self.logical_cores
+        sample.uptime = int(sample.ts - boot_time(self.reader))
+        if self.tree_pacer.due():
+            self.groups = self.tree.update()
+            for metric, message, process, pid in self.tree.check_alerts():
+                record_alert('process', message, metric=metric, process=process, pid=pid)
+            busy = [(node.pid, node.name, node.user, node.cpu, self.tree.memory_percent(node))
+                    for node in self.tree.busiest(PROCESS_ALERT, PROCESS_ALERT)]
+            self.processes_updated.emit(busy, self.groups['trees'])
+        self.fill_activity(sample)
+        groups = self.groups
+        sample.processes = groups['processes']
+        sample.threads = groups['threads']
+        sample.trees = groups['trees']
+        sample.apps = groups['names']
+        sample.users = groups['users']
+
+        publish("cpu", {
+            "utilization": sample.utilization, "processes": sample.processes, "threads": sample.threads,
+            "interrupts": sample.interrupts, "softirqs": sample.softirqs, "ctx_switches": sample.ctx_switches,
+            "forks": sample.forks, "run_queue": sample.run_queue,
+        }, sample.ts)
+        if self.samples.commit():
+            self.samples_ready.emit()
+        interval = self.interval * sampling_scale()
+        if self.timer.interval() != interval:
+            self.timer.setInterval(interval)
+
+    def read_activity(self):
+        # Cumulative counters, from /proc where available (per CPU and per
+        # source) and from psutil's totals elsewhere
+        reader = self.reader
+        if reader is None or reader.interrupts is None:
+            stats = psutil.cpu_stats()
+            load = os.getloadavg() if hasattr(os, 'getloadavg') else None
+            return {
+                'interrupts': stats.interrupts, 'softirqs': stats.soft_interrupts, 'ctxt': stats.ctx_switches,
+                'processes': None, 'procs_running': None, 'procs_blocked': None,
+                'load_avg': tuple(load) if load else None,
+                'cpu_interrupts': None, 'cpu_softirqs': None, 'irq_rows': None, 'softirq_rows': None,
+            }
+        _, stat = reader.stat.update()
+        irq_cpu, irq_rows = reader.interrupts.update()
+        softirq_cpu, softirq_rows = reader.softirqs.update()
+        load = reader.loadavg.update()
+        return {
+            'interrupts': sum(irq_rows.values()), 'softirqs': sum(softirq_rows.values()),
+            'ctxt': stat[STAT_FIELDS.index('ctxt')], 'processes': stat[STAT_FIELDS.index('processes')],
+            'procs_running': stat[STAT_FIELDS.index('procs_running')],
+            'procs_blocked': stat[STAT_FIELDS.index('procs_blocked')],
+            'load_avg': (load[0], load[1], load[2]),
+            # the readers reuse their arrays and dicts, so keep copies
+            'cpu_interrupts': list(irq_cpu), 'cpu_softirqs': list(softirq_cpu),
+            'irq_rows': dict(irq_rows), 'softirq_rows': dict(softirq_rows),
         }
-        self.data_updated.emit(usage, cpu_info)
 
+    def fill_activity(self, sample):
+        try:
+            curr = self.read_activity()
+        except (OSError, ValueError, IndexError) as e:
+            print(f"[ERROR] Failed to read interrupt/scheduler counters: {e}")
+            curr = None
+        prev = self.prev_activity
+        interval = sample.ts - self.prev_activity_time if self.prev_activity_time else 0
+        self.prev_activity = curr
+        self.prev_activity_time = sample.ts
+        sample.interrupts = sample.softirqs = sample.ctx_switches = sample.forks = None
+        sample.cpu_interrupts = sample.cpu_softirqs = None
+        sample.top_interrupts = sample.top_softirqs = []
+        sample.run_queue = curr['procs_running'] if curr else None
+        sample.blocked = curr['procs_blocked'] if curr else None
+        sample.load_avg = curr['load_avg'] if curr else None
+        if curr is None or prev is None or interval <= 0:
+            return
+
+        def rate(key):
+            if curr[key] is None or prev[key] is None:
+                return None
+            return max(curr[key] - prev[key], 0) / interval
+
+        sample.interrupts = rate('interrupts')
+        sample.softirqs = rate('softirqs')
+        sample.ctx_switches = rate('ctxt')
+        sample.forks = rate('processes')
+        if curr['cpu_interrupts'] is not None and len(curr['cpu_interrupts']) == len(prev['cpu_interrupts']):
+            sample.cpu_interrupts = [max(a - b, 0) / interval for a, b in zip(curr['cpu_interrupts'], prev['cpu_interrupts'])]
+        if curr['cpu_softirqs'] is not None and len(curr['cpu_softirqs']) == len(prev['cpu_softirqs']):
+            sample.cpu_softirqs = [max(a - b, 0) / interval for a, b in zip(curr['cpu_softirqs'], prev['cpu_softirqs'])]
+        if curr['irq_rows'] is not None:
+            sample.top_interrupts = top_rates(curr['irq_rows'], prev['irq_rows'], interval, self.reader.interrupts.labels)
+            sample.top_softirqs = top_rates(curr['softirq_rows'], prev['softirq_rows'], interval)
+
+    @pyqtSlot()
     def stop(self):
         self.running = False
         if self.timer:
@@ -68,13 +190,22 @@ class CPUMonitorWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
 
-        self.cpu_usage_data = [0] * 60
+        self.window = DEFAULT_WINDOW
+        self.render = RenderThrottle()
+        self.cpu_history = PlotHistory('cpu.utilization')
+        self.irq_history = PlotHistory('cpu.interrupts')
+        self.softirq_history = PlotHistory('cpu.softirqs')
+        self.ctx_history = PlotHistory('cpu.ctx_switches')
+        self.forks_history = PlotHistory('cpu.forks')
+        for history in (self.cpu_history, self.irq_history, self.softirq_history, self.ctx_history, self.forks_history):
+            history.seed_from_archive(get_archive())
 
         self.worker = CPUWorker(interval=1000)
         self.worker_thread = QThread()
+        self.worker_thread.setObjectName("CPUWorker")  # thread name in the overhead report
         self.worker.moveToThread(self.worker_thread)
         self.worker_thread.started.connect(self.worker.start_timer)
-        self.worker.data_updated.connect(self.update_ui)
+        self.worker.samples_ready.connect(self.update_ui)
         self.worker_thread.start()
 
         layout = QGridLayout(self)
@@ -120,39 +251,186 @@ class CPUMonitorWidget(QWidget):
         x_label_layout = QHBoxLayout()
         self.left_label = QLabel("60 seconds")
         self.left_label.setStyleSheet("color: #E0E0E0; font-size: 8pt;")
+        self.window_labels = [self.left_label]
         self.right_label = QLabel("0")
         self.right_label.setStyleSheet("color: #E0E0E0; font-size: 8pt;")
         x_label_layout.addWidget(self.left_label, alignment=Qt.AlignLeft)  
         x_label_layout.addWidget(self.right_label, alignment=Qt.AlignRight) 
         layout.addLayout(x_label_layout, 3, 0, 1, 2)
 
-        self.details_label = QLabel()
-        self.details_label.setStyleSheet("color: #E0E0E0; font-size: 10pt;")
-        self.details_label.setWordWrap(True)
-        layout.addWidget(self.details_label, 4, 0, 1, 2)
+        # Interrupt and softirq rates (all CPUs)
+        irq_labels = QHBoxLayout()
+        self.irq_left_label = QLabel("Interrupts / softirqs per sec")
+        self.irq_left_label.setStyleSheet("color: white; font-size: 8pt;")
+        self.irq_right_label = QLabel()
+        self.irq_right_label.setStyleSheet("color: white; font-size: 8pt;")
+        irq_labels.addWidget(self.irq_left_label, alignment=Qt.AlignLeft)
+        irq_labels.addWidget(self.irq_right_label, alignment=Qt.AlignRight)
+        layout.addLayout(irq_labels, 4, 0, 1, 2)
+
+        self.irq_plot = pg.PlotWidget()
+        self.irq_plot.setBackground('#1C1C1C')
+        self.irq_plot.getPlotItem().showGrid(x=True, y=True, alpha=0.7)
+        for axis in ['bottom', 'left', 'top', 'right']:
+            self.irq_plot.getPlotItem().showAxis(axis, True)
+            self.irq_plot.getPlotItem().getAxis(axis).setTicks([])
+        self.irq_plot.setMouseEnabled(x=False, y=False)
+        self.irq_plot.setMenuEnabled(False)
+        self.irq_plot.getPlotItem().hideButtons()
+        self.irq_curve = self.irq_plot.plot(pen=pg.mkPen('#FFD700', width=2))
+        self.softirq_curve = self.irq_plot.plot(pen=pg.mkPen('#FF69B4', width=2))
+        self.irq_plot.setMinimumHeight(120)
+        layout.addWidget(self.irq_plot, 5, 0, 1, 2)
+
+        # Context switches and forks per sec
+        sched_labels = QHBoxLayout()
+        self.sched_left_label = QLabel("Context switches / forks per sec")
+        self.sched_left_label.setStyleSheet("color: white; font-size: 8pt;")
+        self.sched_right_label = QLabel()
+        self.sched_right_label.setStyleSheet("color: white; font-size: 8pt;")
+        sched_labels.addWidget(self.sched_left_label, alignment=Qt.AlignLeft)
+        sched_labels.addWidget(self.sched_right_label, alignment=Qt.AlignRight)
+        layout.addLayout(sched_labels, 6, 0, 1, 2)
+
+        self.sched_plot = pg.PlotWidget()
+        self.sched_plot.setBackground('#1C1C1C')
+        self.sched_plot.getPlotItem().showGrid(x=True, y=True, alpha=0.7)
+        for axis in ['bottom', 'left', 'top', 'right']:
+            self.sched_plot.getPlotItem().showAxis(axis, True)
+            self.sched_plot.getPlotItem().getAxis(axis).setTicks([])
+        self.sched_plot.setMouseEnabled(x=False, y=False)
+        self.sched_plot.setMenuEnabled(False)
+        self.sched_plot.getPlotItem().hideButtons()
+        self.ctx_curve = self.sched_plot.plot(pen=pg.mkPen('#00FF7F', width=2))
+        # Forks are orders of magnitude rarer than switches; own axis scale
+        self.forks_view = pg.ViewBox()
+        self.sched_plot.scene().addItem(self.forks_view)
+        self.sched_plot.getPlotItem().getAxis('right').linkToView(self.forks_view)
+        self.forks_view.setXLink(self.sched_plot.getPlotItem())
+        self.sched_plot.getPlotItem().vb.sigResized.connect(
+            lambda: self.forks_view.setGeometry(self.sched_plot.getPlotItem().vb.sceneBoundingRect()))
+        self.forks_curve = pg.PlotCurveItem(pen=pg.mkPen('#FFA500', width=1))
+        self.forks_view.addItem(self.forks_curve)
+        self.sched_plot.setMinimumHeight(120)
+        layout.addWidget(self.sched_plot, 7, 0, 1, 2)
+
+        x_label_layout = QHBoxLayout()
+        self.sched_left_x_label = QLabel("60 seconds")
+        self.sched_left_x_label.setStyleSheet("color: #E0E0E0; font-size: 8pt;")
+        self.sched_right_x_label = QLabel("0")
+        self.sched_right_x_label.setStyleSheet("color: #E0E0E0; font-size: 8pt;")
+        x_label_layout.addWidget(self.sched_left_x_label, alignment=Qt.AlignLeft)
+        x_label_layout.addWidget(self.sched_right_x_label, alignment=Qt.AlignRight)
+        layout.addLayout(x_label_layout, 8, 0, 1, 2)
+        self.window_labels.append(self.sched_left_x_label)
+
+        self.details_label = DetailsPanel(['utilization', 'cores', 'processes', 'threads', 'uptime', 'percentiles',
+                                            'scheduler', 'interrupts', 'per_cpu', 'trees', 'apps', 'users'])
+        layout.addWidget(self.details_label, 9, 0, 1, 2)
 
         layout.setRowStretch(0, 0)  
         layout.setRowStretch(1, 0)  
         layout.setRowStretch(2, 8)   
         layout.setRowStretch(3, 0)   
         layout.setRowStretch(4, 0)
+        layout.setRowStretch(5, 3)
+        layout.setRowStretch(6, 0)
+        layout.setRowStretch(7, 3)
+
+        self.plots = [self.cpu_plot, self.irq_plot, self.sched_plot]
+        self.set_window(DEFAULT_WINDOW)
+
+    def set_window(self, window):
+        self.window = window
+        for label in self.window_labels:
+            label.setText(WINDOW_LABELS[window])
+        for plot in self.plots:
+            plot.setXRange(-window_seconds(window), 0, padding=0)
+        self.redraw()
+
+    def redraw(self):
+        self.cpu_curve.setData(*self.cpu_history.points(self.window))
+        self.irq_curve.setData(*self.irq_history.points(self.window))
+        self.softirq_curve.setData(*self.softirq_history.points(self.window))
+        self.ctx_curve.setData(*self.ctx_history.points(self.window))
+        self.forks_curve.setData(*self.forks_history.points(self.window))
+
+    def update_ui(self):
+        samples = self.worker.samples.drain()
+        if not samples:
+            return
+        for sample in samples:
+            self.cpu_history.add(sample.utilization, sample.ts)
+            if sample.interrupts is not None:
+                self.irq_history.add(sample.interrupts, sample.ts)
+                self.softirq_history.add(sample.softirqs, sample.ts)
+            if sample.ctx_switches is not None:
+                self.ctx_history.add(sample.ctx_switches, sample.ts)
+            if sample.forks is not None:
+                self.forks_history.add(sample.forks, sample.ts)
+        if self.render.due():
+            self.redraw()
+
+        sample = samples[-1]
+        if self.right_label.text() != sample.name:
+            self.right_label.setText(sample.name)
+        details = self.details_label
+        details.set_value('utilization', sample.utilization, "<b>Utilization:</b> {}")
+        details.set_value('cores', (sample.physical_cores, sample.logical_cores), "<b>Cores:</b> Physical: {0[0]}, Logical: {0[1]}")
+        details.set_value('processes', sample.processes, "<b>Processes:</b> {}")
+        details.set_value('threads', sample.threads, "<b>Threads:</b> {}")
+        details.set_value('uptime', sample.uptime, format_uptime)
+        details.set_line('percentiles', percentile_text('cpu.utilization', 'Utilization', '%'))
+        self.update_activity(sample)
+        for key, label in (('trees', "Top process trees"), ('apps', "Top applications"), ('users', "Top users")):
+            rows = format_groups(getattr(sample, key))
+            details.set_line(key, f"<b>{label}:</b> {rows}" if rows else "")
+
+    def update_activity(self, sample):
+        details = self.details_label
+        if sample.interrupts is not None:
+            irq_text = f"{format_rate(sample.interrupts)} / {format_rate(sample.softirqs)}"
+            if self.irq_right_label.text() != irq_text:
+                self.irq_right_label.setText(irq_text)
+        if sample.ctx_switches is not None:
+            forks = format_rate(sample.forks) if sample.forks is not None else "-"
+            sched_text = f"{format_rate(sample.ctx_switches)} / {forks}"
+            if self.sched_right_label.text() != sched_text:
+                self.sched_right_label.setText(sched_text)
+
+        scheduler = []
+        if sample.ctx_switches is not None:
+            scheduler.append(f"<b>Context switches:</b> {format_rate(sample.ctx_switches)}/s")
+        if sample.forks is not None:
+            scheduler.append(f"<b>Forks:</b> {format_rate(sample.forks)}/s")
+        if sample.run_queue is not None:
+            scheduler.append(f"<b>Run queue:</b> {sample.run_queue:.0f} runnable, {sample.blocked:.0f} blocked on I/O")
+        if sample.load_avg is not None:
+            scheduler.append("<b>Load:</b> " + " / ".join(f"{value:.2f}" for value in sample.load_avg))
+        details.set_line('scheduler', " &nbsp; ".join(scheduler))
 
-    def update_ui(self, usage, cpu_info):
-        self.cpu_usage_data = self.cpu_usage_data[1:] + [usage]
-        x_values = list(range(len(self.cpu_usage_data)))
-        self.cpu_curve.setData(self.cpu_usage_data)
-        details = (
-            f"<b>Utilization:</b> {cpu_info['utilization']}<br>"
-            f"<b>Cores:</b> Physical: {cpu_info['physical_cores']}, Logical: {cpu_info['logical_cores']}<br>"
-            f"<b>Processes:</b> {cpu_info['processes']}<br>"
-            f"<b>Threads:</b> {cpu_info['threads']}<br>"
-            f"<b>Uptime:</b> {cpu_info['uptime']}<br>"
-        )
+        if sample.interrupts is not None:
+            text = (f"<b>Interrupts:</b> {format_rate(sample.interrupts)}/s"
+                    f" &nbsp; <b>Softirqs:</b> {format_rate(sample.softirqs)}/s")
+            if sample.top_interrupts:
+                text += " &nbsp; <b>Top IRQs:</b> " + ", ".join(f"{label} {format_rate(rate)}/s" for label, rate in sample.top_interrupts)
+            if sample.top_softirqs:
+                text += " &nbsp; <b>Top softirqs:</b> " + ", ".join(f"{label} {format_rate(rate)}/s" for label, rate in sample.top_softirqs)
+            details.set_line('interrupts', text)
 
-        self.details_label.setText(details)
+        if sample.cpu_interrupts is not None and sample.cpu_softirqs is not None \
+                and len(sample.cpu_interrupts) == len(sample.cpu_softirqs):
+            # The CPUs taking the most interrupt work; one CPU far above
+            # the rest points at a device whose IRQs are not spread out
+            load = sorted(((irq + soft, cpu, irq, soft) for cpu, (irq, soft)
+                           in enumerate(zip(sample.cpu_interrupts, sample.cpu_softirqs))), reverse=True)
+            busiest = ", ".join(f"CPU{cpu} {format_rate(irq)} + {format_rate(soft)}"
+                                for total, cpu, irq, soft in load[:4] if total > 0)
+            details.set_line('per_cpu', f"<b>Busiest CPUs (IRQ + softirq/s):</b> {busiest}" if busiest else "")
 
     def closeEvent(self, event):
-        self.worker.stop()
+        # The timer belongs to the worker thread and must be stopped there
+        QMetaObject.invokeMethod(self.worker, "stop", Qt.BlockingQueuedConnection)
         self.worker_thread.quit()
         self.worker_thread.wait()
         self.worker.deleteLater()
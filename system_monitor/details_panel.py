@@ -0,0 +1,49 @@
+from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout
+
+# Details area made of one QLabel per line. set_value() re-formats a line only
+# when its raw value changed, and setText() is only called when the rendered
+# text differs, so a tick where nothing visible changed costs no Qt layout.
+
+
+class DetailsPanel(QWidget):
+    def __init__(self, keys, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+        self.labels = {}
+        self.values = {}
+        self.texts = {}
+        for key in keys:
+            label = QLabel()
+            label.setStyleSheet("color: #E0E0E0; font-size: 10pt;")
+            label.setWordWrap(True)
+            label.hide()
+            layout.addWidget(label)
+            self.labels[key] = label
+
+    def set_value(self, key, value, render):
+        # render is a format string ("<b>Used:</b> {:.2f} GB") or a function
+        # returning HTML; either is only applied when the value changed
+        if key in self.values and self.values[key] == value:
+            return
+        self.values[key] = value
+        if value is None:
+            text = ""
+        elif isinstance(render, str):
+            text = render.format(value)
+        else:
+            text = render(value)
+        self.set_line(key, text)
+
+    def set_line(self, key, text):
+        if self.texts.get(key) == text:
+            return
+        self.texts[key] = text
+        label = self.labels[key]
+        label.setText(text)
+        label.setVisible(bool(text))
+
+    def text(self):
+        # All visible lines, as the single details label used to show them
+        return "<br>".join(self.texts[key] for key in self.labels if self.texts.get(key))
@@ -1,32 +1,49 @@
-import psutil
 import time
-import wmi
-from PyQt5.QtWidgets import QWidget, QLabel, QGridLayout, QHBoxLayout, QSizePolicy
+import psutil
+from PyQt5.QtWidgets import QWidget, QLabel, QGridLayout, QHBoxLayout, QSizePolicy, QComboBox, QPushButton
 from PyQt5.QtCore import QThread, pyqtSignal, Qt
 import pyqtgraph as pg
+import os
+
+from monitor_core.procfs import get_reader
+from monitor_core.metrics import publish, percentile_text
+from monitor_core.decimate import PlotHistory, DEFAULT_WINDOW, WINDOW_LABELS, window_seconds
+from monitor_core.archive import get_archive
+from monitor_core.supervisor import call_isolated
+from monitor_core.sampling import disk_io_counters
+from monitor_core.samples import DiskSample, SampleRing
+from monitor_core.budget import sampling_scale, Pacer, RenderThrottle
+from monitor_core.dirsize import DirectoryScanner, format_size
+from system_monitor.details_panel import DetailsPanel
+
+
+def format_speed(label, speed):
+    # speed in MB/s
+    return f"<b>{label}:</b> {speed * 1024:.0f} KB/s" if speed < 1 else f"<b>{label}:</b> {speed:.2f} MB/s"
 
 
 class DiskMonitorThread(QThread):
-    update_signal = pyqtSignal(float, float, float, float)  # active, read, write, transfer in MB/s
+    samples_ready = pyqtSignal()
+    disk_identified = pyqtSignal(str, float)  # model, capacity in GB
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.running = True
-        self.prev_disk = psutil.disk_io_counters()
+        self.reader = get_reader()
+        self.prev_disk = disk_io_counters(self.reader)
         self.prev_time = time.time()
+        self.samples = SampleRing(DiskSample)
 
     def run(self):
+        # WMI can hang; query it in a child process with a deadline
+        model, size = call_isolated("monitor_core.collectors:disk_identity", deadline=5, default=("Unknown Disk", 0))
+        self.disk_identified.emit(model, size / (1024 * 1024 * 1024))
         while self.running:
-            curr_disk = psutil.disk_io_counters()
-            interval = time.time() - self.prev_time
-
-            read_speed = (curr_disk.read_bytes - self.prev_disk.read_bytes) / interval / (1024 * 1024) if interval > 0 else 0
-            write_speed = (curr_disk.write_bytes - self.prev_disk.write_bytes) / interval / (1024 * 1024) if interval > 0 else 0
-            transfer_rate = read_speed + write_speed
+            curr_disk = disk_io_counters(self.reader)
 
             MAX_DISK_MBPS = 5000
-            read_delta = curr_disk.read_bytes - self.prev_disk.read_bytes
-            write_delta = curr_disk.write_bytes - self.prev_disk.write_bytes
+            read_delta = curr_disk[0] - self.prev_disk[0]
+            write_delta = curr_disk[1] - self.prev_disk[1]
             interval = time.time() - self.prev_time
             if interval == 0:
                 interval = 1
@@ -42,8 +59,20 @@ class DiskMonitorThread(QThread):
             self.prev_disk = curr_disk
             self.prev_time = time.time()
 
-            self.update_signal.emit(active_time, read_speed, write_speed, transfer_rate)
-            self.msleep(1000)
+            publish("disk", {"active_time": active_time, "read": read_speed, "write": write_speed}, self.prev_time)
+
+            sample = self.samples.acquire()
+            sample.ts = self.prev_time
+            sample.active_time = active_time
+            sample.read = read_speed
+            sample.write = write_speed
+            sample.transfer = transfer_rate
+            if self.samples.commit():
+                self.samples_ready.emit()
+            for _ in range(sampling_scale()):
+                if not self.running:
+                    break
+                self.msleep(1000)
 
 
     def stop(self):
@@ -53,14 +82,62 @@ class DiskMonitorThread(QThread):
         self.deleteLater()
 
 
+class ProcessIOThread(QThread):
+    top_updated = pyqtSignal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.running = True
+
+    def run(self):
+        # Imported here so hosts without /proc never load numpy for this
+        from monitor_core.process_io import ProcessIOTracker
+        tracker = ProcessIOTracker(budget=0.02, top_k=5)
+        pacer = Pacer(1.0)
+        while self.running:
+            if pacer.due():
+                try:
+                    self.top_updated.emit(tracker.sample())
+                except (OSError, ValueError, IndexError) as e:
+                    print(f"[ERROR] Failed to sample per-process I/O: {e}")
+            self.msleep(1000)
+
+    def stop(self):
+        self.running = False
+        self.wait()
+
+
+class DirectoryScanThread(QThread):
+    progress_updated = pyqtSignal(dict)
+    scan_finished = pyqtSignal(dict)
+
+    def __init__(self, scanner, parent=None):
+        super().__init__(parent)
+        self.scanner = scanner
+
+    def run(self):
+        try:
+            result = self.scanner.scan(self.progress_updated.emit)
+        except OSError as e:
+            result = {'root': self.scanner.root, 'error': str(e)}
+        self.scan_finished.emit(result)
+
+    def stop(self):
+        self.scanner.cancel()
+        self.wait()
+
+
 class DiskMonitorWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.disk = wmi.WMI().Win32_DiskDrive()[0]
+        self.capacity = None
+        self.transfer_in_kb = None
 
-        self.active_data = [0] * 60
-        self.transfer_data = [0] * 60
-        self.x_start = 0
+        self.window = DEFAULT_WINDOW
+        self.render = RenderThrottle()
+        self.active_history = PlotHistory('disk.active_time')
+        self.active_history.seed_from_archive(get_archive())
+        self.transfer_history = PlotHistory()
 
         layout = QGridLayout(self)
 
@@ -68,7 +145,7 @@ class DiskMonitorWidget(QWidget):
         top_label = QHBoxLayout()
         self.left_label = QLabel("Disk")
         self.left_label.setStyleSheet("color: white; font-size: 20pt;")
-        self.right_label = QLabel(self.disk.Model)
+        self.right_label = QLabel("Detecting...")
         self.right_label.setStyleSheet("color: white; font-size: 12pt;")
         top_label.addWidget(self.left_label, alignment=Qt.AlignLeft)
         top_label.addWidget(self.right_label, alignment=Qt.AlignRight)
@@ -106,6 +183,7 @@ class DiskMonitorWidget(QWidget):
         x_label_layout.addWidget(self.left_label, alignment=Qt.AlignLeft)
         x_label_layout.addWidget(self.right_label, alignment=Qt.AlignRight)
         layout.addLayout(x_label_layout, 3, 0, 1, 2)
+        self.window_labels = [self.left_label]
 
         x_label_layout = QHBoxLayout()
         self.transfer_label = QLabel("Disk transfer rate")
@@ -140,13 +218,44 @@ class DiskMonitorWidget(QWidget):
         x_label_layout.addWidget(self.left_label, alignment=Qt.AlignLeft)
         x_label_layout.addWidget(self.right_label, alignment=Qt.AlignRight)
         layout.addLayout(x_label_layout, 6, 0, 1, 2)
+        self.window_labels.append(self.left_label)
 
         # === Disk Info Label ===
-        self.details_label = QLabel()
-        self.details_label.setStyleSheet("color: #E0E0E0; font-size: 10pt;")
-        self.details_label.setWordWrap(True)
+        self.details_label = DetailsPanel(['active_time', 'read', 'write', 'capacity',
+                                           'active_percentiles', 'read_percentiles', 'write_percentiles'])
         layout.addWidget(self.details_label, 7, 0, 1, 2)
 
+        # === Per-process I/O (Linux) ===
+        self.top_io_label = QLabel()
+        self.top_io_label.setStyleSheet("color: #E0E0E0; font-size: 9pt;")
+        self.top_io_label.setWordWrap(True)
+        layout.addWidget(self.top_io_label, 8, 0, 1, 2)
+
+        # === Space usage per mount ===
+        space_layout = QHBoxLayout()
+        space_title = QLabel("Space usage")
+        space_title.setStyleSheet("color: white; font-size: 8pt;")
+        self.mount_selector = QComboBox()
+        for partition in psutil.disk_partitions(all=False):
+            self.mount_selector.addItem(partition.mountpoint)
+        self.scan_button = QPushButton("Scan")
+        self.scan_button.clicked.connect(self.toggle_scan)
+        self.scan_status = QLabel()
+        self.scan_status.setStyleSheet("color: #E0E0E0; font-size: 8pt;")
+        space_layout.addWidget(space_title, alignment=Qt.AlignLeft)
+        space_layout.addWidget(self.mount_selector)
+        space_layout.addWidget(self.scan_button)
+        space_layout.addWidget(self.scan_status, 1, alignment=Qt.AlignRight)
+        layout.addLayout(space_layout, 9, 0, 1, 2)
+
+        self.space_label = QLabel()
+        self.space_label.setStyleSheet("color: #E0E0E0; font-size: 9pt;")
+        self.space_label.setWordWrap(True)
+        self.space_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        layout.addWidget(self.space_label, 10, 0, 1, 2)
+        self.scanners = {}  # mount -> DirectoryScanner, kept so rescans are incremental
+        self.scan_thread = None
+
         layout.setRowStretch(0, 0)
         layout.setRowStretch(1, 0)
         layout.setRowStretch(2, 8)
@@ -154,43 +263,135 @@ class DiskMonitorWidget(QWidget):
         layout.setRowStretch(4, 0)
         layout.setRowStretch(5, 4)
 
+        self.plots = [self.active_plot, self.transfer_plot]
+        self.set_window(DEFAULT_WINDOW)
+
         self.monitor_thread = DiskMonitorThread()
-        self.monitor_thread.update_signal.connect(self.update_stats)
+        self.monitor_thread.samples_ready.connect(self.update_stats)
+        self.monitor_thread.disk_identified.connect(self.set_disk_identity)
         self.monitor_thread.start()
 
-    def update_stats(self, active_time, read_speed, write_speed, transfer_rate):
-        # Dynamically adjust unit
-        if transfer_rate < 1.0:
-            rate_display = f"{transfer_rate * 1024:.0f} KB/s"
-            graph_rate_value = transfer_rate * 1024  # Show in KB/s
-            self.transfer_plot.setYRange(0, 1024)
+        self.process_io_thread = None
+        if os.path.exists("/proc/self/io"):
+            self.process_io_thread = ProcessIOThread()
+            self.process_io_thread.top_updated.connect(self.update_top_io)
+            self.process_io_thread.start()
         else:
-            rate_display = f"{transfer_rate:.2f} MB/s"
-            graph_rate_value = transfer_rate  # Show in MB/s
-            self.transfer_plot.setYRange(0, 10)
-
-        # Update data
-        self.active_data = self.active_data[1:] + [active_time]
-        self.transfer_data = self.transfer_data[1:] + [graph_rate_value]
-        x_values = list(range(len(self.active_data)))
-
-        self.active_curve.setData(x=x_values, y=self.active_data)
-        self.transfer_curve.setData(x=x_values, y=self.transfer_data)
-
-        # Update label
-        self.transfer_rate_label.setText(rate_display)
-
-        read_display = f"{read_speed * 1024:.0f} KB/s" if read_speed < 1 else f"{read_speed:.2f} MB/s"
-        write_display = f"{write_speed * 1024:.0f} KB/s" if write_speed < 1 else f"{write_speed:.2f} MB/s"
-
-        details = (
-            f"<b>Active Time:</b> {active_time:.2f}%<br>"
-            f"<b>Read Speed:</b> {read_display}<br>"
-            f"<b>Write Speed:</b> {write_display}<br>"
-            f"<b>Capacity:</b> {int(self.disk.Size) / (1024 * 1024 * 1024):.2f} GB"
-        )
-        self.details_label.setText(details)
+            self.top_io_label.hide()
+
+    def set_window(self, window):
+        self.window = window
+        for label in self.window_labels:
+            label.setText(WINDOW_LABELS[window])
+        for plot in self.plots:
+            plot.setXRange(-window_seconds(window), 0, padding=0)
+        self.redraw()
+
+    def redraw(self):
+        self.active_curve.setData(*self.active_history.points(self.window))
+        self.transfer_curve.setData(*self.transfer_history.points(self.window))
+
+    def update_stats(self):
+        samples = self.monitor_thread.samples.drain()
+        if not samples:
+            return
+        for sample in samples:
+            # Dynamically adjust unit
+            if sample.transfer < 1.0:
+                graph_rate_value = sample.transfer * 1024  # Show in KB/s
+            else:
+                graph_rate_value = sample.transfer  # Show in MB/s
+            self.active_history.add(sample.active_time, sample.ts)
+            self.transfer_history.add(graph_rate_value, sample.ts)
+        if self.render.due():
+            self.redraw()
+
+        sample = samples[-1]
+        kilobytes = sample.transfer < 1.0
+        if kilobytes != self.transfer_in_kb:
+            self.transfer_in_kb = kilobytes
+            self.transfer_plot.setYRange(0, 1024 if kilobytes else 10)
+        rate_display = f"{sample.transfer * 1024:.0f} KB/s" if kilobytes else f"{sample.transfer:.2f} MB/s"
+        if self.transfer_rate_label.text() != rate_display:
+            self.transfer_rate_label.setText(rate_display)
+
+        details = self.details_label
+        details.set_value('active_time', round(sample.active_time, 2), "<b>Active Time:</b> {:.2f}%")
+        details.set_value('read', sample.read, lambda v: format_speed("Read Speed", v))
+        details.set_value('write', sample.write, lambda v: format_speed("Write Speed", v))
+        details.set_value('capacity', self.capacity,
+                          lambda v: f"<b>Capacity:</b> {f'{v:.2f} GB' if v else 'Unknown'}")
+        details.set_line('active_percentiles', percentile_text('disk.active_time', 'Active Time', '%'))
+        details.set_line('read_percentiles', percentile_text('disk.read', 'Read', ' MB/s', '{:.2f}'))
+        details.set_line('write_percentiles', percentile_text('disk.write', 'Write', ' MB/s', '{:.2f}'))
+
+    def set_disk_identity(self, model, capacity):
+        self.right_label.setText(model)
+        self.capacity = capacity
+
+    def update_top_io(self, result):
+        def format_rate(bytes_per_sec):
+            if bytes_per_sec < 1024 * 1024:
+                return f"{bytes_per_sec / 1024:.0f} KB/s"
+            return f"{bytes_per_sec / (1024 * 1024):.2f} MB/s"
+
+        rows = [f"<b>Top readers</b> ({result['sampled']}/{result['processes']} processes sampled)"]
+        for proc in result['readers']:
+            rows.append(f"{proc['name']} (PID {proc['pid']}): {format_rate(proc['read'])}, {proc['syscr']:.0f} reads/s")
+        rows.append("<b>Top writers</b>")
+        for proc in result['writers']:
+            rows.append(f"{proc['name']} (PID {proc['pid']}): {format_rate(proc['write'])}, {proc['syscw']:.0f} writes/s")
+        self.top_io_label.setText("<br>".join(rows))
+
+    def toggle_scan(self):
+        if self.scan_thread is not None:
+            self.scan_thread.scanner.cancel()
+            self.scan_status.setText("Cancelling...")
+            return
+        mount = self.mount_selector.currentText()
+        if not mount:
+            return
+        scanner = self.scanners.get(mount)
+        if scanner is None:
+            scanner = self.scanners[mount] = DirectoryScanner(mount)
+        self.scan_thread = DirectoryScanThread(scanner)
+        self.scan_thread.progress_updated.connect(self.show_scan_progress)
+        self.scan_thread.scan_finished.connect(self.show_space_usage)
+        self.scan_thread.start()
+        self.scan_button.setText("Cancel")
+        self.mount_selector.setEnabled(False)
+        self.scan_status.setText("Scanning...")
+
+    def show_scan_progress(self, progress):
+        self.scan_status.setText(f"{progress['dirs']} folders ({progress['reused']} unchanged), "
+                                 f"{progress['files']} files, {format_size(progress['bytes'])}, "
+                                 f"{progress['elapsed']:.0f} s")
+
+    def show_space_usage(self, result):
+        self.scan_thread.wait()
+        self.scan_thread = None
+        self.scan_button.setText("Rescan")
+        self.mount_selector.setEnabled(True)
+        if 'error' in result:
+            self.scan_status.setText(f"Cannot scan {result['root']}: {result['error']}")
+            return
+        state = "" if result['complete'] else " (cancelled, partial)"
+        errors = f", {result['errors']} unreadable" if result['errors'] else ""
+        self.scan_status.setText(f"{format_size(result['total'])} in {result['total_files']} files, "
+                                 f"{result['dirs']} folders ({result['reused']} unchanged){errors}, "
+                                 f"{result['elapsed']:.1f} s{state}")
+        rows = ["<b>Largest folders</b>"]
+        for size, count, path in result['top_dirs']:
+            rows.append(f"{format_size(size)} &nbsp;{path} ({count} files)")
+        rows.append("<b>Largest files</b>")
+        for size, path in result['top_files']:
+            rows.append(f"{format_size(size)} &nbsp;{path}")
+        self.space_label.setText("<br>".join(rows))
 
     def closeEvent(self, event):
+        if self.scan_thread is not None:
+            self.scan_thread.stop()
+        if self.process_io_thread:
+            self.process_io_thread.stop()
         self.monitor_thread.stop()
         event.accept()
\ No newline at end of file
@@ -1,35 +1,209 @@
-import psutil
 from PyQt5.QtWidgets import QWidget, QLabel, QGridLayout, QHBoxLayout, QSizePolicy
 from PyQt5.QtCore import QThread, pyqtSignal, Qt
 import pyqtgraph as pg
 import time
 
+from monitor_core.procfs import get_reader, MEMINFO_FIELDS, VMSTAT_FIELDS
+from monitor_core.metrics import publish, percentile_text
+from monitor_core.decimate import PlotHistory, DEFAULT_WINDOW, WINDOW_LABELS, window_seconds
+from monitor_core.archive import get_archive
+from monitor_core.sampling import virtual_memory
+from monitor_core.samples import MemorySample, SampleRing
+from monitor_core.journal import record_alert
+from monitor_core.budget import sampling_scale, Pacer, RenderThrottle
+from monitor_core.process_memory import ProcessMemory, format_process_memory
+from system_monitor.details_panel import DetailsPanel
+
+PSI_RESOURCES = ('memory', 'cpu', 'io')
+PAGING_FIELDS = ('pswpin', 'pswpout', 'pgmajfault')
+BREAKDOWN_FIELDS = ('Cached', 'Buffers', 'Dirty', 'Writeback', 'Slab', 'SReclaimable', 'SUnreclaim', 'Shmem', 'SwapTotal', 'SwapFree')
+
+# PSI alert thresholds (percent of wall time stalled). "full" means every
+# non-idle task was stalled on memory, which is what precedes OOM kills.
+PSI_MEMORY_SOME_ALERT = 20.0
+PSI_MEMORY_FULL_ALERT = 5.0
+PSI_ALERT_CLEAR = 0.5  # alert re-arms once pressure drops below this fraction of the threshold
+
+
+def read_pressure(reader, resource):
+    psi = reader.pressure.get(resource) if reader else None
+    if psi is None:
+        return None
+    values = psi.update()
+    return {
+        'some': {'avg10': values[0], 'avg60': values[1], 'total': values[2]},
+        'full': {'avg10': values[3], 'avg60': values[4], 'total': values[5]},
+    }
+
+
+def read_vmstat(reader):
+    if reader is None:
+        return None
+    values = reader.vmstat.update()
+    return {name: values[VMSTAT_FIELDS.index(name)] for name in PAGING_FIELDS}
+
+
+def read_meminfo(reader):
+    if reader is None:
+        return None
+    values = reader.meminfo.update()
+    return {name: values[MEMINFO_FIELDS.index(name)] / (1024 ** 2) for name in BREAKDOWN_FIELDS}  # kB -> GB
+
+
 class MemoryWorker(QThread):
-    data_updated = pyqtSignal(float, dict)
+    samples_ready = pyqtSignal()
+    pressure_alert = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
-        self.total_mem = psutil.virtual_memory().total / (1024 ** 3)
+        self.reader = get_reader()
+        self.total_mem = virtual_memory(self.reader)[0] / (1024 ** 3)
+        self.has_psi = bool(self.reader and self.reader.pressure)
+        self.prev_pressure = {r: read_pressure(self.reader, r) for r in PSI_RESOURCES}
+        self.prev_vmstat = read_vmstat(self.reader)
+        self.prev_time = time.time()
+        self.alert_active = False
+        self.running = True
+        self.samples = SampleRing(MemorySample)
+        # PSS/USS/swap per process; rollup reads are capped per tick by its
+        # own time budget and the whole scan slows down when over budget
+        self.process_memory = ProcessMemory()
+        self.process_pacer = Pacer(1.0)
+        self.process_summary = None
+
+    def stall_rates(self, interval):
+        # Stall percentage over the last tick, from the cumulative "total" (us)
+        # counters. Reacts within one sample instead of waiting for avg10.
+        stalls = {}
+        for resource in PSI_RESOURCES:
+            curr = read_pressure(self.reader, resource)
+            prev = self.prev_pressure.get(resource)
+            if curr is None or prev is None:
+                continue
+            stalls[resource] = {}
+            for kind in curr:
+                delta_us = curr[kind]['total'] - prev[kind]['total']
+                stalls[resource][kind] = {
+                    'now': min(delta_us / (interval * 1e6) * 100, 100),
+                    'avg10': curr[kind]['avg10'],
+                    'avg60': curr[kind]['avg60'],
+                }
+            self.prev_pressure[resource] = curr
+        return stalls
+
+    def paging_rates(self, interval):
+        curr = read_vmstat(self.reader)
+        if curr is None or self.prev_vmstat is None:
+            return None
+        rates = {name: (curr[name] - self.prev_vmstat[name]) / interval for name in curr}
+        self.prev_vmstat = curr
+        return rates
+
+    def check_pressure(self, stalls):
+        memory = stalls.get('memory')
+        if not memory:
+            return
+        some = max(memory['some']['now'], memory['some']['avg10'])
+        full = max(memory['full']['now'], memory['full']['avg10'])
+        if not self.alert_active and (some >= PSI_MEMORY_SOME_ALERT or full >= PSI_MEMORY_FULL_ALERT):
+            self.alert_active = True
+            message = f"Memory pressure: tasks stalled {some:.1f}% (some) / {full:.1f}% (full) of the time"
+            record_alert('pressure', message, metric='memory.psi_full' if full >= PSI_MEMORY_FULL_ALERT else 'memory.psi_some')
+            self.pressure_alert.emit(message)
+        elif self.alert_active and some < PSI_MEMORY_SOME_ALERT * PSI_ALERT_CLEAR and full < PSI_MEMORY_FULL_ALERT * PSI_ALERT_CLEAR:
+            self.alert_active = False
+            self.pressure_alert.emit("")
+
+    def publish(self, sample):
+        publish('memory', {
+            'percent': sample.percent, 'used': sample.used, 'available': sample.available,
+            'psi_some': sample.psi_some, 'psi_full': sample.psi_full, 'psi_io_full': sample.psi_io_full,
+            'swap_in': sample.swap_in, 'swap_out': sample.swap_out, 'major_faults': sample.major_faults,
+        }, sample.ts)
+
+    def fill(self, sample, stalls, paging, meminfo):
+        # Flatten this tick's readings into the preallocated record; fields
+        # whose source is unavailable (no PSI, no /proc) are left as None
+        memory = stalls.get('memory')
+        sample.psi_some = memory['some']['now'] if memory else None
+        sample.psi_full = memory['full']['now'] if memory else None
+        sample.psi_some_avg10 = memory['some']['avg10'] if memory else None
+        sample.psi_full_avg10 = memory['full']['avg10'] if memory else None
+        sample.psi_cpu_avg10 = stalls['cpu']['some']['avg10'] if stalls.get('cpu') else None
+        sample.psi_io_avg10 = stalls['io']['some']['avg10'] if stalls.get('io') else None
+        sample.psi_io_full = stalls['io']['full']['now'] if stalls.get('io') else None
+
+        sample.swap_in = paging['pswpin'] if paging else None
+        sample.swap_out = paging['pswpout'] if paging else None
+        sample.major_faults = paging['pgmajfault'] if paging else None
+
+        if meminfo:
+            sample.cached = meminfo['Cached'] + meminfo['Buffers']
+            sample.dirty = meminfo['Dirty']
+            sample.writeback = meminfo['Writeback']
+            sample.slab = meminfo['Slab']
+            sample.slab_reclaimable = meminfo['SReclaimable']
+            sample.shared = meminfo['Shmem']
+            sample.swap_total = meminfo['SwapTotal']
+            sample.swap_free = meminfo['SwapFree']
+        else:
+            sample.cached = sample.dirty = sample.writeback = sample.slab = None
+            sample.slab_reclaimable = sample.shared = sample.swap_total = sample.swap_free = None
+
     def run(self):
-        while True:
-            mem = psutil.virtual_memory()
-            details = {
-                'total': self.total_mem,
-                'available': mem.available / (1024 ** 3),
-                'used': mem.used / (1024 ** 3),
-                'free': mem.free / (1024 ** 3),
-                'percent': mem.percent,
-            }
-            self.data_updated.emit(mem.percent, details)
-            time.sleep(1)
+        while self.running:
+            total, available, used, free, percent = virtual_memory(self.reader)
+            now = time.time()
+            interval = now - self.prev_time
+            if interval <= 0:
+                interval = 1
+            self.prev_time = now
+
+            stalls = self.stall_rates(interval) if self.has_psi else {}
+            self.check_pressure(stalls)
+
+            sample = self.samples.acquire()
+            sample.ts = now
+            sample.total = self.total_mem
+            sample.available = available / (1024 ** 3)
+            sample.used = used / (1024 ** 3)
+            sample.free = free / (1024 ** 3)
+            sample.percent = percent
+            self.fill(sample, stalls, self.paging_rates(interval), read_meminfo(self.reader))
+            if self.process_pacer.due():
+                self.process_summary = self.process_memory.update()
+            sample.process_memory = self.process_summary
+            self.publish(sample)
+            if self.samples.commit():
+                self.samples_ready.emit()
+            for _ in range(sampling_scale()):
+                if not self.running:
+                    break
+                self.msleep(1000)
+
+    def stop(self):
+        self.running = False
+        self.wait()
 
 class MemoryMonitorWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
 
-        self.mem_usage_data = [0] * 60
+        self.window = DEFAULT_WINDOW
+        self.render = RenderThrottle()
+        self.mem_history = PlotHistory('memory.percent')
+        self.pressure_some_history = PlotHistory('memory.psi_some')
+        self.pressure_full_history = PlotHistory('memory.psi_full')
+        self.pressure_io_history = PlotHistory('memory.psi_io_full')
+        self.swapin_history = PlotHistory('memory.swap_in')
+        self.swapout_history = PlotHistory('memory.swap_out')
+        self.majfault_history = PlotHistory('memory.major_faults')
+        for history in (self.mem_history, self.pressure_some_history, self.pressure_full_history,
+                        self.pressure_io_history, self.swapin_history, self.swapout_history, self.majfault_history):
+            history.seed_from_archive(get_archive())
 
         self.worker_thread = MemoryWorker()
-        self.worker_thread.data_updated.connect(self.update_display)
+        self.worker_thread.samples_ready.connect(self.update_display)
         self.worker_thread.start()
 
         layout = QGridLayout(self)
@@ -82,33 +256,188 @@ class MemoryMonitorWidget(QWidget):
         x_label_layout.addWidget(self.left_x_label, alignment=Qt.AlignLeft)
         x_label_layout.addWidget(self.right_x_label, alignment=Qt.AlignRight)
         layout.addLayout(x_label_layout, 3, 0, 1, 2)
+        self.window_labels = [self.left_x_label]
+
+        # Pressure stall plot (PSI, % of time tasks were stalled)
+        pressure_labels = QHBoxLayout()
+        self.pressure_left_label = QLabel("Pressure stall (memory some / full, io full)")
+        self.pressure_left_label.setStyleSheet("color: white; font-size: 8pt;")
+        self.pressure_right_label = QLabel("100%" if self.worker_thread.has_psi else "PSI unavailable")
+        self.pressure_right_label.setStyleSheet("color: white; font-size: 8pt;")
+        pressure_labels.addWidget(self.pressure_left_label, alignment=Qt.AlignLeft)
+        pressure_labels.addWidget(self.pressure_right_label, alignment=Qt.AlignRight)
+        layout.addLayout(pressure_labels, 4, 0, 1, 2)
+
+        self.pressure_plot = pg.PlotWidget()
+        self.pressure_plot.setBackground('#1C1C1C')
+        self.pressure_plot.getPlotItem().showGrid(x=True, y=True, alpha=0.7)
+        for axis in ['bottom', 'left', 'top', 'right']:
+            self.pressure_plot.getPlotItem().showAxis(axis, True)
+            self.pressure_plot.getPlotItem().getAxis(axis).setTicks([])
+        self.pressure_plot.setYRange(0, 100)
+        self.pressure_plot.setMouseEnabled(x=False, y=False)
+        self.pressure_plot.setMenuEnabled(False)
+        self.pressure_plot.getPlotItem().hideButtons()
+        self.pressure_some_curve = self.pressure_plot.plot(pen=pg.mkPen('#FFD700', width=2), fillLevel=0, brush=(255, 215, 0, 60))
+        self.pressure_full_curve = self.pressure_plot.plot(pen=pg.mkPen('#FF4500', width=2), fillLevel=0, brush=(255, 69, 0, 80))
+        self.pressure_io_curve = self.pressure_plot.plot(pen=pg.mkPen('#1E90FF', width=1))
+        self.pressure_plot.setMinimumHeight(120)
+        layout.addWidget(self.pressure_plot, 5, 0, 1, 2)
+
+        # Paging activity plot (pages/s)
+        paging_labels = QHBoxLayout()
+        self.paging_left_label = QLabel("Paging (swap in / swap out / major faults per sec)")
+        self.paging_left_label.setStyleSheet("color: white; font-size: 8pt;")
+        self.paging_right_label = QLabel()
+        self.paging_right_label.setStyleSheet("color: white; font-size: 8pt;")
+        paging_labels.addWidget(self.paging_left_label, alignment=Qt.AlignLeft)
+        paging_labels.addWidget(self.paging_right_label, alignment=Qt.AlignRight)
+        layout.addLayout(paging_labels, 6, 0, 1, 2)
+
+        self.paging_plot = pg.PlotWidget()
+        self.paging_plot.setBackground('#1C1C1C')
+        self.paging_plot.getPlotItem().showGrid(x=True, y=True, alpha=0.7)
+        for axis in ['bottom', 'left', 'top', 'right']:
+            self.paging_plot.getPlotItem().showAxis(axis, True)
+            self.paging_plot.getPlotItem().getAxis(axis).setTicks([])
+        self.paging_plot.setMouseEnabled(x=False, y=False)
+        self.paging_plot.setMenuEnabled(False)
+        self.paging_plot.getPlotItem().hideButtons()
+        self.swapin_curve = self.paging_plot.plot(pen=pg.mkPen('#00FF7F', width=2))
+        self.swapout_curve = self.paging_plot.plot(pen=pg.mkPen('#FF69B4', width=2))
+        self.majfault_curve = self.paging_plot.plot(pen=pg.mkPen('#FFA500', width=1))
+        self.paging_plot.setMinimumHeight(120)
+        layout.addWidget(self.paging_plot, 7, 0, 1, 2)
+
+        x_label_layout = QHBoxLayout()
+        self.paging_left_x_label = QLabel("60 seconds")
+        self.paging_left_x_label.setStyleSheet("color: #E0E0E0; font-size: 8pt;")
+        self.paging_right_x_label = QLabel("0")
+        self.paging_right_x_label.setStyleSheet("color: #E0E0E0; font-size: 8pt;")
+        x_label_layout.addWidget(self.paging_left_x_label, alignment=Qt.AlignLeft)
+        x_label_layout.addWidget(self.paging_right_x_label, alignment=Qt.AlignRight)
+        layout.addLayout(x_label_layout, 8, 0, 1, 2)
+        self.window_labels.append(self.paging_left_x_label)
+
+        # Pressure alert label (hidden until PSI crosses the alert threshold)
+        self.alert_label = QLabel()
+        self.alert_label.setStyleSheet("color: #FF4500; font-size: 10pt; font-weight: bold;")
+        self.alert_label.setWordWrap(True)
+        self.alert_label.hide()
+        layout.addWidget(self.alert_label, 9, 0, 1, 2)
 
         # Details label
-        self.details_label = QLabel()
-        self.details_label.setStyleSheet("color: #E0E0E0; font-size: 10pt;")
-        self.details_label.setWordWrap(True)
-        layout.addWidget(self.details_label, 4, 0, 1, 2)
+        self.details_label = DetailsPanel(['total', 'available', 'used', 'free', 'percent', 'percentiles',
+                                           'cache', 'slab', 'swap', 'pressure', 'process_totals', 'processes'])
+        layout.addWidget(self.details_label, 10, 0, 1, 2)
 
         layout.setRowStretch(0, 0)   
         layout.setRowStretch(1, 0)  
         layout.setRowStretch(2, 8)  
         layout.setRowStretch(3, 0)   
         layout.setRowStretch(4, 0)
+        layout.setRowStretch(5, 3)
+        layout.setRowStretch(6, 0)
+        layout.setRowStretch(7, 3)
+
+        self.worker_thread.pressure_alert.connect(self.show_pressure_alert)
+
+        self.plots = [self.mem_plot, self.pressure_plot, self.paging_plot]
+        self.set_window(DEFAULT_WINDOW)
+
+    def set_window(self, window):
+        self.window = window
+        for label in self.window_labels:
+            label.setText(WINDOW_LABELS[window])
+        for plot in self.plots:
+            plot.setXRange(-window_seconds(window), 0, padding=0)
+        self.redraw()
+
+    def redraw(self):
+        self.mem_curve.setData(*self.mem_history.points(self.window))
+        self.pressure_some_curve.setData(*self.pressure_some_history.points(self.window))
+        self.pressure_full_curve.setData(*self.pressure_full_history.points(self.window))
+        self.pressure_io_curve.setData(*self.pressure_io_history.points(self.window))
+        self.swapin_curve.setData(*self.swapin_history.points(self.window))
+        self.swapout_curve.setData(*self.swapout_history.points(self.window))
+        self.majfault_curve.setData(*self.majfault_history.points(self.window))
+
+    def update_display(self):
+        samples = self.worker_thread.samples.drain()
+        if not samples:
+            return
+        for sample in samples:
+            self.mem_history.add(sample.percent, sample.ts)
+            if sample.psi_some is not None:
+                self.pressure_some_history.add(sample.psi_some, sample.ts)
+                self.pressure_full_history.add(sample.psi_full, sample.ts)
+            if sample.psi_io_full is not None:
+                self.pressure_io_history.add(sample.psi_io_full, sample.ts)
+            if sample.swap_in is not None:
+                self.swapin_history.add(sample.swap_in, sample.ts)
+                self.swapout_history.add(sample.swap_out, sample.ts)
+                self.majfault_history.add(sample.major_faults, sample.ts)
+        if self.render.due():
+            self.redraw()
+
+        sample = samples[-1]
+        if sample.swap_in is not None:
+            paging_text = f"{sample.swap_in:.0f} / {sample.swap_out:.0f} / {sample.major_faults:.0f}"
+            if self.paging_right_label.text() != paging_text:
+                self.paging_right_label.setText(paging_text)
 
-    def update_display(self, percent, details):
-        self.mem_usage_data = self.mem_usage_data[1:] + [percent]
-        self.mem_curve.setData(self.mem_usage_data)
+        details = self.details_label
+        details.set_value('total', round(sample.total, 2), "<b>Total:</b> {:.2f} GB")
+        details.set_value('available', round(sample.available, 2), "<b>Available:</b> {:.2f} GB")
+        details.set_value('used', round(sample.used, 2), "<b>Used:</b> {:.2f} GB")
+        details.set_value('free', round(sample.free, 2), "<b>Free:</b> {:.2f} GB")
+        details.set_value('percent', sample.percent, "<b>Usage Percent:</b> {}%")
+        details.set_line('percentiles', percentile_text('memory.percent', 'Usage', '%'))
+        if sample.cached is not None:
+            details.set_line('cache', (
+                f"<b>Cached:</b> {sample.cached:.2f} GB"
+                f" &nbsp; <b>Dirty:</b> {sample.dirty * 1024:.1f} MB"
+                f" &nbsp; <b>Writeback:</b> {sample.writeback * 1024:.1f} MB"
+            ))
+            details.set_line('slab', (
+                f"<b>Slab:</b> {sample.slab:.2f} GB"
+                f" (reclaimable {sample.slab_reclaimable:.2f} GB)"
+                f" &nbsp; <b>Shared:</b> {sample.shared:.2f} GB"
+            ))
+            details.set_line('swap', (
+                f"<b>Swap used:</b> {sample.swap_total - sample.swap_free:.2f} / {sample.swap_total:.2f} GB"
+            ))
+        if sample.psi_some_avg10 is not None:
+            pressure = (
+                f"<b>Memory pressure (avg10):</b> some {sample.psi_some_avg10:.2f}%,"
+                f" full {sample.psi_full_avg10:.2f}%"
+            )
+            if sample.psi_cpu_avg10 is not None:
+                pressure += f" &nbsp; <b>CPU:</b> {sample.psi_cpu_avg10:.2f}%"
+            if sample.psi_io_avg10 is not None:
+                pressure += f" &nbsp; <b>IO:</b> {sample.psi_io_avg10:.2f}%"
+            details.set_line('pressure', pressure)
+        summary = sample.process_memory
+        if summary is not None:
+            coverage = f"{summary['exact']} of {summary['processes']} processes"
+            if summary['denied']:
+                coverage += f", {summary['denied']} not readable"
+            details.set_line('process_totals', (
+                f"<b>Processes (PSS):</b> {summary['pss'] / 1024 ** 3:.2f} GB"
+                f" (RSS would count {summary['rss'] / 1024 ** 3:.2f} GB)"
+                f" &nbsp; <b>USS:</b> {summary['uss'] / 1024 ** 3:.2f} GB"
+                f" &nbsp; <b>Swapped:</b> {summary['swap'] / 1024 ** 3:.2f} GB"
+                f" &nbsp; ({coverage})"
+            ))
+            details.set_line('processes', f"<b>Top processes:</b> {format_process_memory(summary['top'])}")
 
-        details_str = (
-            f"<b>Total:</b> {details['total']:.2f} GB<br>"
-            f"<b>Available:</b> {details['available']:.2f} GB<br>"
-            f"<b>Used:</b> {details['used']:.2f} GB<br>"
-            f"<b>Free:</b> {details['free']:.2f} GB<br>"
-            f"<b>Usage Percent:</b> {details['percent']}%"
-        )
-        self.details_label.setText(details_str)
+    def show_pressure_alert(self, message):
+        if message:
+            self.alert_label.setText(f"⚠️ {message}")
+            self.alert_label.show()
+        else:
+            self.alert_label.hide()
 
     def closeEvent(self, event):
-        self.worker_thread.terminate()
-        self.worker_thread.wait()
+        self.worker_thread.stop()
         event.accept()
\ No newline at end of file
@@ -0,0 +1,164 @@
+from PyQt5.QtWidgets import QWidget, QLabel, QGridLayout, QHBoxLayout, QSizePolicy
+from PyQt5.QtCore import QThread, pyqtSignal, Qt
+import pyqtgraph as pg
+
+from monitor_core.metrics import publish, percentile_text
+from monitor_core.decimate import PlotHistory, DEFAULT_WINDOW, WINDOW_LABELS, window_seconds
+from monitor_core.archive import get_archive
+from monitor_core.budget import RenderThrottle
+
+PLOT_COLORS = [(0, 206, 209), (255, 140, 0), (0, 255, 127), (186, 85, 211), (255, 99, 71)]
+
+
+class PluginWorker(QThread):
+    data_updated = pyqtSignal(dict, str)  # values, status
+
+    def __init__(self, runner, parent=None):
+        super().__init__(parent)
+        self.runner = runner
+        self.running = True
+
+    def run(self):
+        while self.running:
+            values = self.runner.run()
+            if values is not None:
+                publish(self.runner.source, values)
+            self.data_updated.emit(values or {}, self.runner.status())
+            # Sleep in short steps so stop() is not held up by long periods
+            while self.running and self.runner.wait_time() > 0:
+                self.msleep(int(min(self.runner.wait_time(), 0.2) * 1000) + 1)
+        self.runner.close()
+
+    def stop(self):
+        self.running = False
+        self.wait()
+
+
+class PluginMonitorWidget(QWidget):
+    def __init__(self, runner, parent=None):
+        super().__init__(parent)
+        self.runner = runner
+
+        self.window = DEFAULT_WINDOW
+        self.render = RenderThrottle()
+        self.histories = {}
+        self.curves = {}
+        self.plots = []
+        self.window_labels = []
+
+        layout = QGridLayout(self)
+
+        # Top Title
+        title_layout = QHBoxLayout()
+        self.left_label = QLabel(runner.name)
+        self.left_label.setStyleSheet("color: white; font-size: 20pt;")
+        self.right_label = QLabel(f"Every {runner.period:g}s")
+        self.right_label.setStyleSheet("color: white; font-size: 12pt;")
+        title_layout.addWidget(self.left_label, alignment=Qt.AlignLeft)
+        title_layout.addWidget(self.right_label, alignment=Qt.AlignRight)
+        layout.addLayout(title_layout, 0, 0, 1, 2)
+
+        row = 1
+        for index, metric in enumerate(runner.metrics):
+            color = PLOT_COLORS[index % len(PLOT_COLORS)]
+
+            top_labels_layout = QHBoxLayout()
+            top_left_label = QLabel(metric.label or metric.name)
+            top_left_label.setStyleSheet("color: white; font-size: 8pt;")
+            top_right_label = QLabel(f"{metric.max:g}{metric.unit}" if metric.max is not None else metric.unit)
+            top_right_label.setStyleSheet("color: white; font-size: 8pt;")
+            top_labels_layout.addWidget(top_left_label, alignment=Qt.AlignLeft)
+            top_labels_layout.addWidget(top_right_label, alignment=Qt.AlignRight)
+            layout.addLayout(top_labels_layout, row, 0, 1, 2)
+
+            plot = pg.PlotWidget()
+            plot.setBackground('#1C1C1C')
+            plot.getPlotItem().showGrid(x=True, y=True, alpha=0.7)
+            plot.getPlotItem().showAxis('top', True)
+            plot.getPlotItem().showAxis('right', True)
+            for axis in ['bottom', 'left', 'top', 'right']:
+                plot.getPlotItem().getAxis(axis).setTicks([])
+            if metric.max is not None:
+                plot.setYRange(0, metric.max)
+            plot.setMouseEnabled(x=False, y=False)
+            plot.setMenuEnabled(False)
+            plot.getPlotItem().hideButtons()
+            plot.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+            plot.setMinimumHeight(120)
+            self.curves[metric.name] = plot.plot(pen=pg.mkPen(color, width=2), fillLevel=0, brush=color + (80,))
+            layout.addWidget(plot, row + 1, 0, 1, 2)
+            layout.setRowStretch(row + 1, 5)
+            self.plots.append(plot)
+
+            bottom_label_layout = QHBoxLayout()
+            bottom_left_label = QLabel("60 seconds")
+            bottom_left_label.setStyleSheet("color: #E0E0E0; font-size: 8pt;")
+            bottom_right_label = QLabel("0")
+            bottom_right_label.setStyleSheet("color: #E0E0E0; font-size: 8pt;")
+            bottom_label_layout.addWidget(bottom_left_label, alignment=Qt.AlignLeft)
+            bottom_label_layout.addWidget(bottom_right_label, alignment=Qt.AlignRight)
+            layout.addLayout(bottom_label_layout, row + 2, 0, 1, 2)
+            self.window_labels.append(bottom_left_label)
+
+            history = self.histories[metric.name] = PlotHistory(f"{runner.source}.{metric.name}")
+            history.seed_from_archive(get_archive())
+            row += 3
+
+        # Details label
+        self.details_label = QLabel()
+        self.details_label.setStyleSheet("color: #E0E0E0; font-size: 10pt;")
+        self.details_label.setWordWrap(True)
+        layout.addWidget(self.details_label, row, 0, 1, 2)
+
+        # Budget overruns and sample() errors
+        self.status_label = QLabel()
+        self.status_label.setStyleSheet("color: #FF6347; font-size: 10pt;")
+        self.status_label.setWordWrap(True)
+        self.status_label.hide()
+        layout.addWidget(self.status_label, row + 1, 0, 1, 2)
+
+        self.set_window(DEFAULT_WINDOW)
+
+        # Worker
+        self.worker = PluginWorker(runner)
+        self.worker.data_updated.connect(self.update_display)
+        self.worker.start()
+
+    def set_window(self, window):
+        self.window = window
+        for label in self.window_labels:
+            label.setText(WINDOW_LABELS[window])
+        for plot in self.plots:
+            plot.setXRange(-window_seconds(window), 0, padding=0)
+        self.redraw()
+
+    def redraw(self):
+        for name, history in self.histories.items():
+            self.curves[name].setData(*history.points(self.window))
+
+    def update_display(self, values, status):
+        for name, value in values.items():
+            if value is not None:
+                self.histories[name].add(value)
+        if self.render.due():
+            self.redraw()
+
+        if values:
+            lines = []
+            for metric in self.runner.metrics:
+                value = values.get(metric.name)
+                label = metric.label or metric.name
+                lines.append(f"<b>{label}:</b> {'n/a' if value is None else f'{value:.2f}{metric.unit}'}")
+            for metric in self.runner.metrics:
+                text = percentile_text(f"{self.runner.source}.{metric.name}", metric.label or metric.name, metric.unit)
+                if text:
+                    lines.append(text)
+            self.details_label.setText("<br>".join(lines))
+
+        self.right_label.setText(f"Every {self.runner.effective_period:g}s")
+        self.status_label.setText(status)
+        self.status_label.setVisible(bool(status))
+
+    def closeEvent(self, event):
+        self.worker.stop()
+        super().closeEvent(event)